@@ -1,2 +1,3 @@
 from .utils.canipy import CaniPy
-__all__ = ["CaniPy"]
+from .utils.aiocanipy import AsyncCaniPy
+__all__ = ["CaniPy", "AsyncCaniPy"]
\ No newline at end of file
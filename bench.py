@@ -0,0 +1,494 @@
+import argparse, contextlib, json, os, platform, random, subprocess, sys, tempfile, time, tracemalloc
+
+from datetime import datetime
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from utils.canicapture import parse_text, RX
+from utils.caniemu import CaniEmu
+from utils.canipy import CaniPy
+from utils.comm import CaniWX
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PCAPS = os.path.join(HERE, "docs", "pcap")
+BASELINE = os.path.join(HERE, "bench_baseline.json")
+
+def bitwise_sum(data:bytes) -> int:
+    """
+    The original bit-by-bit Genibus loop, kept around to check against.
+    """
+    datasum = 0xFFFF
+    for byte in data:
+        datasum ^= (byte << 8)
+        for _ in range(8):
+            if datasum & 0x8000:
+                datasum = ((datasum << 1) ^ 0x1021) & 0xFFFF
+            else:
+                datasum = (datasum << 1) & 0xFFFF
+    return datasum ^ 0xFFFF
+
+# Every byte's worth of the loop above, done ahead of time
+GENIBUS_TABLE = []
+for byte in range(256):
+    crc = byte << 8
+    for _ in range(8):
+        crc = ((crc << 1) ^ 0x1021 if crc & 0x8000 else crc << 1) & 0xFFFF
+    GENIBUS_TABLE.append(crc)
+
+def table_sum(data:bytes) -> int:
+    """
+    Pure Python, one table lookup per byte.
+    """
+    datasum = 0xFFFF
+    table = GENIBUS_TABLE
+    for byte in data:
+        datasum = ((datasum << 8) & 0xFFFF) ^ table[(datasum >> 8) ^ byte]
+    return datasum ^ 0xFFFF
+
+def numpy_sums(blobs:list[bytes]) -> list[int]:
+    """
+    Same-length data stacked up and summed together a byte column at a time.
+    """
+    table = numpy.array(GENIBUS_TABLE, dtype=numpy.uint16)
+    data = numpy.frombuffer(b"".join(blobs), dtype=numpy.uint8).reshape(len(blobs), -1).T.copy()
+    crc = numpy.full(len(blobs), 0xFFFF, dtype=numpy.uint16)
+    for column in data:
+        crc = (crc << 8) ^ table[(crc >> 8) ^ column]
+    return (crc ^ 0xFFFF).tolist()
+
+def load_frames(path:str=os.path.join(PCAPS, "wx_datarx.txt")) -> list[bytes]:
+    """
+    Rebuilds the EA D0 data frames from a text capture.
+    Captures only keep the start of each frame, so the rest of the data is
+    made up (seeded by SID and frame) and the sum is filled in to match.
+
+    Args:
+        path (str, optional): The capture to read. Default to the WX data capture.
+
+    Returns:
+        list[bytes]: Complete EA D0 payloads.
+    """
+    frames = []
+    with open(path) as file:
+        for line in file:
+            if not line.startswith("CI") or ": ea d0" not in line:
+                continue
+            size, _, hexdump = line[2:].partition(":")
+            head = bytes.fromhex(hexdump.replace(".", ""))[:10]
+            if len(head) < 8: continue
+            rng = random.Random(head[2] << 8 | head[3])
+            data = bytes(rng.getrandbits(8) for _ in range(int(size) - 12))
+            crc = bitwise_sum(data)
+            frames.append(head + bytes([crc >> 8, crc & 0xFF]) + data)
+    return frames
+
+def timeit(func, frames:list[bytes], rounds:int=5) -> float:
+    """
+    Returns:
+        float: Best microseconds per frame over a few rounds.
+    """
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for frame in frames:
+            func(frame[12:])
+        best = min(best, (time.perf_counter() - start) / len(frames))
+    return best * 1e6
+
+def bench_sum(frames:list[bytes]):
+    """
+    Compares the data sum implementations, checking they agree first.
+    """
+    for frame in frames:
+        expected = frame[10] << 8 | frame[11]
+        assert bitwise_sum(frame[12:]) == table_sum(frame[12:]) == CaniWX.data_sum(frame[12:]) == expected
+    assert CaniWX.data_sum(bytes([0xAB, 0xCD, 0x12, 0x34])) == 0xF836
+
+    size = sum(len(frame) - 12 for frame in frames) / len(frames)
+    print(f"=data_sum, {len(frames)} frames of {size:.0f} bytes=")
+    base = None
+    for name, func in (
+        ("bitwise", bitwise_sum),
+        ("table", table_sum),
+        ("data_sum", CaniWX.data_sum)
+    ):
+        took = timeit(func, frames)
+        base = base or took
+        print(f"{name:>10}: {took:8.2f}us/frame {base/took:7.1f}x")
+
+    if numpy is None: return
+    # Batch of full frames only, as they have to line up
+    blobs = [frame[12:] for frame in frames if len(frame) == 220]
+    assert numpy_sums(blobs) == [CaniWX.data_sum(blob) for blob in blobs]
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        numpy_sums(blobs)
+        best = min(best, (time.perf_counter() - start) / len(blobs))
+    took = best * 1e6
+    print(f"{'numpy':>10}: {took:8.2f}us/frame {base/took:7.1f}x")
+
+class MemorySerial:
+    """
+    Stands in for a serial port, handing out a stream as if it arrived a chunk at a time
+    and swallowing whatever is written, so the reader can be timed without a radio.
+
+    Args:
+        stream (bytes, optional): The bytes to be read. Default to nothing.
+        chunk (int, optional): Bytes arriving at once, like the packets of a USB serial adapter. Default to 64.
+    """
+    def __init__(self, stream:bytes=b"", chunk:int=64):
+        self.chunks = [stream[i:i+chunk] for i in range(0, len(stream), chunk)]
+        self.next = 0
+        self.pending = b""
+        self.is_open = True
+        self.written = 0
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self.pending)
+
+    @property
+    def remaining(self) -> bool:
+        return bool(self.pending) or self.next < len(self.chunks)
+
+    def read(self, size:int=1) -> bytes:
+        # Next chunk only "arrives" once the last one was taken
+        if not self.pending and self.next < len(self.chunks):
+            self.pending = self.chunks[self.next]
+            self.next += 1
+        data, self.pending = self.pending[:size], self.pending[size:]
+        return data
+
+    def write(self, data:bytes) -> int:
+        self.written += len(data)
+        return len(data)
+
+    def close(self):
+        self.is_open = False
+
+def packet(payload:bytes) -> bytes:
+    """
+    Returns:
+        bytes: The payload wrapped up the way the radio sends it.
+    """
+    return bytes([0x5A, 0xA5]) + len(payload).to_bytes(2, "big") + payload + bytes(2)
+
+def pcap_packets() -> list[bytes]:
+    """
+    Returns:
+        list[bytes]: Every received packet in the text captures under docs/pcap.
+    """
+    packets = []
+    for name in sorted(os.listdir(PCAPS)):
+        if name.endswith(".txt"):
+            packets += [frame for direction, _, frame in parse_text(os.path.join(PCAPS, name)) if direction == RX]
+    return packets
+
+def synthetic_packets(count:int=2048, seed:int=0) -> dict[str, list[bytes]]:
+    """
+    Made up packets, built the same way the emulator builds them.
+    Monitored events are varied so none are skipped as unchanged.
+
+    Args:
+        count (int, optional): Packets per workload. Default to 2048.
+        seed (int, optional): Seed for the data. Default to 0.
+
+    Returns:
+        dict: Workload names (data, monitoring) mapped to their packets.
+    """
+    emu = CaniEmu("wx", seed=seed)
+    emu.data_sid = 231
+    data = [packet(emu.data()) for _ in range(count)]
+    monitoring = []
+    for num in range(count // 6):
+        clock = bytearray(emu.clock())
+        clock[10] = num & 0xFF
+        signal = bytearray(emu.SIGNAL)
+        signal[12] = num & 0xFF
+        monitoring += [packet(bytes(clock)), packet(bytes(signal))] + [packet(event) for event in emu.program(42)]
+    return {"data": data, "monitoring": monitoring}
+
+def noisy(packets:list[bytes], rate:float=0.05, seed:int=0) -> bytes:
+    """
+    Returns:
+        bytes: The packets back to back, with stray bytes ahead of some to resync from.
+    """
+    rng = random.Random(seed)
+    stream = bytearray()
+    for frame in packets:
+        if rng.random() < rate:
+            stream += rng.randbytes(rng.randrange(1, 16))
+        stream += frame
+    return bytes(stream)
+
+def measure(run, frames:int, rounds:int=5, setup=None, alloc:bool=True) -> dict:
+    """
+    Times a workload, taking the best of a few rounds,
+    then runs it once more under tracemalloc for what it allocates.
+
+    Args:
+        run (Callable): Runs the workload once.
+        frames (int): Frames the workload goes through.
+        rounds (int, optional): Times to run it. Default to 5.
+        setup (Callable, optional): Readies the workload before every run, untimed. Default to None.
+        alloc (bool, optional): Whether to trace allocations. Default to True.
+
+    Returns:
+        dict: Frames, microseconds per frame, frames per second, and if traced,
+            peak KiB allocated and bytes per frame still allocated afterwards.
+    """
+    best = float("inf")
+    for _ in range(rounds):
+        if setup: setup()
+        start = time.perf_counter_ns()
+        run()
+        best = min(best, time.perf_counter_ns() - start)
+    result = {"frames": frames, "us_per_frame": best / frames / 1e3, "frames_per_s": frames / best * 1e9}
+    if alloc:
+        if setup: setup()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        run()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_kib"] = (peak - before) / 1024
+        result["retained_per_frame"] = (current - before) / frames
+    return result
+
+def bench_framing(canipy:CaniPy, rounds:int, alloc:bool) -> dict:
+    """
+    Reads captured and made up streams through CaniThread.thread_buffer, in small and large chunks.
+    """
+    synthetic = synthetic_packets()
+    streams = {
+        "pcap": pcap_packets(),
+        "data": synthetic["data"],
+        "monitoring": synthetic["monitoring"]
+    }
+    streams = {name: (b"".join(packets), len(packets)) for name, packets in streams.items()}
+    streams["noisy"] = (noisy(synthetic["data"]), len(synthetic["data"]))
+
+    thread = canipy.thread
+    results = {}
+    for name, (stream, frames) in streams.items():
+        for chunk in (64, 4096):
+            def setup(stream=stream, chunk=chunk):
+                canipy.serial_conn = MemorySerial(stream, chunk)
+                thread.framer.reset()
+
+            def run():
+                serial = canipy.serial_conn
+                while serial.remaining:
+                    thread.thread_buffer()
+
+            results[f"framing/{name}/{chunk}"] = measure(run, frames, rounds, setup, alloc)
+    return results
+
+def bench_dispatch(canipy:CaniPy, rounds:int, alloc:bool) -> dict:
+    """
+    Dispatches captured and made up payloads through CaniConductor.go, per lane family.
+    Data frames are only queued by their handler, so those are timed until the WX pipeline has them handled.
+    """
+    lanes, framer, pipeline = canipy.lanes, canipy.thread.framer, canipy.wx.pipeline
+    synthetic = synthetic_packets()
+    families = {name: [] for name in lanes.names}
+    for frame in pcap_packets() + synthetic["monitoring"] + synthetic["data"]:
+        payload = framer.unwrap(frame)
+        families[lanes.names[lanes.lane_of[payload[0]]]].append(payload)
+    # No more than the pipeline queues without dropping
+    families["bulk"] = families["bulk"][:pipeline.maxsize]
+
+    def setup():
+        canipy.serial_conn = MemorySerial()
+        canipy.rx.forget()
+        canipy.wx.cache.clear()
+        canipy.wx.assembler.clear()
+
+    results = {}
+    for family, payloads in families.items():
+        def run(payloads=payloads):
+            go = canipy.conductor.go
+            for payload in payloads:
+                go(payload)
+            while pipeline.depth():
+                time.sleep(0.0001)
+
+        results[f"dispatch/{family}"] = measure(run, len(payloads), rounds, setup, alloc)
+    pipeline.stop()
+    return results
+
+def bench_parsers(canipy:CaniPy, rounds:int, alloc:bool, count:int=1024) -> dict:
+    """
+    Runs each CaniRX parser over made up responses, varied so none are skipped as unchanged.
+    """
+    rx = canipy.rx
+    emu = CaniEmu("pcr", seed=0)
+    clocks, signals = [], []
+    for num in range(256):
+        clock = bytearray(emu.clock())
+        clock[10] = num
+        clocks.append(bytes(clock))
+        signal = bytearray(emu.SIGNAL)
+        signal[12] = num
+        signals.append(bytes(signal))
+    polled = [bytes([0xC3, 0x01, 0x00]) + signal[1:] + bytes(2) for signal in signals]
+    parsers = {
+        "startup": (rx.parse_startup, [emu.STARTUP + emu.radio_id]),
+        "extinfo": (rx.parse_extinfo, [emu.answer(bytes([0x22, num]))[0] for num in emu.channels]),
+        "chan": (rx.parse_chan, [emu.chan_info(bytes([0x25, 0x08, num])) for num in emu.channels]),
+        "sig": (rx.parse_sig, signals + polled),
+        "clock": (rx.parse_clock, clocks),
+        "firminf": (rx.parse_firminf, [emu.FIRMWARE])
+    }
+
+    results = {}
+    for name, (parse, payloads) in parsers.items():
+        payloads = (payloads * (count // len(payloads) + 1))[:count]
+
+        def run(parse=parse, payloads=payloads):
+            for payload in payloads:
+                parse(payload)
+
+        results[f"parse/{name}"] = measure(run, count, rounds, rx.forget, alloc)
+    return results
+
+def bench_data_sum(canipy:CaniPy, rounds:int, alloc:bool) -> dict:
+    """
+    Sums the data of the frames in the WX data capture with CaniWX.data_sum.
+    """
+    blobs = [frame[12:] for frame in load_frames()]
+
+    def run():
+        data_sum = CaniWX.data_sum
+        for blob in blobs:
+            data_sum(blob)
+
+    return {"data_sum": measure(run, len(blobs), rounds, alloc=alloc)}
+
+def bench_store(canipy:CaniPy, rounds:int, alloc:bool) -> dict:
+    """
+    Stores the frames in the WX data capture through CaniWXStore.append, the way verified
+    frames are kept, segments and syncs included, under the working directory.
+    """
+    frames = load_frames()
+    store = canipy.wx.store
+
+    def run():
+        append = store.append
+        for frame in frames:
+            append(frame[2], frame[3], frame[12:], frame[11]|(frame[10]<<8))
+        # Last sync counts too
+        store.close()
+
+    return {"store": measure(run, len(frames), rounds, alloc=alloc)}
+
+BENCHES = {
+    "framing": bench_framing,
+    "dispatch": bench_dispatch,
+    "parsers": bench_parsers,
+    "data_sum": bench_data_sum,
+    "store": bench_store
+}
+
+def show(name:str, result:dict, base:dict=None) -> str:
+    """
+    Returns:
+        str: A line of results, alongside the change from the baseline if any.
+    """
+    line = f"{name:>26}: {result['us_per_frame']:9.2f}us/frame {result['frames_per_s']:11.0f} frames/s"
+    if "peak_kib" in result:
+        line += f" {result['peak_kib']:9.1f}KiB peak {result['retained_per_frame']:7.1f}B/frame kept"
+    if base:
+        change = result["us_per_frame"] / base["us_per_frame"] - 1
+        line += f" {change:+7.1%}"
+    return line
+
+def commit() -> str:
+    """
+    Returns:
+        str: The commit benchmarked, if in a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+def bench_main():
+    parser = argparse.ArgumentParser(description="Benchmarks the CaniPy hot paths, no radio needed")
+    parser.add_argument("benches", nargs="*", metavar="bench", help=f"Any of {', '.join(BENCHES)}, or sums. Default to all")
+    parser.add_argument("--rounds", type=int, default=5, help="Runs to take the best of. Default to 5")
+    parser.add_argument("--no-alloc", action="store_true", help="Skip tracing allocations, which takes a while")
+    parser.add_argument("--baseline", default=BASELINE, help="Baseline to compare against, if it exists")
+    parser.add_argument("--save", nargs="?", const=BASELINE, help="Store the results as a baseline")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Slowdown counted as a regression. Default to 10%%")
+    args = parser.parse_args()
+    unknown = set(args.benches) - set(BENCHES) - {"sums"}
+    if unknown:
+        parser.error(f"Unknown benchmark {', '.join(sorted(unknown))}")
+    selected = args.benches or [*BENCHES, "sums"]
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        print(f"Comparing against {args.baseline} ({baseline.get('commit') or 'unknown commit'})")
+
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir, open(os.devnull, "w") as devnull:
+        # Anything stored lands somewhere thrown away
+        os.chdir(workdir)
+        try:
+            # Handlers print, keep it off the results
+            with contextlib.redirect_stdout(devnull):
+                canipy = CaniPy()
+            for name in selected:
+                if name not in BENCHES: continue
+                print(f"={name}=")
+                with contextlib.redirect_stdout(devnull):
+                    found = BENCHES[name](canipy, args.rounds, not args.no_alloc)
+                for key, result in found.items():
+                    print(show(key, result, baseline.get("results", {}).get(key)))
+                results.update(found)
+            with contextlib.redirect_stdout(devnull):
+                canipy.serial_conn = None
+                canipy.close()
+                canipy.metrics.stop()
+        finally:
+            os.chdir(cwd)
+
+    if "sums" in selected:
+        frames = load_frames()
+        if frames:
+            bench_sum(frames)
+        else:
+            print("No data frames found")
+
+    regressions = [
+        key for key, result in results.items()
+        if key in baseline.get("results", {}) and
+        result["us_per_frame"] > baseline["results"][key]["us_per_frame"] * (1 + args.threshold)
+    ]
+    if regressions:
+        print(f"Slower by more than {args.threshold:.0%}: {', '.join(regressions)}")
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({
+                "commit": commit(),
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": results
+            }, file, indent=2)
+        print(f"Baseline saved to {args.save}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(bench_main())
@@ -1,6 +1,7 @@
 import serial.tools.list_ports
 
 from utils import CaniPy
+from utils.canireplay import CaniReplay
 
 def shell_main():
     """
@@ -25,7 +26,9 @@ def shell_main():
     print("=Supported Devices=")
     for num, (name, _) in device_list.items():
         print(f"{num}. {name}")
+    print("8. Verify stored data")
     print("9. Simulator (Parse Payload)")
+    print("10. Simulator (Replay Capture)")
     print("0. Exit")
 
     while True:
@@ -35,6 +38,9 @@ def shell_main():
             dev_name, baud_rate = device_list[dev_select]
             is_direct = (dev_name == "Direct/Commander")
             break
+        if dev_select == "8":
+            CaniPy().wx.verify_files(input("Data folder (blank for data): ").strip() or "data")
+            continue
         if dev_select == "9":
             print("Careful now!")
             print("You're about to send manual commands to the conductor!")
@@ -46,6 +52,14 @@ def shell_main():
                 )
             )
             continue
+        if dev_select == "10":
+            path = input("Capture (blank for docs/pcap/wx_datarx.txt): ").strip() or "docs/pcap/wx_datarx.txt"
+            speed = input("Speed (1 for as recorded, 0 for as fast as possible): ").strip()
+            try:
+                CaniReplay(CaniPy(), path, float(speed or 1)).run()
+            except (OSError, ValueError) as e:
+                print(f"Can't replay {path} ({e})")
+            continue
         print("Invalid option")
 
     # List available COM ports
@@ -90,8 +104,20 @@ def shell_main():
     print("6. Fetch signal info")
     print("7. Enter manual command")
     print("8. Toggle verbose output")
+    print("9. Toggle state change printout")
+    print("10. Toggle log file")
+    print("11. Print metrics")
+    print("12. Toggle profiler")
+    print("13. Capture profile")
+    print("14. Toggle capture")
     print("0. Exit")
 
+    # Printout for state changes, as they happen
+    watching = False
+    watch_kinds = ("channel", "program", "category", "signal", "radio_id", "data")
+    def watch(event):
+        print(f"[{event.kind}] {event.field}: {event.old!r} -> {event.new!r}")
+
     while True:
         match input("Select option: "):
             case "1":
@@ -125,11 +151,62 @@ def shell_main():
                 pcr_control.verbose = not pcr_control.verbose
                 print(f"Verbose output set to {pcr_control.verbose}")
                 continue
+            case "9":
+                watching = not watching
+                for kind in watch_kinds:
+                    if watching:
+                        pcr_control.events.subscribe(kind, watch)
+                    else:
+                        pcr_control.events.unsubscribe(kind, watch)
+                print(f"State change printout set to {watching}")
+                continue
+            case "10":
+                pcr_control.logfile.enabled = not pcr_control.logfile.enabled
+                if not pcr_control.logfile.enabled:
+                    # write out what's buffered so far
+                    pcr_control.logfile.stop()
+                print(f"Log file set to {pcr_control.logfile.enabled} ({pcr_control.logfile.path})")
+                continue
+            case "11":
+                # Leave out the help lines, they're for scrapers
+                print("\n".join(
+                    line for line in pcr_control.metrics.exposition().splitlines() if not line.startswith("#")
+                ))
+                print(f"Link utilisation: {pcr_control.metrics.utilisation():.1%} of {pcr_control.baud_rate} baud")
+                continue
+            case "12":
+                if pcr_control.profiler.enabled:
+                    pcr_control.profiler.disable()
+                    print("\n".join(pcr_control.profiler.report()) or "Nothing was profiled")
+                else:
+                    pcr_control.profiler.reset_stats()
+                    pcr_control.profiler.enable()
+                print(f"Profiler set to {pcr_control.profiler.enabled}")
+                continue
+            case "13":
+                seconds = input("Seconds: ").strip()
+                try:
+                    pcr_control.profiler.capture(float(seconds or 10))
+                except ValueError:
+                    print(f"Not a number of seconds ({seconds})")
+                    continue
+                print(f"Capturing to {pcr_control.profiler.capture_path}")
+                continue
+            case "14":
+                if pcr_control.capture.enabled:
+                    pcr_control.capture.stop()
+                    print(f"Capture stopped ({pcr_control.capture.report()})")
+                else:
+                    pcr_control.capture.start(input("Capture path: ") or None)
+                    print(f"Capturing to {pcr_control.capture.path}")
+                continue
             case "0":
                 break
         print("Invalid option")
 
     pcr_control.close()
+    pcr_control.logfile.stop()
+    pcr_control.metrics.stop()
 
 if __name__ == "__main__":
     shell_main()
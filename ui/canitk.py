@@ -1,5 +1,7 @@
 import serial.tools.list_ports
 
+from collections import deque
+
 from tkinter import Tk, StringVar, BooleanVar, IntVar, Menu, Frame, Text, END, messagebox, ttk
 
 from utils import CaniPy
@@ -47,6 +49,12 @@ class CaniTk(Tk):
         self.logboxToggle = BooleanVar()
         self.clkdbgToggle = BooleanVar()
         self.datdbgToggle = BooleanVar()
+        self.sigdbgToggle = BooleanVar()
+        self.prgdbgToggle = BooleanVar()
+        # log box line limit, messages come in from any
+        # thread but only the Tk loop touches the widget
+        self.loglinesVar = IntVar()
+        self.logQueue = deque()
 
         # load configs
         self.uicfg = InterfaceCfg(self)
@@ -63,6 +71,9 @@ class CaniTk(Tk):
         self.milclockToggle.set(
             self.uicfg.settings["clock"].getboolean("miltime",False)
         )
+        self.loglinesVar.set(
+            self.uicfg.settings["debug"].getint("lines",1000)
+        )
 
         # bools
         self.muteToggle = BooleanVar()
@@ -114,9 +125,23 @@ class CaniTk(Tk):
         self.datdbgToggle.set(
             self.uicfg.settings["debug"].getboolean("data",False)
         )
+        self.sigdbgToggle.set(
+            self.uicfg.settings["debug"].getboolean("signal",True)
+        )
+        self.prgdbgToggle.set(
+            self.uicfg.settings["debug"].getboolean("program",True)
+        )
         self.canipy.verbose = self.verboseToggle.get()
         self.canipy.clock_logging = self.clkdbgToggle.get()
         self.canipy.data_logging = self.datdbgToggle.get()
+        self.canipy.signal_logging = self.sigdbgToggle.get()
+        self.canipy.program_logging = self.prgdbgToggle.get()
+        # Let canipy skip log messages if neither
+        # the box nor the file would show them.
+        # Plain bool, as it's checked from the reader thread.
+        self.update_logging()
+        self.logboxToggle.trace_add("write",lambda *_:self.update_logging())
+        self.logfileToggle.trace_add("write",lambda *_:self.update_logging())
         self.chGuiVar = IntVar(value=self.canipy.ch_num)
 
         # input fields
@@ -202,18 +227,14 @@ class CaniTk(Tk):
 
         self.initialize()
 
+    def update_logging(self):
+        self.logging = self.logboxToggle.get() or self.logfileToggle.get()
+
     def writelog(self, msgtype:str, msg:str):
         if self.logfileToggle.get():
-            # write to logfile if enabled
-            try:
-                with open("canipy.log", "a") as file:
-                    file.write(
-                        f"[{self.canipy.sat_datetime}] [{msgtype}] {repr(msg)}\n"
-                    )
-            except PermissionError:
-                # Permission issues here are commonly due to race condition.
-                # Move along...
-                pass
+            # write to logfile if enabled,
+            # the file itself is handled off-thread
+            self.canipy.logfile.write(msgtype, msg)
 
     def infobox(self, msg:str):
         self.writelog("INF", msg)
@@ -229,13 +250,29 @@ class CaniTk(Tk):
     
     def logbox(self, msg:str):
         self.writelog("DBG", msg)
-        # enable, write, then disable and scroll
-        self.logField.config(state="normal")
-        # Check if empty; only newline if not the first element
-        is_empty = self.logField.index("end-1c") == "1.0"
-        self.logField.insert(END,("" if is_empty else "\n")+msg)
-        self.logField.config(state="disabled")
-        self.logField.see(END)
+        # Hand over to the Tk loop, safe from any thread
+        self.logQueue.append(msg)
+
+    def drain_logbox(self):
+        if not self.winfo_exists(): return
+        if self.logQueue:
+            # Take everything queued so far in one go
+            batch = [self.logQueue.popleft() for _ in range(len(self.logQueue))]
+            limit = max(self.loglinesVar.get(), 1)
+            # No point inserting what would be trimmed right after
+            batch = batch[-limit:]
+            # enable, write, then disable and scroll
+            self.logField.config(state="normal")
+            # Check if empty; only newline if not the first element
+            is_empty = self.logField.index("end-1c") == "1.0"
+            self.logField.insert(END,("" if is_empty else "\n")+"\n".join(batch))
+            # Trim oldest lines past the limit
+            lines = int(self.logField.index("end-1c").split(".")[0])
+            if lines > limit:
+                self.logField.delete("1.0",f"{lines-limit+1}.0")
+            self.logField.config(state="disabled")
+            self.logField.see(END)
+        self.after(100,self.drain_logbox)
 
     def initialize(self):
         #self.grid()
@@ -246,8 +283,10 @@ class CaniTk(Tk):
         #self.geometry(self.geometry())
 
         self.uithread.update()
+        self.drain_logbox()
     
     def clear_logfield(self):
+        self.logQueue.clear()
         self.logField.config(state="normal")
         self.logField.delete("1.0",END)
         self.logField.config(state="disabled")
@@ -282,6 +321,10 @@ class CaniTk(Tk):
         if self.canipy.serial_conn is not None:
             # Power down radio if connection is still active
             self.canipy.tx.power_down()
+            # Make sure it leaves before the window goes
+            self.canipy.writer.flush()
+        # Write out what's left of the log
+        self.canipy.logfile.stop()
         # Save settings
         self.uicfg.save_file()
         # Destroy window
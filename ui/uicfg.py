@@ -23,7 +23,10 @@ class InterfaceCfg:
                 "verbose": "False",
                 "box": "False",
                 "clock": "False",
-                "data": "False"
+                "data": "False",
+                "signal": "True",
+                "program": "True",
+                "lines": "1000"
             }
         }
 
@@ -46,7 +49,10 @@ class InterfaceCfg:
                 "verbose": self.parent.verboseToggle,
                 "box": self.parent.logboxToggle,
                 "clock": self.parent.clkdbgToggle,
-                "data": self.parent.datdbgToggle
+                "data": self.parent.datdbgToggle,
+                "signal": self.parent.sigdbgToggle,
+                "program": self.parent.prgdbgToggle,
+                "lines": self.parent.loglinesVar
             }
         }
 
@@ -69,7 +75,10 @@ class InterfaceCfg:
                 "verbose": ("True", "False"),
                 "box": ("True", "False"),
                 "clock": ("True", "False"),
-                "data": ("True", "False")
+                "data": ("True", "False"),
+                "signal": ("True", "False"),
+                "program": ("True", "False"),
+                "lines": range(10, 100001)
             }
         }
 
@@ -125,6 +125,18 @@ class InterfacePrep:
             command=lambda:setattr(self.parent.canipy,"data_logging",self.parent.datdbgToggle.get()),
             underline=0
         )
+        prefdbg_menu.add_checkbutton(
+            label="Signal logging",
+            variable=self.parent.sigdbgToggle,
+            command=lambda:setattr(self.parent.canipy,"signal_logging",self.parent.sigdbgToggle.get()),
+            underline=0
+        )
+        prefdbg_menu.add_checkbutton(
+            label="Program logging",
+            variable=self.parent.prgdbgToggle,
+            command=lambda:setattr(self.parent.canipy,"program_logging",self.parent.prgdbgToggle.get()),
+            underline=0
+        )
         prefdbg_menu.add_separator()
         prefdbg_menu.add_checkbutton(
             label="Show log box",
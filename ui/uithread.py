@@ -10,78 +10,127 @@ class InterfaceThread:
         self.tickerThrottle = False
         # Buffer for comparing
         self.tickerBuffer = ""
-    
+
+        # Labels to refresh per kind of change
+        self.eventLabels = {
+            "channel": ("ch_name", "ch_num"),
+            "program": ("artist_name", "title_name"),
+            "category": ("cat_name",),
+            "signal": ("signal",)
+        }
+        # Kinds of changes not yet shown,
+        # filled in by the reader thread
+        self.dirty = set()
+        self.connected = False
+        self.clockSettings = None
+        self.parent.canipy.events.subscribe(None, self.on_event)
+
+    def on_event(self, event):
+        # Runs on whichever thread changed the value,
+        # so only note it down for the UI loop to pick up
+        self.dirty.add(event.kind)
+
     def update(self):
         if not self.parent.winfo_exists(): return
 
         # Populate only when connection is up
         if self.parent.canipy.serial_conn is not None:
-            # update clock if set
-            if self.parent.canipy.sat_datetime > datetime(1900,1,1,tzinfo=timezone.utc):
-                curtime = self.parent.canipy.sat_datetime.astimezone(
-                    timezone(
-                        timedelta(
-                            hours=self.parent.timezoneOptions[
-                                self.parent.tzGuiVar.get()
-                            ] + self.parent.dstToggle.get()
-                        )
-                    )
-                )
-                if self.parent.milclockToggle.get():
-                    hfmt = curtime.strftime("%H:%M")
-                else:
-                    # platform agnostic approach for 12h
-                    hfmt = curtime.strftime("%I:%M").lstrip("0")
-                self.parent.labelFrame.config(
-                    text=hfmt
-                )
-            for attr, meta in self.parent.labelVars.items():
-                new_label = ""
-                match attr:
-                    case "signal":
-                        sat = self.parent.canipy.sig_strength
-                        ter = self.parent.canipy.ter_strength
-                        # pick the strongest signal, unless sat is 0 and ter is 1
-                        # as terrestrial strength indicator is rather loose
-                        if sat == 0 and ter == 1:
-                            sigpwr = 0
-                        else:
-                            sigpwr = max(sat,ter)
-                        # Not the prettiest..
-                        # new_label += f"""SAT {'[]'*self.parent.canipy.sig_strength+'  '*(
-                        #     3-self.parent.canipy.sig_strength
-                        # ) if self.parent.canipy.sig_strength > 0 else 'X   '} """
-                        # new_label += "TER "
-                        new_label += "T"
-                        # Report signal if antenna is connected
-                        if self.parent.canipy.ant_strength > 0:
-                            new_label += f" {'[]'*sigpwr}"
-                    case "ticker":
-                        # If there's ticker data at all
-                        # Otherwise if remnant marquee, clear it
-                        if self.parent.canipy.ticker:
-                            self.ticker(meta["var"])
-                        elif meta["var"].get():
-                            meta["var"].set("")
-                    case _:
-                        new_label += f"{getattr(self.parent.canipy,attr,'')}"
-                # only update if value changed
-                # less expensive doing so.
-                # Disregard marquee as that's updated externally
-                if attr != "ticker":
-                    if meta["var"].get() != f"{new_label}":
-                        meta["var"].set(f"{new_label}")
+            if not self.connected:
+                # Fresh connection, show everything once
+                self.connected = True
+                self.dirty.update(("clock", "ticker", *self.eventLabels))
+            # Clock display settings changed
+            settings = (
+                self.parent.tzGuiVar.get(),
+                self.parent.dstToggle.get(),
+                self.parent.milclockToggle.get()
+            )
+            if settings != self.clockSettings:
+                self.clockSettings = settings
+                self.dirty.add("clock")
+            # One snapshot for the whole refresh, so labels never mix channels
+            state = self.parent.canipy.state
+            # Only touch what changed since last time,
+            # an idle radio costs next to nothing.
+            # No checking the version, the snapshot is swapped in
+            # before its changes are marked dirty.
+            while self.dirty:
+                kind = self.dirty.pop()
+                if kind == "clock":
+                    self.clock(state)
+                for attr in self.eventLabels.get(kind, ()):
+                    self.label(attr, state)
+            # Marquee moves on its own
+            meta = self.parent.labelVars["ticker"]
+            # If there's ticker data at all
+            # Otherwise if remnant marquee, clear it
+            if state.ticker:
+                self.ticker(meta["var"], state.ticker)
+            elif meta["var"].get():
+                meta["var"].set("")
+        else:
+            self.connected = False
 
         # recursive loop
         # set to 100 so it doesnt chew cpu time..
         self.parent.after(100,self.update)
+
+    def clock(self, state):
+        # update clock if set
+        if state.sat_datetime > datetime(1900,1,1,tzinfo=timezone.utc):
+            curtime = state.sat_datetime.astimezone(
+                timezone(
+                    timedelta(
+                        hours=self.parent.timezoneOptions[
+                            self.parent.tzGuiVar.get()
+                        ] + self.parent.dstToggle.get()
+                    )
+                )
+            )
+            if self.parent.milclockToggle.get():
+                hfmt = curtime.strftime("%H:%M")
+            else:
+                # platform agnostic approach for 12h
+                hfmt = curtime.strftime("%I:%M").lstrip("0")
+            self.parent.labelFrame.config(
+                text=hfmt
+            )
+
+    def label(self, attr:str, state):
+        new_label = ""
+        match attr:
+            case "signal":
+                sat = state.sig_strength
+                ter = state.ter_strength
+                # pick the strongest signal, unless sat is 0 and ter is 1
+                # as terrestrial strength indicator is rather loose
+                if sat == 0 and ter == 1:
+                    sigpwr = 0
+                else:
+                    sigpwr = max(sat,ter)
+                # Not the prettiest..
+                # new_label += f"""SAT {'[]'*self.parent.canipy.sig_strength+'  '*(
+                #     3-self.parent.canipy.sig_strength
+                # ) if self.parent.canipy.sig_strength > 0 else 'X   '} """
+                # new_label += "TER "
+                new_label += "T"
+                # Report signal if antenna is connected
+                if state.ant_strength > 0:
+                    new_label += f" {'[]'*sigpwr}"
+            case _:
+                new_label += f"{getattr(state,attr,'')}"
+        # only update if value changed
+        # less expensive doing so.
+        meta = self.parent.labelVars[attr]
+        if meta["var"].get() != f"{new_label}":
+            meta["var"].set(f"{new_label}")
     
-    def ticker(self, marquee:StringVar):
+    def ticker(self, marquee:StringVar, text:str):
             # If marquee is empty or ticker updated, populate
-            if not marquee.get() or (self.tickerBuffer != self.parent.canipy.ticker):
-                marquee.set(self.parent.canipy.ticker)
+            if not marquee.get() or (self.tickerBuffer != text):
+                marquee.set(text)
                 # buffer it
-                self.tickerBuffer = self.parent.canipy.ticker
+                self.tickerBuffer = text
                 # Pad at least up to 96
                 if len(marquee.get()) < 96:
                     marquee.set(
@@ -96,4 +145,4 @@ class InterfaceThread:
                 )
                 self.tickerThrottle = False
             else:
-                self.tickerThrottle = True
+                self.tickerThrottle = True
\ No newline at end of file
@@ -1,4 +1,4 @@
-import time
+import threading
 
 class InterfaceWX:
     def __init__(self, parent):
@@ -14,29 +14,38 @@ class InterfaceWX:
         if self.parent.wxToggle.get():
             # Indicate we're in data mode
             self.parent.canipy.data_in_use = True
-            # Change to data service
-            self.parent.canipy.tx.channel_cancel(0xf0, True)
-            time.sleep(1)
-            self.parent.canipy.tx.change_channel(0xf0, True, True)
-            time.sleep(1)
-            # Define products
-            data_products = [
-                0x0A,
-                0xE6,
-                0xE7,
-                0xE8,
-                0xEA,
-                0xEB,
-                0xEC,
-                0xED,
-                0xEE
-            ]
-            # Listen for data products
-            for pid in data_products:
-                self.parent.canipy.wx.set_datachan(pid)
-                time.sleep(0.5)
+            # Wait on acks off the UI thread so the window stays responsive
+            threading.Thread(target=self.data_start,name="CaniWXSetup",daemon=True).start()
         else:
             # Sometimes 4F may linger unless radio is shut off first...
             #self.parent.canipy.data_in_use = False
             # Halt all data download
             self.parent.canipy.wx.data_stop()
+
+    def data_start(self):
+        canipy = self.parent.canipy
+        # Change to data service,
+        # each step moves on as soon as the radio answers
+        reply = canipy.tx.expect(bytes([0x11]), 1)
+        canipy.tx.channel_cancel(0xf0, True)
+        canipy.reply.wait(reply, 1)
+        reply = canipy.tx.expect(bytes([0x10]), 1)
+        canipy.tx.change_channel(0xf0, True, True)
+        canipy.reply.wait(reply, 1)
+        # Define products
+        data_products = [
+            0x0A,
+            0xE6,
+            0xE7,
+            0xE8,
+            0xEA,
+            0xEB,
+            0xEC,
+            0xED,
+            0xEE
+        ]
+        # Listen for data products
+        for pid in data_products:
+            reply = canipy.tx.expect(bytes([0x4A, 0x10]), 0.5)
+            canipy.wx.set_datachan(pid)
+            canipy.reply.wait(reply, 0.5)
\ No newline at end of file
@@ -0,0 +1,226 @@
+import asyncio, os, serial
+
+from concurrent.futures import Future
+
+from .canipy import CaniPy
+from .comm import CaniStatusError
+
+class CaniAwait:
+    """
+    Wraps the command functions of a CaniPy subsystem (tx, wx, dx) so they can be awaited.
+    The wrapped function is run as usual, then the call waits until the packet has left the port.
+
+    Example:
+        "await radio.atx.change_channel(1)" tunes to channel 1 and returns once it has been written.
+
+    Args:
+        parent (AsyncCaniPy): The asyncio CaniPy instance that owns the subsystem.
+        target: The subsystem whose functions are wrapped.
+    """
+    def __init__(self, parent:"AsyncCaniPy", target):
+        self.parent = parent
+        self.target = target
+
+    def __getattr__(self, name:str):
+        func = getattr(self.target, name)
+        if not callable(func):
+            return func
+
+        async def wrapper(*args, **kwargs):
+            payload = func(*args, **kwargs)
+            await self.parent.drain()
+            return payload
+
+        return wrapper
+
+class AsyncCaniPy(CaniPy):
+    """
+    An asyncio flavor of CaniPy. Instead of starting a CaniThread per radio, the serial port
+    is registered with the event loop, and responses are relayed to the conductor on the loop.
+    Writes are buffered and flushed whenever the port can take them, so one loop can drive many radios.
+    Serial ports are watched through their file descriptor, so this is limited to POSIX systems.
+
+    Example:
+        Inside a coroutine, "radio = AsyncCaniPy(port='/dev/ttyUSB0')" opens the port on the
+        running loop, and "await radio.atx.power_up()" powers it on.
+
+    Args:
+        port (str, optional): The path of the serial to use (/dev/ttyUSB0, etc). Default to no path.
+        baud (int, optional): The baud rate (bits/second) to use. Default to 9600 baud.
+        gui (optional): Reference an external subsystem for output if provided. Default to None.
+        loop (asyncio.AbstractEventLoop, optional): The loop to register with. Default to the running loop.
+
+    Attributes:
+        loop (asyncio.AbstractEventLoop): The event loop the port is registered with.
+        tx_buffer (bytearray): Packets waiting to be written out to the port.
+        drain_waiters (list[asyncio.Future]): Pending waits for the TX buffer to empty.
+
+        atx (CaniAwait): Awaitable version of tx.
+        awx (CaniAwait): Awaitable version of wx.
+        adx (CaniAwait): Awaitable version of dx.
+    """
+    def __init__(self, port:str="", baud:int=9600, gui=None, loop:asyncio.AbstractEventLoop=None):
+        self.loop = loop
+        self.tx_buffer = bytearray()
+        self.drain_waiters = []
+        self.fd = None
+        self.writing = False
+        super().__init__(port, baud, gui)
+
+        self.atx = CaniAwait(self, self.tx)
+        self.awx = CaniAwait(self, self.wx)
+        self.adx = CaniAwait(self, self.dx)
+
+    def open(self, port:str, baud:int):
+        """
+        Configure a new connection to the serial device and register it with the loop.
+
+        Args:
+            port (str): The serial device's path or identifier.
+            baud (int): The baud rate of the connection.
+        """
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+        self.detach()
+        self.port_name = port
+        self.baud_rate = baud
+        try:
+            # Non-blocking, the loop decides when to read and write
+            self.serial_conn = serial.Serial(port=port, baudrate=baud, timeout=0, write_timeout=0)
+        except serial.SerialException:
+            self.errorprint("Device port is unavailable")
+            self.serial_conn = None
+            return
+        self.thread.framer.reset()
+        self.fd = self.serial_conn.fileno()
+        self.loop.add_reader(self.fd, self.on_readable)
+
+    def close(self):
+        """
+        Unregister from the loop and close the connection to the serial device.
+        """
+        self.detach()
+        super().close()
+
+    def detach(self):
+        """
+        Stops watching the port, failing any pending drain waits.
+        """
+        if self.fd is not None and self.loop is not None and not self.loop.is_closed():
+            self.loop.remove_reader(self.fd)
+            self.loop.remove_writer(self.fd)
+        self.fd = None
+        self.writing = False
+        self.tx_buffer.clear()
+        for waiter in self.drain_waiters:
+            if not waiter.done():
+                waiter.set_exception(ConnectionError("Port closed"))
+        self.drain_waiters.clear()
+
+    def on_readable(self):
+        """
+        Called by the loop when the port has bytes waiting.
+        """
+        try:
+            chunk = self.serial_conn.read(self.serial_conn.in_waiting or 1)
+        except (serial.SerialException, OSError, TypeError, AttributeError):
+            self.errorprint("Device port was lost")
+            self.detach()
+            return
+        if not chunk: return
+        for buf in self.thread.thread_frames(chunk):
+            self.conductor.go(buf)
+
+    def transmit(self, command:bytes) -> bool:
+        """
+        Queues a complete packet to be written out to the port.
+        Safe to call from other threads, the write is handed over to the loop.
+
+        Args:
+            command (bytes): The packet, including header, length, and footer.
+
+        Returns:
+            bool: Whether the packet was accepted, which is always.
+        """
+        try:
+            in_loop = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            in_loop = False
+        if not in_loop:
+            self.loop.call_soon_threadsafe(self.transmit, command)
+            return True
+        self.tx_buffer += command
+        if not self.writing:
+            self.on_writable()
+        return True
+
+    def on_writable(self):
+        """
+        Writes as much of the TX buffer as the port takes, waiting on the loop for the rest.
+        """
+        if self.fd is None: return
+        try:
+            written = os.write(self.fd, self.tx_buffer)
+        except BlockingIOError:
+            written = 0
+        except OSError:
+            self.errorprint("Device port was lost")
+            self.detach()
+            return
+        del self.tx_buffer[:written]
+        if self.tx_buffer:
+            if not self.writing:
+                self.writing = True
+                self.loop.add_writer(self.fd, self.on_writable)
+            return
+        if self.writing:
+            self.writing = False
+            self.loop.remove_writer(self.fd)
+        for waiter in self.drain_waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self.drain_waiters.clear()
+
+    async def drain(self):
+        """
+        Waits until every queued packet has been written out to the port.
+        """
+        if not self.tx_buffer: return
+        waiter = self.loop.create_future()
+        self.drain_waiters.append(waiter)
+        await waiter
+
+    async def await_reply(self, future:Future, timeout:float=2.0) -> bytes:
+        """
+        Awaitable counterpart of CaniReply.wait, for futures handed out by tx.expect or tx.request.
+
+        Example:
+            "await radio.await_reply(radio.tx.request(bytes([0x31])))" returns the radio ID response.
+
+        Args:
+            future (Future): A future handed out by expect or request.
+            timeout (float, optional): Seconds to wait for. Default to 2.
+
+        Returns:
+            bytes: The response payload, or nothing if it failed or timed out.
+        """
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            if self.verbose:
+                self.logprint("No response from radio")
+        except CaniStatusError as e:
+            self.logprint(str(e))
+        except ConnectionError as e:
+            if self.verbose:
+                self.logprint(str(e))
+        return b""
+
+    async def direct_enable(self):
+        """
+        Awaitable counterpart of CaniDX.enable, which would otherwise block the loop.
+        """
+        await self.await_reply(self.dx.ack(self.dx.com_listen, True), 1)
+        await self.await_reply(self.dx.ack(self.dx.voltage, True, True), 1)
+        await self.await_reply(self.dx.ack(self.dx.dac_mute, False), 1)
+        await self.atx.power_up()
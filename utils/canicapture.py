@@ -0,0 +1,487 @@
+import mmap, os, re, struct, threading, time
+
+from .comm import CaniWX
+
+# File header: magic, wall clock time and monotonic nanoseconds the capture started at
+HEADER = struct.Struct("<8sdQ")
+MAGIC = b"CANICAP1"
+# Record per frame: frame length, direction, nanoseconds since the start, then the raw frame
+RECORD = struct.Struct("<IBQ")
+# Index record per frame: nanoseconds since the start, record offset, direction, opcode
+INDEX = struct.Struct("<QQBB")
+
+RX = 0
+TX = 1
+
+class CaniCapture:
+    """
+    Records every raw frame read from or written to the radio into a binary capture,
+    with its direction and a monotonic timestamp, alongside a sidecar index of where
+    every record is. Captures are read back through CaniCaptureReader.
+
+    Records are length-prefixed and appended back to back after a small header,
+    and each index record is a fixed size, so the index can be searched in place.
+    Both files are buffered separately, so until they're flushed together either one
+    can be ahead of the other on disk, such as after a crash. The reader checks the
+    index against the capture and rebuilds it if they don't line up.
+
+    Example:
+        "canipy.capture.start('session.cap')" records everything until "canipy.capture.stop()",
+        with the index kept in "session.cap.idx".
+
+    Args:
+        parent (CaniPy): A main CaniPy instance that this script will support.
+        path (str, optional): The capture to write. Default to capture.cap.
+        flush_interval (float, optional): Most seconds records are buffered for. Default to 1.
+
+    Attributes:
+        enabled (bool): Whether frames are being recorded, checked before recording.
+        file: The open capture file, or None while stopped.
+        index: The open index file, or None while stopped.
+        offset (int): Offset the next record is written at.
+        start_ns (int): Monotonic nanoseconds the capture started at.
+        next_flush (float): Monotonic time the files are next flushed.
+        lock (threading.Lock): Keeps records in order, as frames come from the reader and senders alike.
+
+        frame_count (list[int]): Amount of frames recorded per direction (RX, TX).
+        byte_count (int): Amount of bytes written to the capture.
+    """
+    # Directions, for those recording without importing this module
+    RX = RX
+    TX = TX
+
+    def __init__(self, parent:"CaniPy", path:str="capture.cap", flush_interval:float=1.0):
+        self.parent = parent
+        self.path = path
+        self.flush_interval = flush_interval
+
+        self.enabled = False
+        self.file = None
+        self.index = None
+        self.offset = 0
+        self.start_ns = 0
+        self.next_flush = 0
+        self.lock = threading.Lock()
+
+        self.frame_count = [0, 0]
+        self.byte_count = 0
+
+    def start(self, path:str=None):
+        """
+        Starts recording into a new capture. An existing capture is never written over,
+        a number is added to the name instead.
+
+        Args:
+            path (str, optional): The capture to write. Default to the last one given.
+        """
+        self.stop()
+        base, ext = os.path.splitext(path or self.path)
+        name, num = base + ext, 0
+        while os.path.exists(name):
+            num += 1
+            name = f"{base}_{num:03}{ext}"
+        with self.lock:
+            try:
+                self.file = open(name, "wb")
+                self.index = open(name + ".idx", "wb")
+            except OSError as e:
+                self.parent.errorprint(f"Capture unavailable ({type(e).__name__})")
+                if self.file: self.file.close()
+                self.file = self.index = None
+                return
+            self.path = name
+            self.start_ns = time.monotonic_ns()
+            self.file.write(HEADER.pack(MAGIC, time.time(), self.start_ns))
+            self.offset = HEADER.size
+            self.frame_count = [0, 0]
+            self.byte_count = HEADER.size
+            self.next_flush = time.monotonic() + self.flush_interval
+            self.enabled = True
+        if self.parent.verbose:
+            self.parent.logprint(f"Capturing to {name}")
+
+    def stop(self):
+        """
+        Stops recording, writing out and closing both files.
+        """
+        with self.lock:
+            self.enabled = False
+            if not self.file: return
+            for file in (self.file, self.index):
+                try:
+                    file.close()
+                except OSError:
+                    pass
+            self.file = self.index = None
+        if self.parent.verbose:
+            self.parent.logprint(f"Capture: {self.report()}")
+
+    def record(self, direction:int, frame:bytes):
+        """
+        Appends a raw frame to the capture.
+
+        Args:
+            direction (int): RX for frames read from the radio, TX for frames written to it.
+            frame (bytes): The complete frame, including header, length, and trailing bytes.
+        """
+        with self.lock:
+            if not self.file: return
+            # Taken under the lock, so timestamps never go backwards
+            stamp = time.monotonic_ns() - self.start_ns
+            try:
+                self.file.write(RECORD.pack(len(frame), direction, stamp) + frame)
+                self.index.write(INDEX.pack(stamp, self.offset, direction, frame[4] if len(frame) > 4 else 0))
+            except OSError as e:
+                # Out of space or the FS went away, nothing more will make it
+                self.enabled = False
+                self.parent.logprint(f"Capture stopped ({type(e).__name__})")
+                return
+            size = RECORD.size + len(frame)
+            self.offset += size
+            self.byte_count += size
+            self.frame_count[direction] += 1
+            if time.monotonic() >= self.next_flush:
+                self.next_flush = time.monotonic() + self.flush_interval
+                self.file.flush()
+                self.index.flush()
+
+    def report(self) -> str:
+        """
+        Returns:
+            str: A one-line summary of the capture counters.
+        """
+        return (
+            f"{self.frame_count[RX]} received, {self.frame_count[TX]} sent, "
+            f"{self.byte_count} bytes in {self.path}"
+        )
+
+class CaniCaptureReader:
+    """
+    Reads back a binary capture written by CaniCapture or convert_text.
+    Both the capture and its index are memory-mapped, so a capture of any size
+    can be searched by time or opcode without reading it all in.
+    If the index is missing or doesn't cover the capture, such as after a crash,
+    it is rebuilt from the capture first.
+
+    Example:
+        "with CaniCaptureReader('session.cap') as cap:" then "cap.records(opcode=0xEA)"
+        yields every data frame, and "cap.records(start=60*10**9)" everything from a minute in.
+
+    Args:
+        path (str): The capture to read.
+
+    Attributes:
+        started (float): Wall clock time the capture started at.
+        data (mmap.mmap): The mapped capture, or None if it holds no records.
+        index (mmap.mmap): The mapped index, or None if it holds no records.
+        count (int): Amount of records in the capture.
+    """
+    # Index records searched at a time, so only so much is copied out of the map
+    window = 65536
+
+    def __init__(self, path:str):
+        self.path = path
+        with open(path, "rb") as file:
+            head = file.read(HEADER.size)
+            if len(head) < HEADER.size or head[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a capture")
+            _, self.started, _ = HEADER.unpack(head)
+            size = os.fstat(file.fileno()).st_size
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size > HEADER.size else None
+        self.index = None
+        self.count = 0
+        if self.data is None: return
+        if not self.indexed(size):
+            self.reindex()
+        with open(path + ".idx", "rb") as file:
+            self.count = os.fstat(file.fileno()).st_size // INDEX.size
+            if self.count:
+                self.index = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, num:int) -> tuple:
+        """
+        Args:
+            num (int): Position of the record, oldest first.
+
+        Returns:
+            tuple: Direction, nanoseconds since the start, and raw frame of the record.
+        """
+        if num < 0: num += self.count
+        if not 0 <= num < self.count: raise IndexError("record out of range")
+        offset = INDEX.unpack_from(self.index, num * INDEX.size)[1]
+        return self.read(offset)[:3]
+
+    def __iter__(self):
+        return self.records()
+
+    def close(self):
+        """
+        Unmaps the capture and its index.
+        """
+        for mapped in (self.data, self.index):
+            if mapped is not None: mapped.close()
+        self.data = self.index = None
+
+    def read(self, offset:int) -> tuple:
+        """
+        Reads the record at an offset of the capture.
+
+        Args:
+            offset (int): Offset of the record.
+
+        Returns:
+            tuple: Direction, nanoseconds since the start, raw frame, and the offset of the next record.
+        """
+        length, direction, stamp = RECORD.unpack_from(self.data, offset)
+        start = offset + RECORD.size
+        return direction, stamp, self.data[start:start+length], start + length
+
+    def indexed(self, size:int) -> bool:
+        """
+        Checks whether the index covers every record in the capture, going by the last index record.
+
+        Args:
+            size (int): Size of the capture.
+
+        Returns:
+            bool: Whether the index can be used as is.
+        """
+        try:
+            index_size = os.path.getsize(self.path + ".idx")
+        except OSError:
+            return False
+        if not index_size or index_size % INDEX.size: return False
+        with open(self.path + ".idx", "rb") as file:
+            file.seek(index_size - INDEX.size)
+            offset = INDEX.unpack(file.read(INDEX.size))[1]
+        if offset + RECORD.size > size: return False
+        length = RECORD.unpack_from(self.data, offset)[0]
+        # Anything past the last record means records went unindexed
+        return offset + RECORD.size + length == size
+
+    def reindex(self):
+        """
+        Rebuilds the index by walking every record in the capture.
+        A record cut short at the end is left out.
+        """
+        size = len(self.data)
+        offset = HEADER.size
+        with open(self.path + ".idx", "wb") as file:
+            while offset + RECORD.size <= size:
+                length, direction, stamp = RECORD.unpack_from(self.data, offset)
+                if offset + RECORD.size + length > size: break
+                frame = offset + RECORD.size
+                opcode = self.data[frame + 4] if length > 4 else 0
+                file.write(INDEX.pack(stamp, offset, direction, opcode))
+                offset = frame + length
+
+    def find(self, stamp:int) -> int:
+        """
+        Searches the index for the first record at or after a time.
+
+        Args:
+            stamp (int): Nanoseconds since the start.
+
+        Returns:
+            int: Position of the record, or the amount of records if none are that late.
+        """
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if INDEX.unpack_from(self.index, mid * INDEX.size)[0] < stamp:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def positions(self, opcode:int, start:int=0, end:int=None):
+        """
+        Searches the index for records of an opcode, only looking at the opcode of each index record.
+
+        Args:
+            opcode (int): The opcode to look for.
+            start (int, optional): Position to start looking from. Default to the first.
+            end (int, optional): Position to stop looking at. Default to the last.
+
+        Yields:
+            int: Position of every record with the opcode.
+        """
+        if not self.count: return
+        end = self.count if end is None else min(end, self.count)
+        target = bytes([opcode])
+        for low in range(start, end, self.window):
+            high = min(low + self.window, end)
+            # Opcodes of a window of the index lined up, one byte per record
+            opcodes = self.index[low * INDEX.size + INDEX.size - 1:high * INDEX.size:INDEX.size]
+            pos = opcodes.find(target)
+            while pos >= 0:
+                yield low + pos
+                pos = opcodes.find(target, pos + 1)
+
+    def records(self, start:int=0, end:int=None, opcode:int=None, direction:int=None):
+        """
+        Reads back the records within a time range.
+
+        Args:
+            start (int, optional): Earliest nanoseconds since the start to include. Default to the very first.
+            end (int, optional): Latest nanoseconds since the start to include. Default to the very last.
+            opcode (int, optional): Only include frames with this opcode. Default to any.
+            direction (int, optional): Only include frames going this way (RX, TX). Default to both.
+
+        Yields:
+            tuple: Direction, nanoseconds since the start, and raw frame of every record, oldest first.
+        """
+        if not self.count: return
+        first = self.find(start) if start else 0
+        last = self.find(end + 1) if end is not None else self.count
+        if opcode is None:
+            nums = range(first, last)
+        else:
+            nums = self.positions(opcode, first, last)
+        for num in nums:
+            stamp, offset, way, _ = INDEX.unpack_from(self.index, num * INDEX.size)
+            if direction is not None and way != direction: continue
+            yield self.read(offset)[:3]
+
+    def wall(self, stamp:int) -> float:
+        """
+        Args:
+            stamp (int): Nanoseconds since the start.
+
+        Returns:
+            float: The wall clock time of the stamp.
+        """
+        return self.started + stamp / 1e9
+
+# Payload dumps, "17:33:26 CI  11: df 14 ..." or "CI 220: ea d0 ... ...", timestamp optional
+DUMP_LINE = re.compile(r"^(?:(\d{1,2}):(\d{2}):(\d{2})\s+)?C([IO])\s+(\d+):\s*([0-9a-fA-F .]*)$")
+# Even amount of hex digits and nothing else
+HEX = re.compile(r"(?:[0-9a-fA-F]{2})+")
+
+def parse_text(path:str, spacing:float=0.01):
+    """
+    Reads the frames out of a text capture as found under docs/pcap.
+    Both payload dumps ("CI  5: ca 40 ...", CI received and CO sent) and annotated
+    packets ("RX payload:" followed by "5aa5 - Start" and so on) are understood,
+    as are bare "Sent:" and "Received:" payloads. Anything else is skipped.
+
+    Dumps cut short with "..." are padded out to their stated length with zeros,
+    and data frames (EA D0 hex) padded that way get a sum matching the padding,
+    so they can be replayed through the parsers.
+    Captures with no timestamps, or several frames within the same second, are
+    spread out so every frame is at least the spacing apart.
+
+    Args:
+        path (str): The text capture to read.
+        spacing (float, optional): Least seconds between frames. Default to 0.01.
+
+    Yields:
+        tuple: Direction, nanoseconds since the first frame, and raw frame.
+    """
+    gap = int(spacing * 1e9)
+    stamp, first = -gap, None
+    # Direction and hex gathered so far of an annotated packet
+    block = None
+    # Direction of a bare payload expected on the next line
+    pending = None
+
+    def spaced(seconds:int=None) -> int:
+        nonlocal stamp, first
+        if seconds is None:
+            stamp += gap
+            return stamp
+        if first is None: first = seconds
+        # Captures can run past midnight
+        if seconds < first: seconds += 86400
+        stamp = max((seconds - first) * 10**9, stamp + gap)
+        return stamp
+
+    def wrap(direction:int, payload:bytes) -> bytes:
+        # Sent frames end in ED ED, the radio's trailing bytes aren't always known
+        tail = bytes([0xED, 0xED]) if direction == TX else bytes(2)
+        return bytes([0x5A, 0xA5]) + len(payload).to_bytes(2, "big") + payload + tail
+
+    with open(path, encoding="utf-8", errors="replace") as file:
+        for line in list(file) + [""]:
+            text = line.strip()
+            if block is not None:
+                head = text.partition(" - ")[0].replace(" ", "")
+                if head and HEX.fullmatch(head):
+                    block[1].append(bytes.fromhex(head))
+                    continue
+                # Packet's over, rebuilt from its stated length as the trailing bytes may be missing
+                direction, raw = block[0], b"".join(block[1])
+                block = None
+                size = (raw[2] << 8) | raw[3] if len(raw) >= 4 else 0
+                if raw[:2] == bytes([0x5A, 0xA5]) and size and len(raw) >= size + 4:
+                    yield direction, spaced(), wrap(direction, raw[4:4+size])
+            if pending is not None:
+                if HEX.fullmatch(text):
+                    yield pending, spaced(), wrap(pending, bytes.fromhex(text))
+                pending = None
+                continue
+            if text in ("RX payload:", "TX payload:"):
+                block = (RX if text[0] == "R" else TX, [])
+                continue
+            if text in ("Received:", "Sent:"):
+                pending = RX if text[0] == "R" else TX
+                continue
+
+            match = DUMP_LINE.match(text)
+            if not match: continue
+            hours, minutes, seconds, way, size, dump = match.groups()
+            digits = dump.replace(".", "").replace(" ", "")
+            if not digits or not HEX.fullmatch(digits): continue
+            size = int(size)
+            payload = bytes.fromhex(digits)[:size]
+            if len(payload) < size:
+                payload += bytes(size - len(payload))
+                if payload[:2] == bytes([0xEA, 0xD0]) and size > 12:
+                    crc = CaniWX.data_sum(payload[12:])
+                    payload = payload[:10] + bytes([crc >> 8, crc & 0xFF]) + payload[12:]
+            direction = RX if way == "I" else TX
+            clock = int(hours)*3600 + int(minutes)*60 + int(seconds) if hours else None
+            yield direction, spaced(clock), wrap(direction, payload)
+
+def convert_text(src:str, dst:str, spacing:float=0.01) -> int:
+    """
+    Converts a text capture into a binary capture, along with its index.
+
+    Example:
+        "convert_text('docs/pcap/wx_datarx.txt', 'wx_datarx.cap')"
+
+    Args:
+        src (str): The text capture to read.
+        dst (str): The binary capture to write, overwritten if it exists.
+        spacing (float, optional): Least seconds between frames, see parse_text. Default to 0.01.
+
+    Returns:
+        int: Amount of frames converted.
+    """
+    count = 0
+    offset = HEADER.size
+    with open(dst, "wb") as data, open(dst + ".idx", "wb") as index:
+        # No monotonic clock to speak of, the file's time will do
+        data.write(HEADER.pack(MAGIC, os.path.getmtime(src), 0))
+        for direction, stamp, frame in parse_text(src, spacing):
+            data.write(RECORD.pack(len(frame), direction, stamp) + frame)
+            index.write(INDEX.pack(stamp, offset, direction, frame[4]))
+            offset += RECORD.size + len(frame)
+            count += 1
+    return count
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 3:
+        print("Usage: python -m utils.canicapture <capture.txt> <capture.cap>")
+        sys.exit(1)
+    print(f"{convert_text(sys.argv[1], sys.argv[2])} frames converted")
@@ -0,0 +1,457 @@
+import os, random, select, threading, time
+
+from datetime import datetime, timezone
+
+from .comm import CaniFramer, CaniWX
+
+class CaniEmu:
+    """
+    A virtual radio on a pseudo-terminal, answering commands the way a PCR, Direct,
+    or WX receiver does, so CaniPy can be run, load tested, and timed without hardware.
+    CaniPy connects to it like any serial device, nothing needs to change on its end.
+    Responses are modelled after the captures under docs/pcap.
+
+    Output is paced to the configured baud rate (10 bits a byte), and faults can be
+    injected into it to see how framing holds up and recovers: stray bytes ahead of a frame,
+    frames cut short, data frames with a bad sum, and the line going quiet for a while.
+    Only POSIX systems have pseudo-terminals.
+
+    Example:
+        "emu = CaniEmu('wx', baud=115200)", then "CaniPy(port=emu.start(), baud=115200)"
+        gets a radio that streams data frames as fast as the baud allows once
+        "canipy.wx.set_datachan(231)" is sent. Also runnable as "python -m utils.caniemu wx".
+
+    Args:
+        model (str, optional): The radio to act as (pcr, direct, wx). Default to pcr.
+        baud (int, optional): The baud rate to pace output to. Default to 9600.
+        radio_id (str, optional): The 8-character radio ID to report. Default to ABCD1234.
+        garbage (float, optional): Chance of stray bytes ahead of a frame. Default to 0.
+        truncate (float, optional): Chance of a frame being cut short. Default to 0.
+        bad_crc (float, optional): Chance of a data frame failing its sum. Default to 0.
+        stall (float, optional): Chance of the line going quiet before a frame. Default to 0.
+        stall_time (float, optional): Seconds the line goes quiet for. Default to 0.5.
+        seed (int, optional): Seed for the faults and data, for repeatable runs. Default to None.
+
+    Attributes:
+        port (str): Path of the pseudo-terminal to connect to, once started.
+        channels (dict): Channel numbers mapped to their SID, name, category ID, category, artist, and title.
+        channel (int): The channel tuned to.
+        powered (bool): Whether the radio was powered up.
+        monitors (dict): Monitoring streams (clock, signal, channel) mapped to whether they're on.
+        data_sid (int): The SID data frames are streamed from, 0 for none.
+        data_frame (int): The next data frame number.
+        rng (random.Random): Source of faults and data.
+
+        master (int): The controlling end of the pseudo-terminal.
+        slave (int): The device end, held open so the line stays up between connections.
+        thread_signal (threading.Event): Prompts the threaded functions to halt.
+        threads (list[threading.Thread]): The thread entities reading commands and streaming.
+        lock (threading.Lock): Keeps frames from interleaving on the line.
+        next_free (float): Monotonic time the line is free to send again.
+
+        command_count (int): Amount of commands received.
+        frame_count (int): Amount of frames sent.
+        byte_count (int): Amount of bytes sent.
+        faults (dict): Fault names mapped to the amount of times they were injected.
+    """
+    models = ("pcr", "direct", "wx")
+    # Sample responses lifted from docs/pcap
+    STARTUP = bytes.fromhex("80010000251029200201000001740405200208")
+    FIRMWARE = bytes.fromhex("e3010085140802200274040520022510292002")
+    SIGNAL = bytes.fromhex("c1030301010100010100000c004e1a9000000000d9f1")
+    EXTINFO = bytes.fromhex(
+        "a2010001014772656174204f66666572204e6f77210000000000000000000000000000000000000000"
+        "013834342d3731312d38383030202020200000000000000000000000000000000000000000"
+    )
+    # Length of every data frame but the last in a product
+    FULL_FRAME = 0xD0
+
+    def __init__(self, model:str="pcr", baud:int=9600, radio_id:str="ABCD1234",
+                 garbage:float=0, truncate:float=0, bad_crc:float=0, stall:float=0,
+                 stall_time:float=0.5, seed:int=None):
+        if model not in self.models:
+            raise ValueError(f"Unknown model {model}, expected one of {', '.join(self.models)}")
+        self.model = model
+        self.baud = baud
+        self.radio_id = radio_id.encode("latin-1")[:8].ljust(8)
+        self.garbage = garbage
+        self.truncate = truncate
+        self.bad_crc = bad_crc
+        self.stall = stall
+        self.stall_time = stall_time
+
+        self.channels = {
+            1: (1, "SiriusXM Preview", 0x13, "Entertainment", "Great Offer Now!", "844-711-8800"),
+            2: (2, "SiriusXM Hits 1", 0x01, "Pop", "Some Artist", "Some Song"),
+            42: (222, "The Emulated", 0x02, "Rock", "Virtual Band", "Loopback Blues")
+        }
+        self.channel = 1
+        self.powered = False
+        self.monitors = {"clock": False, "signal": False, "channel": False}
+        self.data_sid = 0
+        self.data_frame = 0
+        self.rng = random.Random(seed)
+
+        self.port = ""
+        self.master = None
+        self.slave = None
+        self.thread_signal = threading.Event()
+        self.threads = []
+        self.lock = threading.Lock()
+        self.next_free = 0
+
+        self.command_count = 0
+        self.frame_count = 0
+        self.byte_count = 0
+        self.faults = {"garbage": 0, "truncate": 0, "bad_crc": 0, "stall": 0}
+
+    def start(self) -> str:
+        """
+        Opens the pseudo-terminal and starts answering on it.
+
+        Returns:
+            str: Path of the pseudo-terminal to connect to.
+        """
+        if self.threads: return self.port
+        # Only here, so the frame builders are usable where there's no tty module
+        import tty
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        # Never block on a full line, so stopping can't hang
+        os.set_blocking(self.master, False)
+        self.port = os.ttyname(self.slave)
+        self.thread_signal.clear()
+        self.threads = [
+            threading.Thread(target=self.thread_read,name="CaniEmu",daemon=True),
+            threading.Thread(target=self.thread_stream,name="CaniEmuStream",daemon=True)
+        ]
+        for thread in self.threads:
+            thread.start()
+        return self.port
+
+    def stop(self):
+        """
+        Stops answering and closes the pseudo-terminal.
+        """
+        if not self.threads: return
+        self.thread_signal.set()
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        for fd in (self.master, self.slave):
+            os.close(fd)
+        self.master = self.slave = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def thread_read(self):
+        """
+        Main threaded instance, answering commands as they come in.
+        """
+        framer = CaniFramer()
+        while not self.thread_signal.is_set():
+            ready, _, _ = select.select([self.master], [], [], 0.1)
+            if not ready: continue
+            try:
+                chunk = os.read(self.master, 4096)
+            except (BlockingIOError, InterruptedError):
+                continue
+            except OSError:
+                # Nobody on the other end yet
+                time.sleep(0.1)
+                continue
+            for frame in framer.feed(chunk):
+                self.command_count += 1
+                for response in self.answer(framer.unwrap(frame)):
+                    self.send(response)
+
+    def thread_stream(self):
+        """
+        Main threaded instance, sending monitored events and data frames when due.
+        """
+        now = time.monotonic()
+        next_clock = next_signal = next_idle = now
+        while not self.thread_signal.is_set():
+            now = time.monotonic()
+            if self.monitors["clock"] and now >= next_clock:
+                next_clock = now + 1
+                self.send(self.clock())
+            if self.monitors["signal"] and now >= next_signal:
+                next_signal = now + 5
+                self.send(self.SIGNAL)
+            if self.model == "direct" and now >= next_idle:
+                next_idle = now + 1
+                self.send(bytes([0xF2]))
+            if self.data_sid:
+                # As fast as the line takes them, sending paces this loop
+                self.send(self.data())
+            else:
+                time.sleep(0.01)
+
+    def answer(self, command:bytes) -> list[bytes]:
+        """
+        Works out the responses to a command.
+
+        Args:
+            command (bytes): The command payload.
+
+        Returns:
+            list[bytes]: The response payloads, if any.
+        """
+        opcode = command[0]
+        arg = command[1] if len(command) > 1 else 0
+        if opcode == 0x00:
+            self.powered = True
+            return [self.STARTUP + self.radio_id]
+        if opcode == 0x01:
+            self.powered = False
+            self.monitors = dict.fromkeys(self.monitors, False)
+            self.data_sid = 0
+            return [bytes([0x81, 0x01, 0x00, 0x00])]
+        if opcode == 0x0B:
+            return [bytes([0x8B, 0x01, 0x00, arg])]
+        if opcode == 0x10:
+            return self.tune(command)
+        if opcode == 0x11:
+            return [bytes([0x91, 0x01, 0x00, arg, command[2] if len(command) > 2 else 0])]
+        if opcode == 0x13:
+            return [bytes([0x93, 0x01, 0x00, arg])]
+        if opcode == 0x22:
+            return [self.EXTINFO[:3] + bytes([arg]) + self.EXTINFO[4:]]
+        if opcode == 0x25:
+            return [self.chan_info(command)]
+        if opcode == 0x31:
+            return [bytes([0xB1, 0x01, 0x00, 0x08]) + self.radio_id]
+        if opcode == 0x42:
+            self.monitors["signal"] = bool(arg)
+            return [bytes([0xC2, 0x01, 0x00])]
+        if opcode == 0x43:
+            # Polled reports carry the status the events leave out
+            return [bytes([0xC3, 0x01, 0x00]) + self.SIGNAL[1:] + bytes(2)]
+        if opcode == 0x4E:
+            self.monitors["clock"] = bool(arg)
+            return [bytes([0xDE, 0x01, 0x00])]
+        if opcode in (0x4F, 0x50):
+            self.monitors["channel"] = bool(arg)
+            ack = bytes([opcode | 0x80, 0x01, 0x00, arg])
+            return [ack] + (self.program(arg) if arg else [])
+        if opcode == 0x60:
+            return [bytes([0xF0, 0x01, 0x00])]
+        if opcode == 0x70:
+            return [self.FIRMWARE]
+        if opcode == 0x74 and self.model == "direct":
+            return [bytes([0xF4]) + command[1:]]
+        if opcode == 0x4A and self.model == "wx":
+            if arg == 0x43:
+                return [bytes([0xCA, 0x43])]
+            if arg == 0x44:
+                return [bytes([0xCA, 0x64]) + b"1.10 A\x00"]
+            if arg == 0x10 and len(command) > 2:
+                self.data_sid = command[2]
+                return [bytes([0xCA, 0x40, 0x01, 0x00, command[2]])]
+        # Not something this radio answers
+        return []
+
+    def tune(self, command:bytes) -> list[bytes]:
+        """
+        Tunes to a channel by number or SID (10 hex), following up with program info if monitoring.
+
+        Args:
+            command (bytes): The tune command payload.
+
+        Returns:
+            list[bytes]: The tune acknowledgement (90 hex), and any program info.
+        """
+        by_sid = len(command) > 1 and command[1] == 0x01
+        target = command[2] if len(command) > 2 else 0
+        data = command[3] if len(command) > 3 else 0
+        for num, info in self.channels.items():
+            if (info[0] if by_sid else num) == target:
+                self.channel = num
+                responses = [bytes([0x90, 0x01, 0x00, info[0], num, data])]
+                if self.monitors["channel"]:
+                    responses += self.program(num)
+                return responses
+        # Not subscribed
+        return [bytes([0x90, 0x03, 0x0A, target, target, data])]
+
+    def chan_info(self, command:bytes) -> bytes:
+        """
+        Builds the channel info (A5 hex) asked for by a 25 hex command.
+        Modes are 07 by SID, 08 by number, 09 for the next channel, and 0A for the previous.
+
+        Args:
+            command (bytes): The channel info command payload.
+
+        Returns:
+            bytes: The 77-byte channel info response.
+        """
+        mode = command[1] if len(command) > 1 else 0x08
+        target = command[2] if len(command) > 2 else 0
+        nums = sorted(self.channels)
+        num = None
+        if mode == 0x07:
+            num = next((key for key, info in self.channels.items() if info[0] == target), None)
+        elif mode == 0x08:
+            num = target if target in self.channels else None
+        elif mode == 0x09:
+            num = next((key for key in nums if key > target), nums[0])
+        elif mode == 0x0A:
+            num = next((key for key in reversed(nums) if key < target), nums[-1])
+        if num is None:
+            # Channel not found
+            return bytes([0xA5, 0x03, 0x09, target, target]) + bytes(72)
+        sid, name, cat_id, cat, artist, title = self.channels[num]
+        return (
+            bytes([0xA5, 0x01, 0x00, num, sid, 0x01]) + self.label(name) +
+            bytes([0x01, cat_id]) + self.label(cat) +
+            bytes([0x01]) + self.label(artist) + self.label(title) + bytes(4)
+        )
+
+    def program(self, num:int) -> list[bytes]:
+        """
+        Builds the monitored program info of a channel (D1, D2, D3, D6 hex).
+
+        Args:
+            num (int): The channel number.
+
+        Returns:
+            list[bytes]: The channel name, category, artist and title, and program length events.
+        """
+        if num not in self.channels: return []
+        _, name, cat_id, cat, artist, title = self.channels[num]
+        return [
+            bytes([0xD1, num, 0x01]) + self.label(name) + bytes(4),
+            bytes([0xD2, num, cat_id, 0x01]) + self.label(cat),
+            bytes([0xD3, num, 0x01]) + self.label(artist) + self.label(title),
+            bytes([0xD6, num, 0x04, 0x01, 0x01, 0x29, 0x98, 0x7E, 0x15])
+        ]
+
+    @staticmethod
+    def label(text:str) -> bytes:
+        """
+        Args:
+            text (str): A display label.
+
+        Returns:
+            bytes: The label padded out to 16 characters, as the radio sends them.
+        """
+        return text.encode("latin-1")[:16].ljust(16)
+
+    @staticmethod
+    def clock() -> bytes:
+        """
+        Builds a date-time event (DF hex) for the current time.
+
+        Returns:
+            bytes: The 11-byte date-time event.
+        """
+        now = datetime.now(timezone.utc)
+        # Weekday doubled in the high nibble, days past the 15th carry into it
+        day = (now.isoweekday() << 5) | (0x10 if now.day >= 16 else 0) | (now.day % 16)
+        tick = int(now.timestamp()) & 0xFF
+        return bytes([
+            0xDF, now.year // 100, now.year % 100, now.month, day,
+            now.hour, now.minute, now.second | 0x80, 0x80, 0x00, tick
+        ])
+
+    def data(self) -> bytes:
+        """
+        Builds the next data frame (EA D0 hex) for the data SID, with made up data.
+        Every 64th frame is a short one, ending a product.
+
+        Returns:
+            bytes: The data frame.
+        """
+        frame = self.data_frame
+        self.data_frame = (frame + 1) % 256
+        length = self.FULL_FRAME if frame % 64 != 63 else self.rng.randrange(1, self.FULL_FRAME)
+        data = self.rng.randbytes(length)
+        crc = CaniWX.data_sum(data)
+        if self.bad_crc and self.rng.random() < self.bad_crc:
+            self.faults["bad_crc"] += 1
+            crc ^= 0xFFFF
+        return bytes([0xEA, 0xD0, self.data_sid, frame, 0x00, 0x00, 0x00, length, 0xF0, 0x00, crc >> 8, crc & 0xFF]) + data
+
+    def send(self, payload:bytes):
+        """
+        Wraps a response into a packet and puts it on the line, paced to the baud rate,
+        injecting faults along the way if asked to.
+
+        Args:
+            payload (bytes): The response payload.
+        """
+        packet = bytes([0x5A, 0xA5]) + len(payload).to_bytes(2, "big") + payload + bytes(2)
+        rng = self.rng
+        with self.lock:
+            if self.stall and rng.random() < self.stall:
+                self.faults["stall"] += 1
+                self.next_free = max(self.next_free, time.monotonic()) + self.stall_time
+            if self.garbage and rng.random() < self.garbage:
+                self.faults["garbage"] += 1
+                packet = rng.randbytes(rng.randrange(1, 16)) + packet
+            if self.truncate and rng.random() < self.truncate:
+                self.faults["truncate"] += 1
+                packet = packet[:rng.randrange(1, len(packet))]
+
+            now = time.monotonic()
+            if self.next_free > now:
+                time.sleep(self.next_free - now)
+            self.next_free = max(now, self.next_free) + len(packet) * 10 / self.baud
+            self.write(packet)
+            self.frame_count += 1
+            self.byte_count += len(packet)
+
+    def write(self, data:bytes):
+        """
+        Writes out to the line, waiting on it to drain if full.
+
+        Args:
+            data (bytes): The bytes to write.
+        """
+        view = memoryview(data)
+        while view and not self.thread_signal.is_set():
+            try:
+                view = view[os.write(self.master, view):]
+            except BlockingIOError:
+                # Nobody reading, wait for room
+                select.select([], [self.master], [], 0.1)
+            except OSError:
+                return
+
+    def report(self) -> str:
+        """
+        Returns:
+            str: A one-line summary of the emulator counters.
+        """
+        return (
+            f"{self.command_count} commands, {self.frame_count} frames ({self.byte_count} bytes) sent, faults " +
+            ", ".join(f"{count} {name}" for name, count in self.faults.items())
+        )
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Virtual radio on a pseudo-terminal")
+    parser.add_argument("model", nargs="?", default="pcr", choices=CaniEmu.models)
+    parser.add_argument("--baud", type=int, default=None, help="Default to 9600, or 115200 for wx")
+    for fault in ("garbage", "truncate", "bad_crc", "stall"):
+        parser.add_argument(f"--{fault.replace('_', '-')}", type=float, default=0, help="Chance per frame")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    emu = CaniEmu(
+        args.model, args.baud or (115200 if args.model == "wx" else 9600),
+        garbage=args.garbage, truncate=args.truncate, bad_crc=args.bad_crc, stall=args.stall, seed=args.seed
+    )
+    print(f"Emulating a {args.model} on {emu.start()}, Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    emu.stop()
+    print(emu.report())
@@ -0,0 +1,115 @@
+import threading
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+@dataclass(frozen=True)
+class CaniEvent:
+    """
+    A change to one of the radio state values stored by CaniPy.
+
+    Attributes:
+        kind (str): The group the value belongs to (channel, program, category, etc).
+        field (str): The CaniPy attribute that changed.
+        old: The value before the change.
+        new: The value after the change.
+        state (CaniState): The snapshot the change was made in.
+    """
+    kind: str
+    field: str
+    old: Any
+    new: Any
+    state: "CaniState" = None
+
+class CaniEvents:
+    """
+    Publishes changes to the radio state so subscribers only hear about what they need.
+    Callbacks are run on whichever thread made the change, usually the reader thread,
+    so they should be quick and hand anything heavy off elsewhere.
+
+    Attributes:
+        parent (CaniPy): A main CaniPy instance that this script will support.
+        kinds (dict): Event kinds mapped to the CaniPy attributes that raise them.
+        subscribers (dict): Event kinds mapped to their callbacks, None for every kind.
+        lock (threading.Lock): Guards subscribers while they are being changed.
+    """
+    kinds = {
+        "channel": ("ch_num", "ch_sid", "ch_name"),
+        "program": ("artist_name", "title_name"),
+        "category": ("cat_name", "cat_id"),
+        "ticker": ("ticker",),
+        "signal": ("sig_strength", "ant_strength", "ter_strength"),
+        "clock": ("sat_datetime",),
+        "radio_id": ("radio_id",),
+        "data": ("data_in_use",)
+    }
+    # Reverse lookup, attribute to kind
+    fields = {name: kind for kind, names in kinds.items() for name in names}
+
+    def __init__(self, parent:"CaniPy"):
+        self.parent = parent
+        self.subscribers = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, kind:str, callback:Callable[[CaniEvent], None]):
+        """
+        Registers a callback for a kind of change.
+
+        Example:
+            "subscribe('channel', func)" calls func with a CaniEvent whenever
+            the channel number, service ID, or name changes.
+
+        Args:
+            kind (str): The kind of change to listen for, or None for every kind.
+            callback (Callable): Function taking the CaniEvent.
+        """
+        if kind is not None and kind not in self.kinds:
+            raise ValueError(f"Unknown event kind {kind}")
+        with self.lock:
+            # Copy on write, publishing never has to lock
+            callbacks = self.subscribers.get(kind, ()) + (callback,)
+            self.subscribers = {**self.subscribers, kind: callbacks}
+
+    def unsubscribe(self, kind:str, callback:Callable[[CaniEvent], None]):
+        """
+        Removes a callback registered through subscribe.
+
+        Args:
+            kind (str): The kind of change it was listening for, or None for every kind.
+            callback (Callable): The function that was registered.
+        """
+        with self.lock:
+            callbacks = tuple(cb for cb in self.subscribers.get(kind, ()) if cb != callback)
+            self.subscribers = {**self.subscribers, kind: callbacks}
+
+    def publish(self, event:CaniEvent):
+        """
+        Hands a change over to its subscribers.
+
+        Args:
+            event (CaniEvent): The change that happened.
+        """
+        subscribers = self.subscribers
+        if not subscribers: return
+        for callback in subscribers.get(event.kind, ()) + subscribers.get(None, ()):
+            try:
+                callback(event)
+            except Exception as e:
+                # A broken subscriber shouldn't take the reader down with it
+                self.parent.logprint(f"Event subscriber failed ({type(e).__name__}: {e})")
+
+class CaniField:
+    """
+    Descriptor exposing a value of the current CaniState snapshot as a CaniPy attribute.
+    Reads come from the snapshot, writes swap in a new one through CaniPy.update_state.
+    """
+    def __set_name__(self, owner, name:str):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None: return self
+        return getattr(obj.state, self.name)
+
+    def __set__(self, obj, value):
+        obj.update_state(**{self.name: value})
@@ -0,0 +1,202 @@
+import os, queue, threading, time
+
+from datetime import date
+
+class CaniLogFile:
+    """
+    Log file sink that keeps the file open and writes from its own thread,
+    so logging a message never costs the caller more than a queue put.
+    Entries are buffered and written out once enough have piled up, once
+    a moment has passed, or when the sink is stopped.
+    The file is rotated once it grows too large, or when the day changes.
+
+    Example:
+        "canipy.logfile.enabled = True" has every message CaniPy prints
+        also land in canipy.log, "canipy.logfile.stop()" writes out the rest.
+
+    Args:
+        parent (CaniPy): A main CaniPy instance that this script will support.
+        path (str, optional): The file to log to. Default to canipy.log.
+        max_bytes (int, optional): Size the file is rotated at, 0 to never rotate by size. Default to 1 MiB.
+        backups (int, optional): Amount of rotated files kept around. Default to 3.
+        daily (bool, optional): Whether to also rotate when the day changes. Default to False.
+        flush_size (int, optional): Bytes buffered before they are written out. Default to 4 KiB.
+        flush_interval (float, optional): Most seconds an entry is buffered for. Default to 1.
+
+    Attributes:
+        enabled (bool): Whether CaniPy should write its messages here.
+        log_queue (queue.Queue): Entries waiting on the thread, alongside their time and type.
+        thread_signal (threading.Event): Prompts the threaded function to halt.
+        log_thread (threading.Thread): The actual thread entity writing the file.
+        lock (threading.Lock): Keeps the thread from being started and stopped at once.
+        file: The open log file, or None while the thread is not running.
+        file_date (date): The day the open file was started on, for daily rotation.
+
+        entry_count (int): Amount of entries written.
+        write_count (int): Amount of writes made to the file.
+        drop_count (int): Amount of entries refused as the queue was full.
+    """
+    def __init__(self, parent:"CaniPy", path:str="canipy.log", max_bytes:int=1<<20,
+                 backups:int=3, daily:bool=False, flush_size:int=4096, flush_interval:float=1.0):
+        self.parent = parent
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.daily = daily
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+
+        self.enabled = False
+        self.log_queue = queue.Queue(8192)
+        self.thread_signal = threading.Event()
+        self.log_thread = None
+        self.lock = threading.Lock()
+        self.file = None
+        self.file_date = None
+
+        self.entry_count = 0
+        self.write_count = 0
+        self.drop_count = 0
+
+    def start(self):
+        """
+        Starts the thread
+        """
+        with self.lock:
+            if self.log_thread and self.log_thread.is_alive():
+                return
+            self.thread_signal.clear()
+            self.log_thread = threading.Thread(target=self.thread_write,name="CaniLogFile",daemon=True)
+            self.log_thread.start()
+
+    def stop(self):
+        """
+        Writes out whatever is still buffered, then stops the thread and closes the file.
+        """
+        with self.lock:
+            if not self.log_thread: return
+            self.thread_signal.set()
+            self.log_thread.join()
+            self.log_thread = None
+
+    def write(self, msgtype:str, msg:str):
+        """
+        Queues an entry for the log file, starting the thread if it isn't running yet.
+        Never blocks the caller, entries are dropped if the thread can't keep up.
+
+        Args:
+            msgtype (str): Short tag for the kind of message (INF, WRN, ERR, DBG).
+            msg (str): The message to log.
+        """
+        if not (self.log_thread and self.log_thread.is_alive()):
+            self.start()
+        try:
+            # Time is taken now, the thread may get to it much later
+            self.log_queue.put_nowait((self.parent.sat_datetime, msgtype, msg))
+        except queue.Full:
+            self.drop_count += 1
+
+    def thread_write(self):
+        """
+        Main threaded instance, writing queued entries out to the file.
+        """
+        buffer = []
+        size = 0
+        last_flush = time.monotonic()
+        while True:
+            stopping = self.thread_signal.is_set()
+            try:
+                entry = self.log_queue.get(timeout=0 if stopping else self.flush_interval)
+            except queue.Empty:
+                entry = None
+            else:
+                sat_datetime, msgtype, msg = entry
+                line = f"[{sat_datetime}] [{msgtype}] {repr(msg)}\n"
+                buffer.append(line)
+                size += len(line)
+
+            if buffer and (
+                entry is None or size >= self.flush_size
+                or time.monotonic() - last_flush >= self.flush_interval
+            ):
+                self.flush(buffer, size)
+                buffer = []
+                size = 0
+                last_flush = time.monotonic()
+
+            # Only leave once everything queued is written
+            if stopping and entry is None: break
+
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def flush(self, lines:list[str], size:int):
+        """
+        Writes buffered entries out to the file, rotating it first if needed.
+
+        Args:
+            lines (list[str]): Formatted entries.
+            size (int): Total length of the entries.
+        """
+        try:
+            if self.file is None:
+                self.file = open(self.path, "a")
+                self.file_date = date.today()
+            if self.should_rotate(size):
+                self.rotate()
+            self.file.write("".join(lines))
+            self.file.flush()
+        except OSError:
+            # Not much to be done if the file is unavailable,
+            # this is where errors would have been logged to
+            if self.file:
+                self.file.close()
+                self.file = None
+            self.drop_count += len(lines)
+            return
+        self.write_count += 1
+        self.entry_count += len(lines)
+
+    def should_rotate(self, size:int) -> bool:
+        """
+        Args:
+            size (int): Amount of bytes about to be written.
+
+        Returns:
+            bool: Whether the open file should be rotated before writing.
+        """
+        if self.daily and date.today() != self.file_date:
+            return True
+        position = self.file.tell()
+        # A batch bigger than max_bytes goes into an empty file as is,
+        # rotating it away would only churn through the backups
+        return bool(self.max_bytes) and position > 0 and position + size > self.max_bytes
+
+    def rotate(self):
+        """
+        Closes the open file and shifts it into the backups (canipy.log.1, canipy.log.2, etc),
+        or names it after its day when rotating daily, before starting a new one.
+        """
+        self.file.close()
+        if self.daily and date.today() != self.file_date:
+            os.replace(self.path, f"{self.path}.{self.file_date.isoformat()}")
+        elif self.backups:
+            for num in range(self.backups - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{num}"):
+                    os.replace(f"{self.path}.{num}", f"{self.path}.{num+1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.file = open(self.path, "a")
+        self.file_date = date.today()
+
+    def report(self) -> str:
+        """
+        Returns:
+            str: A one-line summary of the log file counters.
+        """
+        return (
+            f"{self.entry_count} entries in {self.write_count} writes, "
+            f"{self.log_queue.qsize()} queued, {self.drop_count} dropped"
+        )
@@ -0,0 +1,536 @@
+import os, threading, time
+
+from bisect import bisect_left
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SECOND = 1_000_000_000
+
+class CaniCounter:
+    """
+    A count that only ever goes up.
+    Counts kept elsewhere can be read through a function instead of counting here,
+    so the hot path doesn't pay for them twice.
+
+    Args:
+        name (str): Name the count is exposed under, without the "_total" suffix.
+        help (str): A line describing the count.
+        func (Callable, optional): Reads the count, or a dict of label values mapped to counts. Default to None.
+        label (str, optional): Label name when func gives a dict. Default to None.
+
+    Attributes:
+        value (int): The count, when not read through func.
+    """
+    kind = "counter"
+
+    def __init__(self, name:str, help:str, func:Callable=None, label:str=None):
+        self.name = name
+        self.help = help
+        self.func = func
+        self.label = label
+        self.value = 0
+
+    def inc(self, amount:int=1):
+        """
+        Adds to the count.
+
+        Args:
+            amount (int, optional): How much to add. Default to 1.
+        """
+        self.value += amount
+
+    def snapshot(self):
+        """
+        Returns:
+            The count, or a dict of label values mapped to counts.
+        """
+        return self.func() if self.func else self.value
+
+    def expose(self) -> list[str]:
+        """
+        Returns:
+            list[str]: Lines in the text exposition format.
+        """
+        return expose_lines(f"{self.name}_total", self.help, "counter", self.snapshot(), self.label)
+
+class CaniGauge(CaniCounter):
+    """
+    A value that can go up and down, such as a queue depth.
+    Same as a counter otherwise, it is usually read through a function.
+    """
+    kind = "gauge"
+
+    def set(self, value:float):
+        """
+        Args:
+            value (float): The new value.
+        """
+        self.value = value
+
+    def expose(self) -> list[str]:
+        return expose_lines(self.name, self.help, "gauge", self.snapshot(), self.label)
+
+class CaniRate:
+    """
+    A count over a sliding window, kept in one slot per second of monotonic time,
+    giving both a running total and a per second rate that follows recent traffic.
+    The second in progress is left out of the rate, as it's only partly counted.
+
+    Example:
+        After "rate.add(200)" once a second for a minute, "rate.rate()" gives 200.
+
+    Args:
+        name (str): Name the count is exposed under, without a suffix.
+        help (str): A line describing what is counted.
+        window (int, optional): Seconds the rate is taken over. Default to 60.
+
+    Attributes:
+        slots (list[int]): Amount counted per second, wrapping around the window.
+        slot (int): The second last counted into.
+        first (int): The second counting started at.
+        total (int): Amount counted overall.
+        lock (threading.Lock): Guards the slots, in case counting comes from several threads.
+    """
+    kind = "rate"
+
+    def __init__(self, name:str, help:str, window:int=60):
+        self.name = name
+        self.help = help
+        self.window = window
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Clears the window and the total.
+        """
+        now = time.monotonic_ns() // SECOND
+        with self.lock:
+            self.slots = [0] * self.window
+            self.slot = self.first = now
+            self.total = 0
+
+    def advance(self, now:int):
+        """
+        Clears any slots passed over since the last second counted into.
+        Expected to be called with the lock held.
+
+        Args:
+            now (int): The current second.
+        """
+        for slot in range(max(self.slot + 1, now - self.window + 1), now + 1):
+            self.slots[slot % self.window] = 0
+        self.slot = now
+
+    def add(self, amount:int=1):
+        """
+        Counts into the current second.
+
+        Args:
+            amount (int, optional): How much to count. Default to 1.
+        """
+        now = time.monotonic_ns() // SECOND
+        with self.lock:
+            if now != self.slot: self.advance(now)
+            self.slots[now % self.window] += amount
+            self.total += amount
+
+    def rate(self) -> float:
+        """
+        Returns:
+            float: Amount counted per second, over the window or however long counting went on for.
+        """
+        now = time.monotonic_ns() // SECOND
+        with self.lock:
+            if now != self.slot: self.advance(now)
+            counted = sum(self.slots) - self.slots[now % self.window]
+        span = min(self.window - 1, now - self.first)
+        return counted / span if span > 0 else 0.0
+
+    def snapshot(self) -> tuple:
+        """
+        Returns:
+            tuple: The total and the per second rate.
+        """
+        return self.total, self.rate()
+
+    def expose(self) -> list[str]:
+        total, rate = self.snapshot()
+        return (
+            expose_lines(f"{self.name}_total", self.help, "counter", total) +
+            expose_lines(f"{self.name}_per_second", f"{self.help}, per second over {self.window}s", "gauge", rate)
+        )
+
+class CaniHistogram(CaniRate):
+    """
+    Latencies over a sliding window, counted into fixed buckets per second of monotonic time.
+    Latencies are taken in nanoseconds and exposed in seconds.
+
+    Example:
+        "histogram.quantile(0.99)" gives the bucket bound 99% of the latencies
+        added within the window fell under.
+
+    Args:
+        name (str): Name the latencies are exposed under.
+        help (str): A line describing what is timed.
+        bounds (tuple[int], optional): Upper bucket bounds in nanoseconds. Default to 1us through 1s.
+        window (int, optional): Seconds the latencies are kept for. Default to 60.
+
+    Attributes:
+        slots (list[list[int]]): Per second bucket counts, followed by the sum of latencies.
+        total (int): Amount of latencies added overall.
+    """
+    kind = "histogram"
+    BOUNDS = (
+        1_000, 5_000, 10_000, 50_000, 100_000, 500_000,
+        1_000_000, 5_000_000, 10_000_000, 50_000_000, 100_000_000, 500_000_000, SECOND
+    )
+
+    def __init__(self, name:str, help:str, bounds:tuple=BOUNDS, window:int=60):
+        self.bounds = bounds
+        super().__init__(name, help, window)
+
+    def reset(self):
+        now = time.monotonic_ns() // SECOND
+        with self.lock:
+            # One more bucket for anything past the last bound, then the sum
+            self.slots = [[0] * (len(self.bounds) + 2) for _ in range(self.window)]
+            self.slot = self.first = now
+            self.total = 0
+
+    def advance(self, now:int):
+        for slot in range(max(self.slot + 1, now - self.window + 1), now + 1):
+            counts = self.slots[slot % self.window]
+            counts[:] = [0] * len(counts)
+        self.slot = now
+
+    def add(self, elapsed:int):
+        """
+        Counts a latency into the current second.
+
+        Args:
+            elapsed (int): The latency in nanoseconds.
+        """
+        bucket = bisect_left(self.bounds, elapsed)
+        now = time.monotonic_ns() // SECOND
+        with self.lock:
+            if now != self.slot: self.advance(now)
+            counts = self.slots[now % self.window]
+            counts[bucket] += 1
+            counts[-1] += elapsed
+            self.total += 1
+
+    def snapshot(self) -> tuple:
+        """
+        Returns:
+            tuple: The bucket counts within the window (the last being past every bound),
+                and the sum of latencies in nanoseconds.
+        """
+        now = time.monotonic_ns() // SECOND
+        with self.lock:
+            if now != self.slot: self.advance(now)
+            summed = [sum(column) for column in zip(*self.slots)]
+        return summed[:-1], summed[-1]
+
+    def quantile(self, q:float) -> int:
+        """
+        Args:
+            q (float): The quantile, 0.5 for the median.
+
+        Returns:
+            int: Upper bound in nanoseconds of the bucket the quantile falls in,
+                the largest bound if past every bound, or 0 if nothing is in the window.
+        """
+        counts, _ = self.snapshot()
+        total = sum(counts)
+        if not total: return 0
+        running = 0
+        for bucket, count in enumerate(counts):
+            running += count
+            if running >= q * total:
+                return self.bounds[min(bucket, len(self.bounds) - 1)]
+        return self.bounds[-1]
+
+    def rate(self) -> float:
+        counts, _ = self.snapshot()
+        return sum(counts) / self.window
+
+    def expose(self) -> list[str]:
+        counts, summed = self.snapshot()
+        lines = [f"# HELP {self.name} {self.help}, over the last {self.window}s", f"# TYPE {self.name} histogram"]
+        running = 0
+        for bound, count in zip(self.bounds, counts):
+            running += count
+            lines.append(f'{self.name}_bucket{{le="{bound/SECOND:g}"}} {running}')
+        running += counts[-1]
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {running}')
+        lines.append(f"{self.name}_sum {summed/SECOND:g}")
+        lines.append(f"{self.name}_count {running}")
+        return lines
+
+def expose_lines(name:str, help:str, kind:str, value, label:str=None) -> list[str]:
+    """
+    Formats a single metric in the text exposition format.
+
+    Args:
+        name (str): Name to expose under.
+        help (str): A line describing the metric.
+        kind (str): Type of the metric (counter, gauge).
+        value: The value, or a dict of label values mapped to values.
+        label (str, optional): Label name when value is a dict. Default to None.
+
+    Returns:
+        list[str]: The HELP, TYPE, and sample lines.
+    """
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    if isinstance(value, dict):
+        lines.extend(f'{name}{{{label}="{key}"}} {val:g}' for key, val in value.items())
+    else:
+        lines.append(f"{name} {value:g}")
+    return lines
+
+class CaniMetrics:
+    """
+    Registry of link metrics, timed on the monotonic clock so they're unaffected by
+    the wall clock being set. Counts already kept by the framer, writer, conductor,
+    lanes, and data pipeline are read only when asked for, so keeping metrics only
+    costs the hot path the few rates and latencies counted here.
+    Everything can be read through a cheap snapshot, or as text in the Prometheus
+    exposition format, written to a file or served on a local port.
+
+    Example:
+        "canipy.metrics.serve(9464)" exposes the metrics on http://127.0.0.1:9464/metrics,
+        "canipy.metrics.export('canipy.prom')" rewrites the file every 10 seconds,
+        and "canipy.metrics.utilisation()" gives the share of the baud rate in use.
+
+    Args:
+        parent (CaniPy): A main CaniPy instance that this script will support.
+        window (int, optional): Seconds rates and latencies are taken over. Default to 60.
+
+    Attributes:
+        metrics (dict): Exposed names mapped to their metric, in order of registration.
+        rx_bytes (CaniRate): Bytes read from the port.
+        rx_frames (CaniRate): Packets framed out of what was read.
+        tx_bytes (CaniRate): Bytes written to the port.
+        data_bytes (CaniRate): Data bytes kept from verified data frames.
+        clock_events (CaniRate): Clock events received.
+        crc_failures (CaniCounter): Data frames failing their sum.
+        dispatch_wait (CaniHistogram): Time responses waited in the lanes.
+        handler_time (CaniHistogram): Time spent handling responses.
+
+        thread_signal (threading.Event): Prompts the export thread to halt.
+        export_thread (threading.Thread): The thread entity rewriting the metrics file.
+        server (ThreadingHTTPServer): The local endpoint, while serving.
+    """
+    def __init__(self, parent:"CaniPy", window:int=60):
+        self.parent = parent
+        self.window = window
+        self.metrics = {}
+
+        self.rx_bytes = self.register(CaniRate("canipy_rx_bytes", "Bytes read from the port", window))
+        self.rx_frames = self.register(CaniRate("canipy_rx_frames", "Packets framed out of what was read", window))
+        self.tx_bytes = self.register(CaniRate("canipy_tx_bytes", "Bytes written to the port", window))
+        self.data_bytes = self.register(CaniRate("canipy_data_bytes", "Data bytes kept from verified data frames", window))
+        self.clock_events = self.register(CaniRate("canipy_clock_events", "Clock events received", window))
+        self.crc_failures = self.register(CaniCounter("canipy_crc_failures", "Data frames failing their sum"))
+        self.dispatch_wait = self.register(CaniHistogram(
+            "canipy_dispatch_wait_seconds", "Time responses waited in the lanes", window=window
+        ))
+        self.handler_time = self.register(CaniHistogram(
+            "canipy_handler_seconds", "Time spent handling responses", window=window
+        ))
+
+        # Read from counts kept elsewhere
+        self.register(CaniCounter(
+            "canipy_frames", "Responses handled per opcode", label="opcode",
+            func=lambda: {f"{op:02X}": hits for op, hits in enumerate(parent.conductor.hits) if hits}
+        ))
+        self.register(CaniCounter(
+            "canipy_framing_errors", "Times bytes were skipped to find a header",
+            func=lambda: parent.thread.framer.error_count
+        ))
+        self.register(CaniCounter(
+            "canipy_framing_skipped_bytes", "Bytes thrown away while looking for a header",
+            func=lambda: parent.thread.framer.skip_count
+        ))
+        self.register(CaniCounter(
+            "canipy_dropped", "Responses, frames, and commands dropped as a queue was full", label="queue",
+            func=lambda: {
+                **dict(zip(parent.lanes.names, parent.lanes.drops)),
+                "wx": parent.wx.pipeline.drop_count,
+                "tx": parent.writer.drop_count
+            }
+        ))
+        self.register(CaniGauge(
+            "canipy_queue_depth", "Amount waiting per queue", label="queue",
+            func=lambda: {
+                **dict(zip(parent.lanes.names, parent.lanes.depth())),
+                "wx": parent.wx.pipeline.depth(),
+                "tx": parent.writer.depth(),
+                "log": parent.logfile.log_queue.qsize()
+            }
+        ))
+        self.register(CaniGauge(
+            "canipy_link_utilisation", "Share of the baud rate in use per direction", label="direction",
+            func=lambda: {"rx": self.utilisation(self.rx_bytes), "tx": self.utilisation(self.tx_bytes)}
+        ))
+        self.register(CaniGauge("canipy_baud_rate", "Configured baud rate", func=lambda: parent.baud_rate))
+
+        self.thread_signal = threading.Event()
+        self.export_thread = None
+        self.server = None
+
+    def register(self, metric):
+        """
+        Adds a metric to the registry, to be included in snapshots and the exposition.
+
+        Args:
+            metric: A CaniCounter, CaniGauge, CaniRate, or CaniHistogram.
+
+        Returns:
+            The metric that was added.
+        """
+        self.metrics[metric.name] = metric
+        return metric
+
+    def utilisation(self, rate:CaniRate=None) -> float:
+        """
+        Compares the bytes per second of a direction against the configured baud rate.
+        Each byte takes 10 bits on the wire, with its start and stop bits.
+
+        Args:
+            rate (CaniRate, optional): Bytes to compare. Default to rx_bytes.
+
+        Returns:
+            float: The share of the baud rate in use, 1 being saturated.
+        """
+        rate = rate or self.rx_bytes
+        return rate.rate() * 10 / self.parent.baud_rate if self.parent.baud_rate else 0.0
+
+    def reset(self):
+        """
+        Clears the rates and latencies counted here.
+        """
+        for metric in self.metrics.values():
+            if isinstance(metric, CaniRate):
+                metric.reset()
+            elif metric.func is None:
+                metric.value = 0
+
+    def snapshot(self) -> dict:
+        """
+        Reads every metric at once.
+
+        Returns:
+            dict: Exposed names mapped to their current value (see each metric's snapshot).
+        """
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def exposition(self) -> str:
+        """
+        Returns:
+            str: Every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in self.metrics.values():
+            try:
+                lines.extend(metric.expose())
+            except Exception as e:
+                # A metric that can't be read shouldn't take the rest with it
+                lines.append(f"# {metric.name} unavailable ({type(e).__name__})")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path:str="canipy.prom"):
+        """
+        Writes the exposition to a file, swapped in whole so readers never see it half written.
+
+        Args:
+            path (str, optional): The file to write. Default to canipy.prom.
+        """
+        temp = f"{path}.tmp"
+        try:
+            with open(temp, "w") as file:
+                file.write(self.exposition())
+            os.replace(temp, path)
+        except OSError as e:
+            if self.parent.verbose:
+                self.parent.logprint(f"Metrics not written ({type(e).__name__})")
+
+    def export(self, path:str="canipy.prom", interval:float=10):
+        """
+        Starts rewriting the metrics file every so often, such as for a node exporter's textfile collector.
+
+        Args:
+            path (str, optional): The file to write. Default to canipy.prom.
+            interval (float, optional): Seconds between writes. Default to 10.
+        """
+        if self.export_thread and self.export_thread.is_alive():
+            return
+        self.thread_signal.clear()
+        self.export_thread = threading.Thread(
+            target=self.thread_export,args=(path, interval),name="CaniMetrics",daemon=True
+        )
+        self.export_thread.start()
+
+    def thread_export(self, path:str, interval:float):
+        """
+        Main threaded instance, rewriting the metrics file until halted.
+
+        Args:
+            path (str): The file to write.
+            interval (float): Seconds between writes.
+        """
+        while not self.thread_signal.wait(interval):
+            self.write(path)
+        # Last one on the way out
+        self.write(path)
+
+    def serve(self, port:int=9464, host:str="127.0.0.1"):
+        """
+        Serves the exposition over HTTP, only on the local machine unless told otherwise.
+
+        Args:
+            port (int, optional): The port to listen on. Default to 9464.
+            host (str, optional): The address to listen on. Default to 127.0.0.1.
+        """
+        if self.server: return
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.exposition().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Keep scrapes out of the log
+                pass
+
+        try:
+            self.server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            self.parent.errorprint(f"Metrics endpoint unavailable ({type(e).__name__}: {e})")
+            return
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever,name="CaniMetricsServer",daemon=True).start()
+        if self.parent.verbose:
+            self.parent.logprint(f"Metrics served on http://{host}:{port}/metrics")
+
+    def stop(self):
+        """
+        Stops the export thread and the endpoint, if running.
+        """
+        if self.export_thread:
+            self.thread_signal.set()
+            self.export_thread.join()
+            self.export_thread = None
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
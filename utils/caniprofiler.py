@@ -0,0 +1,287 @@
+import cProfile, pstats, threading, time
+
+from collections import deque
+
+class CaniProfiler:
+    """
+    Opt-in profiling of the receive path, to find out where the time goes when the reader falls behind.
+    Every frame is timed at arrival (the read returning), at framing, at dispatch start,
+    and at handler end, keeping recent latencies per opcode for percentiles.
+    Handlers going over their budget are counted and warned about.
+
+    Nothing is hooked while disabled. Enabling it swaps timed wrappers in place of
+    the reader's, dispatcher's, and conductor's methods on those instances only,
+    and disabling it takes them back out, so the receive path is untouched when off.
+
+    Example:
+        "canipy.profiler.enable()", then "canipy.profiler.report()" a while later gives
+        per-opcode percentiles, and "canipy.profiler.capture(10)" writes a cProfile
+        capture of the next 10 seconds to canipy.prof, readable with pstats or snakeviz.
+
+    Args:
+        parent (CaniPy): A main CaniPy instance that this script will support.
+        budget (int, optional): Nanoseconds a handler may take before it is flagged. Default to 1ms.
+        samples (int, optional): Latencies kept per opcode and stage for percentiles. Default to 1024.
+        warn_interval (float, optional): Least seconds between warnings for the same opcode. Default to 10.
+
+    Attributes:
+        enabled (bool): Whether the wrappers are in place.
+        budgets (dict): Opcodes mapped to their own budget in nanoseconds, overriding the default.
+        handler (dict): Opcodes mapped to recent nanoseconds from dispatch start to handler end.
+        total (dict): Opcodes mapped to recent nanoseconds from framing to handler end.
+        stages (dict): Stage names (read, framing, wait) mapped to recent nanoseconds.
+            Read includes waiting on the port, framing is per read rather than per frame.
+        over (dict): Opcodes mapped to the amount of times their handler went over budget.
+        next_warn (dict): Opcodes mapped to the monotonic time they may next be warned about.
+        local (threading.local): Stamps handed between wrappers of the same thread.
+
+        profile (cProfile.Profile): The profile shared by every thread while capturing.
+        profiled_calls (int): Amount of calls that made it into the capture.
+        capture_path (str): The file the capture is written to.
+        capture_end (float): Monotonic time the capture stops at, 0 when not capturing.
+        timer (threading.Timer): Finishes the capture once its time is up.
+        lock (threading.Lock): Guards the capture, as it is finished from whichever thread gets there first.
+            Also held around profiled calls, so threads take turns with the profile.
+    """
+    def __init__(self, parent:"CaniPy", budget:int=1_000_000, samples:int=1024, warn_interval:float=10):
+        self.parent = parent
+        self.budget = budget
+        self.samples = samples
+        self.warn_interval = warn_interval
+
+        self.enabled = False
+        self.budgets = {}
+        self.local = threading.local()
+        self.profile = None
+        self.profiled_calls = 0
+        self.timer = None
+        self.capture_path = "canipy.prof"
+        self.capture_end = 0
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Clears the latencies and budget counts.
+        """
+        self.handler = {}
+        self.total = {}
+        self.stages = {stage: deque(maxlen=self.samples) for stage in ("read", "framing", "wait")}
+        self.over = {}
+        self.next_warn = {}
+
+    def enable(self):
+        """
+        Puts the timed wrappers in place.
+        """
+        if self.enabled: return
+        thread, lanes, conductor = self.parent.thread, self.parent.lanes, self.parent.conductor
+        # Bound now, so the wrappers call the real methods
+        buffer, frames, take, go = thread.thread_buffer, thread.thread_frames, lanes.take, conductor.go
+
+        def timed_buffer():
+            self.local.called = time.perf_counter_ns()
+            # Not profiled, the read mostly waits on the port
+            return buffer()
+
+        def timed_frames(chunk, framer=None):
+            arrived = time.perf_counter_ns()
+            called = getattr(self.local, "called", None)
+            if called is not None:
+                self.stages["read"].append(arrived - called)
+                self.local.called = None
+            payloads = self.profiled(frames, chunk, framer)
+            self.stages["framing"].append(time.perf_counter_ns() - arrived)
+            return payloads
+
+        def timed_take():
+            taken = take()
+            if taken is not None:
+                self.local.queued = taken[2]
+                self.stages["wait"].append(time.perf_counter_ns() - taken[2])
+            return taken
+
+        def timed_go(payload):
+            start = time.perf_counter_ns()
+            # Frames dispatched straight from the reader never queued
+            queued = getattr(self.local, "queued", None) or start
+            self.local.queued = None
+            self.profiled(go, payload)
+            self.record(payload[0], start, queued, time.perf_counter_ns())
+
+        thread.thread_buffer = timed_buffer
+        thread.thread_frames = timed_frames
+        lanes.take = timed_take
+        conductor.go = timed_go
+        self.enabled = True
+        if self.parent.verbose:
+            self.parent.logprint("Profiler enabled")
+
+    def disable(self):
+        """
+        Takes the timed wrappers back out, finishing any capture.
+        The lanes dispatcher picks up the change on its next response.
+        """
+        if not self.enabled: return
+        for owner, name in (
+            (self.parent.thread, "thread_buffer"),
+            (self.parent.thread, "thread_frames"),
+            (self.parent.lanes, "take"),
+            (self.parent.conductor, "go")
+        ):
+            owner.__dict__.pop(name, None)
+        self.enabled = False
+        self.finish_capture()
+        if self.parent.verbose:
+            self.parent.logprint("Profiler disabled")
+
+    def record(self, opcode:int, start:int, queued:int, end:int):
+        """
+        Keeps the latencies of a handled frame, flagging it if over budget.
+
+        Args:
+            opcode (int): The opcode of the frame.
+            start (int): Nanoseconds the dispatch started at.
+            queued (int): Nanoseconds the frame was queued at after framing.
+            end (int): Nanoseconds the handler ended at.
+        """
+        elapsed = end - start
+        handler = self.handler.get(opcode)
+        if handler is None:
+            handler = self.handler[opcode] = deque(maxlen=self.samples)
+            self.total[opcode] = deque(maxlen=self.samples)
+        handler.append(elapsed)
+        self.total[opcode].append(end - queued)
+
+        budget = self.budgets.get(opcode, self.budget)
+        if elapsed <= budget: return
+        self.over[opcode] = self.over.get(opcode, 0) + 1
+        now = time.monotonic()
+        if now < self.next_warn.get(opcode, 0): return
+        self.next_warn[opcode] = now + self.warn_interval
+        name = getattr(self.parent.conductor.handlers[opcode], "__qualname__", "handler")
+        # Logged rather than warned, a popup from the dispatcher would only make it worse
+        self.parent.logprint(
+            f"{name} ({opcode:02X}) took {elapsed/1e6:.2f}ms, over its {budget/1e6:.2f}ms budget "
+            f"({self.over[opcode]} times so far)"
+        )
+
+    def capture(self, seconds:float=10, path:str="canipy.prof"):
+        """
+        Runs cProfile over the reader, dispatcher, and handlers for a while,
+        enabling the profiler if it isn't already.
+        There's a single profile the threads take turns with, as only one profiler
+        may be active at once on Python 3.12 and up. The reader and dispatcher
+        wait on each other while capturing, so latencies run high in the meantime.
+        A capture still going is replaced.
+
+        Args:
+            seconds (float, optional): How long to capture for. Default to 10.
+            path (str, optional): The file to write the capture to. Default to canipy.prof.
+        """
+        self.enable()
+        with self.lock:
+            # An earlier timer would cut this capture short
+            if self.timer: self.timer.cancel()
+            self.profile = cProfile.Profile()
+            self.profiled_calls = 0
+            self.capture_path = path
+            self.capture_end = time.monotonic() + seconds
+            # Nothing may arrive to finish it otherwise
+            self.timer = threading.Timer(seconds, self.finish_capture, kwargs={"end": self.capture_end})
+            self.timer.daemon = True
+            self.timer.start()
+        if self.parent.verbose:
+            self.parent.logprint(f"Capturing a profile for {seconds:g}s")
+
+    def profiled(self, func, *args):
+        """
+        Calls a wrapped method, under cProfile if capturing.
+
+        Args:
+            func (Callable): The method to call.
+            *args: Arguments to call it with.
+
+        Returns:
+            Whatever the method returns.
+        """
+        if not self.capture_end:
+            return func(*args)
+        if time.monotonic() >= self.capture_end:
+            self.finish_capture()
+            return func(*args)
+        with self.lock:
+            profile = self.profile
+            if profile is not None:
+                try:
+                    profile.enable()
+                except ValueError:
+                    # Something else is profiling, leave it be
+                    profile = None
+            if profile is not None:
+                self.profiled_calls += 1
+                try:
+                    return func(*args)
+                finally:
+                    profile.disable()
+        return func(*args)
+
+    def finish_capture(self, end:float=None):
+        """
+        Stops capturing, writing out the capture file.
+
+        Args:
+            end (float, optional): Only stop the capture ending at this monotonic time,
+                so a timer going off late leaves a newer capture be. Default to None, any capture.
+        """
+        with self.lock:
+            if not self.capture_end: return
+            if end is not None and end != self.capture_end: return
+            self.capture_end = 0
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+            profile, self.profile = self.profile, None
+            if not self.profiled_calls:
+                self.parent.logprint("Nothing was captured")
+                return
+            try:
+                pstats.Stats(profile).dump_stats(self.capture_path)
+            except (OSError, TypeError) as e:
+                self.parent.logprint(f"Profile not written ({type(e).__name__})")
+                return
+        self.parent.logprint(f"Profile written to {self.capture_path}")
+
+    @staticmethod
+    def percentiles(samples, points:tuple=(0.5, 0.9, 0.99)) -> list[int]:
+        """
+        Args:
+            samples: Latencies in nanoseconds.
+            points (tuple[float], optional): Percentiles to take. Default to 50th, 90th, and 99th.
+
+        Returns:
+            list[int]: The latency at each percentile, followed by the largest, or nothing if no samples.
+        """
+        ordered = sorted(samples)
+        if not ordered: return []
+        return [ordered[min(int(point * len(ordered)), len(ordered) - 1)] for point in points] + [ordered[-1]]
+
+    def report(self) -> list[str]:
+        """
+        Summarizes recent latencies per stage, then per opcode, slowest handler first.
+
+        Returns:
+            list[str]: One line per stage and per opcode that was seen.
+        """
+        def spread(samples):
+            p50, p90, p99, peak = self.percentiles(samples)
+            return f"p50 {p50/1e3:.1f}us p90 {p90/1e3:.1f}us p99 {p99/1e3:.1f}us max {peak/1e3:.1f}us"
+
+        lines = [f"{stage}: {spread(samples)}" for stage, samples in self.stages.items() if samples]
+        for opcode in sorted(self.handler, key=lambda op: -max(self.handler[op])):
+            lines.append(
+                f"{opcode:02X}: handler {spread(self.handler[opcode])}, "
+                f"framed to handled {spread(self.total[opcode])}"
+                f"{f', {self.over[opcode]} over budget' if opcode in self.over else ''}"
+            )
+        return lines
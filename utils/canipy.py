@@ -1,10 +1,16 @@
-import serial
+import serial, threading
 
-from datetime import datetime, timezone
+from dataclasses import fields, replace
 
 from collections.abc import Callable
 
-from .comm import CaniRX, CaniTX, CaniConductor, CaniThread, CaniDX, CaniWX
+from .canievents import CaniEvent, CaniEvents, CaniField
+from .canicapture import CaniCapture
+from .canilog import CaniLogFile
+from .canimetrics import CaniMetrics
+from .caniprofiler import CaniProfiler
+from .canistate import CaniState
+from .comm import CaniRX, CaniTX, CaniConductor, CaniThread, CaniDX, CaniWX, CaniReply, CaniWriter, CaniLanes
 
 class CaniPy:
     """
@@ -23,6 +29,10 @@ class CaniPy:
         baud_rate (int): Indicates the assigned/active serial baud rate.
 
         verbose (bool): Toggle for identifying whether to display additional information for debugging purposes.
+        clock_logging (bool): Toggle for printing out every date-time response.
+        data_logging (bool): Toggle for printing out every data frame.
+        signal_logging (bool): Toggle for printing out signal reports.
+        program_logging (bool): Toggle for printing out channel, category, and program info.
 
         ch_num (int): Assigned/display number for the currently tuned channel.
         ch_sid (int): Raw ID for the currently tuned channel, relative to its place in the satellite feed.
@@ -48,13 +58,24 @@ class CaniPy:
 
         direct_idleframes (int): Counter for every time the Direct reports F2 hex.
 
+        state (CaniState): Snapshot holding the display values above, swapped in whole on every change.
+        state_lock (threading.Lock): Serializes writers of the state, readers never need it.
+        events (CaniEvents): Publishes changes to the display values above to subscribers.
+
         rx (CaniRX): Functions related to receipt of responses.
         tx (CaniTX): Functions related to transmission of commands.
         dx (CaniDX): Functions related to Direct receiver commands.
         wx (CaniWX): Functions related to data commands, notably to weather data receivers.
         conductor (CaniConductor): Relays received responses to corresponding functions.
+        reply (CaniReply): Hands out futures for responses to commands that were sent.
 
         thread (CaniThread): Threaded instance reading the port for responses from the radio.
+        lanes (CaniLanes): Threaded instance dispatching responses to the conductor by priority.
+        writer (CaniWriter): Threaded instance writing queued commands out to the port.
+        logfile (CaniLogFile): Buffered log file, written to by the prints below when enabled.
+        metrics (CaniMetrics): Link metrics such as bytes, frames, and queue depths, exposable as text.
+        profiler (CaniProfiler): Opt-in timing of the receive path per stage and opcode, off by default.
+        capture (CaniCapture): Opt-in recording of every frame sent and received into a binary capture.
 
         gui: A referenced subsystem class for directing output to it instead of a terminal.
 
@@ -64,7 +85,29 @@ class CaniPy:
         set_port(): Set up a new connection, only changing the serial device path.
         set_baud(): Set up a new connection, only changing the baud rate.
     """
+    # Display values, read from and written to the current state snapshot.
+    # Every change is published through events.
+    ch_num = CaniField()
+    ch_sid = CaniField()
+    ch_name = CaniField()
+    artist_name = CaniField()
+    title_name = CaniField()
+    cat_name = CaniField()
+    cat_id = CaniField()
+    ticker = CaniField()
+    sig_strength = CaniField()
+    ant_strength = CaniField()
+    ter_strength = CaniField()
+    sat_datetime = CaniField()
+    data_in_use = CaniField()
+    radio_id = CaniField()
+
     def __init__(self, port:str="", baud:int=9600, gui=None):
+        # Set up first, the display values live in here
+        self.state = CaniState()
+        self.state_lock = threading.Lock()
+        self.events = CaniEvents(self)
+
         self.header = bytes([0x5A, 0xA5])
         self.tail = bytes([0xED, 0xED])
 
@@ -75,35 +118,15 @@ class CaniPy:
         self.verbose = False
         self.clock_logging = False
         self.data_logging = False
-
-        # Audio and signal info
-        # Assume radios start at 0
-        self.ch_num = 0
-        self.ch_sid = 0
-        self.ch_name = ""
-
-        self.artist_name = ""
-        self.title_name = ""
-
-        self.cat_name = ""
-        self.cat_id = 0
-
-        self.ticker = ""
-
-        self.sig_strength = -1
-        self.ant_strength = -1
-        self.ter_strength = -1
-
-        # Assume minimum date value means not set
-        self.sat_datetime = datetime(1900,1,1,tzinfo=timezone.utc)
-
-        self.data_in_use = False
-
-        self.radio_id = ""
+        # Chattier categories, on unless asked otherwise
+        self.signal_logging = True
+        self.program_logging = True
 
         self.direct_idleframes = 0
 
         self.serial_conn = None
+        # Counted into from the threads below
+        self.metrics = CaniMetrics(self)
 
         self.set_port = lambda new_port: self.open(new_port, self.baud_rate)
         self.set_baud:Callable[[int], None] = lambda new_baud: self.open(self.port_name, new_baud)
@@ -113,8 +136,14 @@ class CaniPy:
         self.dx = CaniDX(self)
         self.wx = CaniWX(self)
         self.conductor = CaniConductor(self)
+        self.reply = CaniReply(self)
 
         self.thread = CaniThread(self)
+        self.lanes = CaniLanes(self)
+        self.writer = CaniWriter(self)
+        self.logfile = CaniLogFile(self)
+        self.profiler = CaniProfiler(self)
+        self.capture = CaniCapture(self)
 
         self.gui = gui
 
@@ -129,25 +158,43 @@ class CaniPy:
         # Stop verbose output when destroyed
         self.verbose = False
         self.close()
+        # write out what's left of the log
+        self.logfile.stop()
+        self.metrics.stop()
 
     def reset_display(self):
         """
         Resets all display values stored by the instance.
         """
-        self.ch_num = 0
-        self.ch_sid = 0
-        self.ch_name = ""
-        self.artist_name = ""
-        self.title_name = ""
-        self.cat_name = ""
-        self.cat_id = 0
-        self.ticker = ""
-        self.sig_strength = -1
-        self.ant_strength = -1
-        self.ter_strength = -1
-        self.sat_datetime = datetime(1900,1,1,tzinfo=timezone.utc)
-        self.data_in_use = False
-        self.radio_id = ""
+        self.update_state(**{
+            field.name: field.default for field in fields(CaniState) if field.name != "version"
+        })
+        # Next monitored events need to fill these back in
+        self.rx.forget()
+
+    def update_state(self, **changes):
+        """
+        Swaps in a new state snapshot with the given display values changed.
+        Readers holding the previous snapshot are unaffected, and anyone fetching
+        the state sees either all of the changes or none of them.
+        Every value that actually changed is then published through events.
+
+        Example:
+            "update_state(ch_num=1, ch_name='Channel 1')" changes both in a single swap.
+
+        Args:
+            **changes: Display values to change, named as in CaniState.
+        """
+        with self.state_lock:
+            old = self.state
+            changed = {name: value for name, value in changes.items() if getattr(old, name) != value}
+            if not changed: return
+            new = replace(old, version=old.version+1, **changed)
+            self.state = new
+        for name, value in changed.items():
+            self.events.publish(
+                CaniEvent(CaniEvents.fields[name], name, getattr(old, name), value, new)
+            )
 
     def open(self, port:str, baud:int):
         """
@@ -157,8 +204,10 @@ class CaniPy:
             port (str): The serial device's path or identifier.
             baud (int): The baud rate of the connection.
         """
-        # stop thread if one already exists
+        # stop threads if any already exist
         self.thread.stop()
+        self.lanes.stop()
+        self.writer.stop()
         self.port_name = port
         self.baud_rate = baud
         try:
@@ -167,8 +216,10 @@ class CaniPy:
             self.errorprint("Device port is unavailable")
             self.serial_conn = None
             return
-        # start com port read thread
+        # start com port read, dispatch, and write threads
+        self.lanes.start()
         self.thread.start()
+        self.writer.start()
         
     def close(self):
         """
@@ -176,13 +227,57 @@ class CaniPy:
         """
         # clear display vars
         self.reset_display()
-        # stop thread
+        # stop thread, then handle what it already read
         self.thread.stop()
+        self.lanes.stop()
+        # write out whatever is left
+        self.writer.stop()
+        # nothing else will be answered
+        self.reply.clear()
+        # finish up data frames, and make sure they're on disk
+        self.wx.pipeline.stop()
+        self.wx.store.close()
+        self.wx.assembler.clear()
+        self.wx.cache.clear()
+        # nothing more to record for this session
+        self.capture.stop()
         if self.serial_conn is None or not getattr(self.serial_conn,"is_open",False):
             if self.verbose: self.logprint("Port already closed")
             return
         self.serial_conn.close()
 
+    def transmit(self, command:bytes) -> bool:
+        """
+        Queues a complete packet to be written out to the serial device.
+
+        Args:
+            command (bytes): The packet, including header, length, and footer.
+
+        Returns:
+            bool: Whether the packet was accepted.
+        """
+        return self.writer.put(command)
+
+    def wants(self, category:str=None, verbose:bool=False) -> bool:
+        """
+        Checks whether log messages would be seen before going through the trouble of building them.
+        A subsystem can turn off logging altogether through a "logging" attribute.
+
+        Example:
+            "if canipy.wants('signal', verbose=True):" guards a block printing out signal details,
+            only run when verbose output and signal logging are both on.
+
+        Args:
+            category (str, optional): Log category (clock, data, signal, program). Default to None, any category.
+            verbose (bool, optional): Whether the messages are only shown in verbose output. Default to False.
+
+        Returns:
+            bool: Whether the messages would be output anywhere.
+        """
+        if verbose and not self.verbose: return False
+        if category and not getattr(self, f"{category}_logging"): return False
+        return getattr(self.gui, "logging", True)
+
     def infoprint(self, msg:str):
         """
         Send information to a subsystem if any, otherwise print to shell.
@@ -190,7 +285,9 @@ class CaniPy:
         Args:
             msg (str): The message to output
         """
-        self.gui.infobox(msg) if self.gui else print(msg)
+        if self.gui: return self.gui.infobox(msg)
+        print(msg)
+        if self.logfile.enabled: self.logfile.write("INF", msg)
 
     def warnprint(self, msg:str):
         """
@@ -199,7 +296,9 @@ class CaniPy:
         Args:
             msg (str): The message to output
         """
-        self.gui.warnbox(msg) if self.gui else print(msg)
+        if self.gui: return self.gui.warnbox(msg)
+        print(msg)
+        if self.logfile.enabled: self.logfile.write("WRN", msg)
 
     def errorprint(self, msg:str):
         """
@@ -208,7 +307,9 @@ class CaniPy:
         Args:
             msg (str): The message to output
         """
-        self.gui.errorbox(msg) if self.gui else print(msg)
+        if self.gui: return self.gui.errorbox(msg)
+        print(msg)
+        if self.logfile.enabled: self.logfile.write("ERR", msg)
     
     def logprint(self, msg:str):
         """
@@ -217,4 +318,6 @@ class CaniPy:
         Args:
             msg (str): The message to output
         """
-        self.gui.logbox(msg) if self.gui else print(msg)
+        if self.gui: return self.gui.logbox(msg)
+        print(msg)
+        if self.logfile.enabled: self.logfile.write("DBG", msg)
@@ -0,0 +1,185 @@
+import os, threading, time
+
+from .canicapture import CaniCaptureReader, parse_text, RX
+from .comm import CaniFramer
+
+class CaniReplay:
+    """
+    Replays a recorded session into CaniPy in place of a live radio, driving
+    the framer, lanes, conductor, and everything downstream of them (state, WX store, UI).
+    Text captures under docs/pcap and binary captures from CaniCapture both work.
+    Only received frames are replayed, sent ones are counted and skipped.
+
+    Frames are replayed at their recorded timing, sped up, or as fast as they can be taken,
+    and the report tells how many frames per second made it all the way through,
+    counting until the lanes and WX pipeline have caught up.
+    As fast as possible holds off whenever the lanes or WX pipeline back up, so nothing
+    is dropped and the rate is what they keep up with. At a set speed nothing is held off,
+    so drops show the speed is more than they keep up with.
+
+    Example:
+        "CaniReplay(CaniPy(), 'docs/pcap/wx_datarx.txt', speed=0).run()" replays the
+        WX capture as fast as possible, returning something along the lines of
+        "1278 frames in 0.566s (2259.5/s), 0 dropped, 11 sent skipped, max lag 0.0ms".
+
+    Args:
+        parent (CaniPy): A main CaniPy instance that this script will support.
+        path (str): The capture to replay, text if it ends in .txt.
+        speed (float, optional): Multiple of the recorded speed, 0 for as fast as possible. Default to 1.
+        loops (int, optional): Times to go through the capture. Default to 1.
+
+    Attributes:
+        thread_signal (threading.Event): Prompts the replay to halt.
+        replay_thread (threading.Thread): The thread entity replaying, when started in the background.
+
+        frame_count (int): Amount of received frames replayed.
+        skip_count (int): Amount of sent frames skipped.
+        drop_count (int): Amount of responses and data frames dropped downstream as a queue was full.
+        max_lag (int): Most nanoseconds a frame was replayed behind its schedule.
+        elapsed (int): Nanoseconds the last replay took, until everything caught up.
+    """
+    def __init__(self, parent:"CaniPy", path:str, speed:float=1.0, loops:int=1):
+        self.parent = parent
+        self.path = path
+        self.speed = speed
+        self.loops = loops
+
+        self.thread_signal = threading.Event()
+        self.replay_thread = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Clears the counters.
+        """
+        self.frame_count = 0
+        self.skip_count = 0
+        self.drop_count = 0
+        self.max_lag = 0
+        self.elapsed = 0
+
+    def records(self):
+        """
+        Reads the capture.
+
+        Yields:
+            tuple: Direction, nanoseconds since the start, and raw frame of every frame, oldest first.
+        """
+        if os.path.splitext(self.path)[1].lower() == ".txt":
+            yield from parse_text(self.path)
+            return
+        with CaniCaptureReader(self.path) as capture:
+            yield from capture.records()
+
+    def run(self) -> str:
+        """
+        Replays the capture, returning once everything replayed has been handled.
+
+        Returns:
+            str: The report of the replay.
+        """
+        self.reset_stats()
+        self.thread_signal.clear()
+        thread, lanes = self.parent.thread, self.parent.lanes
+        # Dispatch the same way as a live radio, unless the port already has it going
+        owns_lanes = not (lanes.lane_thread and lanes.lane_thread.is_alive())
+        if owns_lanes: lanes.start()
+        # A framer of its own, the reader may be framing off the port at the same time
+        framer = CaniFramer(self.parent.header)
+        dropped = self.dropped()
+
+        start = time.perf_counter_ns()
+        offset = 0
+        for _ in range(self.loops):
+            last = 0
+            for direction, stamp, frame in self.records():
+                if self.thread_signal.is_set(): break
+                last = stamp
+                if direction != RX:
+                    self.skip_count += 1
+                    continue
+                if self.speed:
+                    due = start + int((offset + stamp) / self.speed)
+                    now = time.perf_counter_ns()
+                    if due > now:
+                        time.sleep((due - now) / 1e9)
+                    elif now - due > self.max_lag:
+                        self.max_lag = now - due
+                else:
+                    while self.backlogged():
+                        time.sleep(0.0005)
+                # Through the framer, as if just read off the port
+                for payload in thread.thread_frames(frame, framer):
+                    lanes.put(payload)
+                self.frame_count += 1
+            # Next loop picks up where this one left off
+            offset += last
+
+        # Wait on everything downstream to catch up
+        if owns_lanes:
+            lanes.stop()
+        else:
+            # Including whatever is being handled right now
+            while not lanes.idle():
+                time.sleep(0.001)
+        self.parent.wx.pipeline.stop()
+        self.elapsed = time.perf_counter_ns() - start
+        self.drop_count = self.dropped() - dropped
+        report = self.report()
+        self.parent.logprint(f"Replay: {report}")
+        return report
+
+    def start(self):
+        """
+        Runs the replay in the background.
+        """
+        if self.replay_thread and self.replay_thread.is_alive():
+            return
+        self.replay_thread = threading.Thread(target=self.run,name="CaniReplay",daemon=True)
+        self.replay_thread.start()
+
+    def stop(self):
+        """
+        Halts a replay running in the background, waiting for it to wrap up.
+        """
+        self.thread_signal.set()
+        if self.replay_thread:
+            self.replay_thread.join()
+            self.replay_thread = None
+
+    def backlogged(self) -> bool:
+        """
+        Returns:
+            bool: Whether the lanes or WX pipeline are backed up enough to risk dropping.
+        """
+        lanes, pipeline = self.parent.lanes, self.parent.wx.pipeline
+        depths = lanes.depth()
+        return (
+            any(depth >= high // 2 for depth, high in zip(depths, lanes.high_water)) or
+            # Data frames still in the lanes end up in the pipeline too
+            pipeline.depth() + depths[lanes.lane_of[0xEA]] >= pipeline.maxsize // 2
+        )
+
+    def dropped(self) -> int:
+        """
+        Returns:
+            int: Amount of responses and data frames dropped so far by the lanes and WX pipeline.
+        """
+        return sum(self.parent.lanes.drops) + self.parent.wx.pipeline.drop_count
+
+    def frame_rate(self) -> float:
+        """
+        Returns:
+            float: Frames handled per second over the last replay.
+        """
+        return self.frame_count / self.elapsed * 1e9 if self.elapsed else 0
+
+    def report(self) -> str:
+        """
+        Returns:
+            str: A one-line summary of the last replay.
+        """
+        return (
+            f"{self.frame_count} frames in {self.elapsed/1e9:.3f}s ({self.frame_rate():.1f}/s), "
+            f"{self.drop_count} dropped, {self.skip_count} sent skipped, max lag {self.max_lag/1e6:.1f}ms"
+        )
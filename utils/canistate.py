@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+@dataclass(frozen=True, slots=True)
+class CaniState:
+    """
+    Immutable snapshot of the radio display values.
+    CaniPy swaps in a new snapshot with a single assignment whenever values change,
+    so a snapshot fetched by another thread is always consistent with itself.
+
+    Example:
+        "state = canipy.state" then reading "state.ch_num" and "state.artist_name"
+        is guaranteed to give the artist for that very channel.
+
+    Attributes:
+        version (int): Bumped on every change, compare to skip work when nothing changed.
+
+        ch_num (int): Assigned/display number for the currently tuned channel.
+        ch_sid (int): Raw ID for the currently tuned channel, relative to its place in the satellite feed.
+        ch_name (str): Display name for the currently tuned channel.
+
+        artist_name (str): Line 1 of the display information, usually the name of the artist/group/composer.
+        title_name (str): Line 2 of the display information, usually the name of the song/program.
+
+        cat_name (str): Display name for the current channel's assigned category (Rock, Pop, News, etc).
+        cat_id (int): The ID number corresponding to the current channel's assigned category.
+
+        ticker (str): Text used for scrolling information.
+
+        sig_strength (int): Overall satellite signal strength (Exp: -1 inactive, 0 none, 1 low, 2 med, 3 hi).
+        ant_strength (int): Indicates whether the antenna is connected or not (Exp: -1 inactive, 0 none, 3 connected).
+        ter_strength (int): Overall terrestrial signal strength (Exp: -1 inactive, 0 none, 1 low, 2 med, 3 hi).
+
+        sat_datetime (datetime): Stores the date-time value from the service when reported by the radio.
+
+        data_in_use (bool): Flag to identify if data mode is enabled or disabled.
+
+        radio_id (str): The ID of the tuner hardware assigned by the service provider.
+    """
+    version: int = 0
+
+    # Assume radios start at 0
+    ch_num: int = 0
+    ch_sid: int = 0
+    ch_name: str = ""
+
+    artist_name: str = ""
+    title_name: str = ""
+
+    cat_name: str = ""
+    cat_id: int = 0
+
+    ticker: str = ""
+
+    sig_strength: int = -1
+    ant_strength: int = -1
+    ter_strength: int = -1
+
+    # Assume minimum date value means not set
+    sat_datetime: datetime = datetime(1900,1,1,tzinfo=timezone.utc)
+
+    data_in_use: bool = False
+
+    radio_id: str = ""
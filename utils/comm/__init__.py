@@ -2,14 +2,33 @@ from .canirx import CaniRX
 from .canitx import CaniTX
 from .caniconductor import CaniConductor
 from .canithread import CaniThread
+from .caniframer import CaniFramer
+from .canireply import CaniReply, CaniStatusError
+from .caniwriter import CaniWriter
+from .canilanes import CaniLanes
 from .special.canidx import CaniDX
 from .special.caniwx import CaniWX
+from .special.caniwxstore import CaniWXStore, CaniWXArchive
+from .special.caniwxassembler import CaniWXAssembler, CaniWXProduct
+from .special.caniwxcache import CaniWXCache
+from .special.caniwxpipeline import CaniWXPipeline
 
 __all__ = [
     "CaniRX",
     "CaniTX",
     "CaniConductor",
     "CaniThread",
+    "CaniFramer",
+    "CaniReply",
+    "CaniStatusError",
+    "CaniWriter",
+    "CaniLanes",
     "CaniDX",
-    "CaniWX"
+    "CaniWX",
+    "CaniWXStore",
+    "CaniWXArchive",
+    "CaniWXAssembler",
+    "CaniWXProduct",
+    "CaniWXCache",
+    "CaniWXPipeline"
 ]
\ No newline at end of file
@@ -0,0 +1,150 @@
+import time
+
+class CaniFramer:
+    """
+    Pulls complete packets out of the raw byte stream read from the radio.
+    Bytes are accumulated in a single reusable buffer, every complete packet is
+    extracted in one pass, and stray bytes are skipped by scanning for the next header.
+
+    A packet is laid out as "5A A5", a two-byte length, the payload, then two trailing bytes.
+    The whole packet is therefore always 6 bytes longer than the reported length.
+
+    Args:
+        header (bytes, optional): Header marking the start of a packet. Default to 5A A5 hex.
+        max_size (int, optional): Largest length accepted before treating a header as bogus. Default to 4096.
+
+    Attributes:
+        buffer (bytearray): Bytes received that are not yet part of a complete packet.
+
+        frame_count (int): Amount of complete packets extracted.
+        read_count (int): Amount of reads (syscalls) that fed the framer.
+        byte_count (int): Amount of bytes fed into the framer.
+        skip_count (int): Amount of bytes thrown away while looking for a header.
+        error_count (int): Amount of times bytes were thrown away, be it stray bytes or a bogus length.
+        start_time (float): Monotonic time of when the counters were last reset.
+    """
+    def __init__(self, header:bytes=bytes([0x5A, 0xA5]), max_size:int=4096):
+        self.header = header
+        self.max_size = max_size
+        self.buffer = bytearray()
+
+        self.frame_count = 0
+        self.read_count = 0
+        self.byte_count = 0
+        self.skip_count = 0
+        self.error_count = 0
+        self.start_time = time.monotonic()
+
+    @staticmethod
+    def unwrap(frame:bytes) -> bytes:
+        """
+        Strips the header, length, and trailing bytes of a packet, leaving its payload.
+
+        Example:
+            Given "5A A5 00 01 B1 00 B1", the payload "B1" is returned.
+
+        Args:
+            frame (bytes): A complete packet as returned by the framer.
+
+        Returns:
+            bytes: The payload contained in the packet.
+        """
+        size = (frame[2] << 8) | frame[3]
+        # bugfix specifically for the diag response,
+        # its length is one short of the actual payload
+        return frame[4:5+size] if frame[4] == 0xF1 else frame[4:4+size]
+
+    def reset(self):
+        """
+        Clears the buffer and counters, such as when a new connection is made.
+        """
+        self.buffer.clear()
+        self.frame_count = 0
+        self.read_count = 0
+        self.byte_count = 0
+        self.skip_count = 0
+        self.error_count = 0
+        self.start_time = time.monotonic()
+
+    def feed(self, chunk:bytes) -> list[bytes]:
+        """
+        Appends what was read from the port and extracts any packets completed by it.
+
+        Args:
+            chunk (bytes): The bytes returned by a single read.
+
+        Returns:
+            list[bytes]: Every complete packet found, in the order received.
+        """
+        self.read_count += 1
+        self.byte_count += len(chunk)
+        self.buffer += chunk
+        return self.frames()
+
+    def frames(self) -> list[bytes]:
+        """
+        Extracts every complete packet currently held in the buffer.
+        Incomplete packets are left in the buffer for the next read.
+
+        Returns:
+            list[bytes]: Every complete packet found, in the order received.
+        """
+        buf = self.buffer
+        end = len(buf)
+        found = []
+        pos = 0
+        while pos < end:
+            start = buf.find(self.header, pos)
+            if start < 0:
+                # Hold on to a trailing 5A in case the header got split
+                keep = end - 1 if buf[-1] == self.header[0] else end
+                if keep > pos: self.error_count += 1
+                self.skip_count += keep - pos
+                pos = keep
+                break
+            # Anything before the header is garbage
+            if start > pos: self.error_count += 1
+            self.skip_count += start - pos
+            pos = start
+            if end - start < 4: break
+            size = (buf[start+2] << 8) | buf[start+3]
+            if not size or size > self.max_size:
+                # Bogus length, header was likely part of garbage.
+                # Skip past it and keep scanning.
+                self.error_count += 1
+                self.skip_count += 1
+                pos = start + 1
+                continue
+            if end - start < size + 6: break
+            found.append(bytes(buf[start:start+size+6]))
+            pos = start + size + 6
+        # Drop consumed bytes, buffer memory is kept around
+        del buf[:pos]
+        self.frame_count += len(found)
+        return found
+
+    def frame_rate(self) -> float:
+        """
+        Returns:
+            float: Packets extracted per second since the counters were reset.
+        """
+        elapsed = time.monotonic() - self.start_time
+        return self.frame_count / elapsed if elapsed > 0 else 0
+
+    def read_size(self) -> float:
+        """
+        Returns:
+            float: Average amount of bytes obtained per read (syscall).
+        """
+        return self.byte_count / self.read_count if self.read_count else 0
+
+    def report(self) -> str:
+        """
+        Returns:
+            str: A one-line summary of the framer counters.
+        """
+        return (
+            f"{self.frame_count} frames ({self.frame_rate():.1f}/s), "
+            f"{self.read_size():.1f} bytes/read, "
+            f"{self.skip_count} bytes skipped ({self.error_count} errors)"
+        )
@@ -0,0 +1,211 @@
+import threading, time
+
+from collections import deque
+
+class CaniLanes:
+    """
+    Priority lanes between the reader thread and the conductor.
+    The reader only frames and sorts responses by opcode, then goes back to the port.
+    A dispatcher thread always takes from the most important lane with anything waiting,
+    so acknowledgements and errors are never stuck behind a flood of monitoring or data.
+
+    Low value responses are filtered before they reach a lane. Direct idle frames (F2 hex)
+    are only counted. Once a lane backs up past its high-water mark, clock and signal
+    events (DF, C1 hex) are coalesced, so only the latest of each waits to be dispatched.
+
+    Lanes, most important first:
+        0 control: Acknowledgements, errors, and anything not listed below.
+        1 monitoring: Signal, channel, program, and clock events (C1, C3, D1 to D6, DF hex).
+        2 bulk: Data frames (EA hex).
+
+    Args:
+        parent (CaniPy): A main CaniPy instance that this script will support.
+        maxsize (tuple[int], optional): Responses each lane holds before dropping more. Default to (1024, 256, 1024).
+        high_water (tuple[int], optional): Responses waiting in a lane before coalescing starts. Default to (768, 32, 768).
+
+    Attributes:
+        lane_of (bytes): Lane of each of the 256 opcodes.
+        lanes (list[deque]): Responses waiting per lane, alongside the time they were queued.
+            Coalesced responses wait as None alongside their opcode instead.
+        latest (dict): Coalesced opcodes mapped to their latest response and the time it was queued.
+        condition (threading.Condition): Wakes the dispatcher when a response is queued.
+        thread_signal (threading.Event): Prompts the threaded function to halt.
+        lane_thread (threading.Thread): The actual thread entity dispatching responses.
+        dispatching (bool): Whether a response was taken and is still being handled.
+
+        counts (list[int]): Amount of responses dispatched per lane.
+        drops (list[int]): Amount of responses dropped per lane as it was full.
+        max_wait (list[int]): Longest nanoseconds a response waited per lane.
+        total_wait (list[int]): Sum of nanoseconds waited per lane, for averaging.
+        idle_count (int): Amount of Direct idle frames counted without dispatching.
+        coalesced (dict): Coalesced opcodes mapped to the amount of responses superseded before dispatch.
+    """
+    names = ("control", "monitoring", "bulk")
+    monitoring = (0xC1, 0xC3, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xDF)
+    bulk = (0xEA,)
+    # Only the latest of these matters once backed up
+    coalesce = (0xC1, 0xDF)
+
+    def __init__(self, parent:"CaniPy", maxsize:tuple=(1024, 256, 1024), high_water:tuple=(768, 32, 768)):
+        self.parent = parent
+        self.maxsize = maxsize
+        self.high_water = high_water
+
+        lane_of = bytearray(256)
+        for opcode in self.monitoring: lane_of[opcode] = 1
+        for opcode in self.bulk: lane_of[opcode] = 2
+        self.lane_of = bytes(lane_of)
+
+        self.lanes = [deque() for _ in self.names]
+        self.latest = {}
+        self.condition = threading.Condition()
+        self.thread_signal = threading.Event()
+        self.lane_thread = None
+        self.dispatching = False
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Clears the per-lane counters.
+        """
+        self.counts = [0] * len(self.names)
+        self.drops = [0] * len(self.names)
+        self.max_wait = [0] * len(self.names)
+        self.total_wait = [0] * len(self.names)
+        self.idle_count = 0
+        self.coalesced = {opcode: 0 for opcode in self.coalesce}
+
+    def start(self):
+        """
+        Starts the thread
+        """
+        if self.lane_thread and self.lane_thread.is_alive():
+            return
+        self.thread_signal.clear()
+        self.lane_thread = threading.Thread(target=self.thread_dispatch,name="CaniLanes",daemon=True)
+        self.lane_thread.start()
+
+    def stop(self):
+        """
+        Dispatches whatever is still waiting, then stops the thread.
+        """
+        if not self.lane_thread: return
+        with self.condition:
+            self.thread_signal.set()
+            self.condition.notify()
+        self.lane_thread.join()
+        self.lane_thread = None
+        if self.parent.verbose:
+            self.parent.logprint(f"Lanes: {self.report()}")
+
+    def put(self, payload:bytes) -> bool:
+        """
+        Sorts a response into its lane for the dispatcher.
+        If the dispatcher is not running, the response is dispatched right away instead.
+
+        Args:
+            payload (bytes): A response received from the radio.
+
+        Returns:
+            bool: Whether the response was accepted.
+        """
+        opcode = payload[0]
+        if opcode == 0xF2:
+            # Direct idle frames are only ever counted,
+            # no need to go through the conductor for that
+            self.parent.direct_idleframes += 1
+            self.idle_count += 1
+            return True
+        if not (self.lane_thread and self.lane_thread.is_alive()):
+            self.parent.conductor.go(payload)
+            return True
+        lane = self.lane_of[opcode]
+        with self.condition:
+            waiting = self.lanes[lane]
+            if opcode in self.coalesced and (opcode in self.latest or len(waiting) >= self.high_water[lane]):
+                if opcode in self.latest:
+                    # Replace the one still waiting
+                    self.coalesced[opcode] += 1
+                else:
+                    waiting.append((None, opcode))
+                    self.condition.notify()
+                self.latest[opcode] = (payload, time.perf_counter_ns())
+                return True
+            if len(waiting) >= self.maxsize[lane]:
+                self.drops[lane] += 1
+                return False
+            waiting.append((payload, time.perf_counter_ns()))
+            self.condition.notify()
+        return True
+
+    def depth(self) -> list[int]:
+        """
+        Returns:
+            list[int]: Amount of responses currently waiting per lane.
+        """
+        return [len(lane) for lane in self.lanes]
+
+    def idle(self) -> bool:
+        """
+        Returns:
+            bool: Whether nothing is waiting in any lane, nor being handled.
+        """
+        with self.condition:
+            return not self.dispatching and not any(self.lanes)
+
+    def take(self) -> tuple:
+        """
+        Waits for a response, taking it from the most important lane with any waiting.
+
+        Returns:
+            tuple: The lane, the response, and the time it was queued, or None once halted and empty.
+        """
+        with self.condition:
+            while True:
+                for lane, waiting in enumerate(self.lanes):
+                    if waiting:
+                        payload, queued = waiting.popleft()
+                        if payload is None:
+                            # Coalesced, take the latest
+                            payload, queued = self.latest.pop(queued)
+                        # Set here, so it's never idle between taking and handling
+                        self.dispatching = True
+                        return lane, payload, queued
+                if self.thread_signal.is_set():
+                    return None
+                self.condition.wait()
+
+    def thread_dispatch(self):
+        """
+        Main threaded instance, handing responses over to the conductor by priority.
+        """
+        while True:
+            taken = self.take()
+            if taken is None: return
+            lane, payload, queued = taken
+            waited = time.perf_counter_ns() - queued
+            self.counts[lane] += 1
+            self.total_wait[lane] += waited
+            if waited > self.max_wait[lane]: self.max_wait[lane] = waited
+            self.parent.metrics.dispatch_wait.add(waited)
+            try:
+                self.parent.conductor.go(payload)
+            except Exception as e:
+                # A bad response shouldn't take the dispatcher down with it
+                self.parent.logprint(f"Response {payload[0]:02X} failed ({type(e).__name__}: {e})")
+            finally:
+                self.dispatching = False
+
+    def report(self) -> str:
+        """
+        Returns:
+            str: A one-line summary of the lane counters, and what was shed.
+        """
+        return ", ".join(
+            f"{name} {self.counts[lane]} "
+            f"(wait avg {self.total_wait[lane]/self.counts[lane]/1e3 if self.counts[lane] else 0:.1f}us "
+            f"max {self.max_wait[lane]/1e3:.1f}us, {self.drops[lane]} dropped)"
+            for lane, name in enumerate(self.names)
+        ) + f", {self.idle_count} idle, " + ", ".join(
+            f"{count} {opcode:02X} coalesced" for opcode, count in self.coalesced.items()
+        )
@@ -0,0 +1,179 @@
+import threading, time
+
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+class CaniStatusError(Exception):
+    """
+    Raised through a reply future when the radio answers with an alert status.
+
+    Args:
+        msg (str): The status message, as interpreted by CaniRX.fetch_status.
+        payload (bytes): The response that carried the alert.
+    """
+    def __init__(self, msg:str, payload:bytes):
+        super().__init__(msg)
+        self.payload = payload
+
+class CaniReply:
+    """
+    Correlates commands sent to the radio with the responses that answer them.
+    A future is handed out for every expected response, resolved by the conductor
+    once a matching response arrives.
+
+    Most responses are the command opcode with the high bit set (10 to 90, 25 to A5, etc).
+    Exceptions to that rule are listed in "replies", alongside where the status bytes are.
+
+    Attributes:
+        parent (CaniPy): A main CaniPy instance that this script will support.
+        replies (dict): Command prefixes mapped to their response prefixes and status offset.
+        pending (dict): Response prefixes mapped to a queue of futures waiting on them.
+        lock (threading.Lock): Guards pending, as commands and responses come from different threads.
+    """
+    def __init__(self, parent:"CaniPy"):
+        self.parent = parent
+
+        # Command prefix: (response prefixes, status offset or None if no status)
+        self.replies = {
+            bytes([0x4A, 0x10]): ((bytes([0xCA, 0x40]),), 2),
+            bytes([0x4A, 0x43]): ((bytes([0xCA, 0x43]),), None),
+            bytes([0x4A, 0x44]): ((bytes([0xCA, 0x64]),), None),
+            bytes([0x4E]): ((bytes([0xDE]),), 1),
+            bytes([0x60]): ((bytes([0xF0]),), None),
+            bytes([0x70]): ((bytes([0xE3]),), 1),
+            # Direct acks differ by firmware, cover both
+            bytes([0x74]): ((bytes([0xE4]), bytes([0xF4])), None)
+        }
+
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def lookup(self, command:bytes) -> tuple:
+        """
+        Finds what response is expected for a command.
+
+        Example:
+            For "10 02 01 00 00 01", the response is expected to start with "90", status at offset 1.
+
+        Args:
+            command (bytes): The command payload, or at least its leading bytes.
+
+        Returns:
+            tuple: The response prefixes and the status offset.
+        """
+        for size in (2, 1):
+            if command[:size] in self.replies:
+                return self.replies[command[:size]]
+        return (bytes([command[0] | 0x80]),), 1
+
+    def expect(self, command:bytes, timeout:float=2.0) -> Future:
+        """
+        Registers interest in the response to a command, which should be sent right after.
+
+        Args:
+            command (bytes): The command payload, or at least its leading bytes.
+            timeout (float, optional): Seconds until the future gives up on a response. Default to 2.
+
+        Returns:
+            Future: Resolves to the response payload, or fails on timeout or alert status.
+        """
+        prefixes, status = self.lookup(command)
+        future = Future()
+        now = time.monotonic()
+        entry = (future, status, now + timeout)
+        with self.lock:
+            # Commands never answered would otherwise pile up
+            self.purge(now)
+            for prefix in prefixes:
+                self.pending.setdefault(prefix, deque()).append(entry)
+        return future
+
+    def resolve(self, payload:bytes):
+        """
+        Resolves the oldest future waiting on this response, if any.
+        Called by the conductor for every response once it is handled.
+
+        Args:
+            payload (bytes): A response received from the radio.
+        """
+        if not self.pending: return
+        now = time.monotonic()
+        with self.lock:
+            for prefix in (payload[:2], payload[:1]):
+                waiting = self.pending.get(prefix)
+                if waiting is None: continue
+                while waiting:
+                    future, status, deadline = waiting.popleft()
+                    if future.done(): continue
+                    if deadline < now:
+                        future.set_exception(FutureTimeout())
+                        continue
+                    if status is not None and payload[status] != 0x01:
+                        future.set_exception(
+                            CaniStatusError(self.parent.rx.fetch_status(payload[status-1:]), payload)
+                        )
+                    else:
+                        future.set_result(payload)
+                    if not waiting:
+                        self.pending.pop(prefix, None)
+                    return
+                self.pending.pop(prefix, None)
+
+    def wait(self, future:Future, timeout:float=2.0) -> bytes:
+        """
+        Blocks until a reply future resolves, reporting what went wrong if it didn't.
+
+        Args:
+            future (Future): A future handed out by expect.
+            timeout (float, optional): Seconds to wait for. Default to 2.
+
+        Returns:
+            bytes: The response payload, or nothing if it failed or timed out.
+        """
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            with self.lock:
+                self.purge(time.monotonic())
+            if self.parent.verbose:
+                self.parent.logprint("No response from radio")
+        except CaniStatusError as e:
+            self.parent.logprint(str(e))
+        except ConnectionError as e:
+            if self.parent.verbose:
+                self.parent.logprint(str(e))
+        return b""
+
+    def purge(self, now:float):
+        """
+        Fails and forgets futures past their deadline, and forgets ones already done.
+        Call with the lock held.
+
+        Args:
+            now (float): The current monotonic time.
+        """
+        for prefix in list(self.pending):
+            waiting = self.pending[prefix]
+            kept = deque()
+            for entry in waiting:
+                future, _, deadline = entry
+                if future.done(): continue
+                if deadline < now:
+                    future.set_exception(FutureTimeout())
+                    continue
+                kept.append(entry)
+            if kept:
+                self.pending[prefix] = kept
+            else:
+                del self.pending[prefix]
+
+    def clear(self):
+        """
+        Fails every pending future, such as when the connection is closed.
+        """
+        with self.lock:
+            for waiting in self.pending.values():
+                for future, _, _ in waiting:
+                    if not future.done():
+                        future.set_exception(ConnectionError("Connection closed"))
+            self.pending.clear()
@@ -1,15 +1,61 @@
+import time
+
 from datetime import datetime, timezone
 
 class CaniRX:
     """
     Functions related to receipt of responses.
+    Monitored signal and clock events are compared with the previous one,
+    and skipped entirely if nothing changed.
 
     Attributes:
         parent (CaniPy): A main CaniPy instance that this script will support.
+        summary_interval (float): Seconds between "unchanged" summaries while events are skipped, 0 for none.
+        last (dict): Monitored event kinds (signal, clock) mapped to the last payload parsed.
+        since (dict): Monitored event kinds mapped to the monotonic time their payload last changed.
+        repeats (dict): Monitored event kinds mapped to the amount of events skipped as unchanged.
+        next_summary (dict): Monitored event kinds mapped to the monotonic time a summary is next due.
     """
     def __init__(self, parent:"CaniPy"):
         self.parent = parent
 
+        self.summary_interval = 600
+        self.last = {}
+        self.since = {}
+        self.repeats = {"signal": 0, "clock": 0}
+        self.next_summary = {}
+
+    def forget(self):
+        """
+        Forgets the last monitored events, so the next ones are parsed no matter what.
+        """
+        self.last.clear()
+
+    def unchanged(self, kind:str, payload:bytes) -> bool:
+        """
+        Checks a monitored event against the last one of its kind, remembering it if it changed.
+        While unchanged, a summary is logged every so often.
+
+        Args:
+            kind (str): The kind of event, also its log category (signal, clock).
+            payload (bytes): The event response.
+
+        Returns:
+            bool: Whether the event is the same as the last one.
+        """
+        now = time.monotonic()
+        if self.last.get(kind) != payload:
+            self.last[kind] = payload
+            self.since[kind] = now
+            self.next_summary[kind] = now + self.summary_interval
+            return False
+        self.repeats[kind] += 1
+        if self.summary_interval and now >= self.next_summary[kind]:
+            self.next_summary[kind] = now + self.summary_interval
+            if self.parent.wants(kind):
+                self.parent.logprint(f"{kind.capitalize()} unchanged for {(now - self.since[kind])/60:.0f} min")
+        return True
+
     @staticmethod
     def fetch_status(payload:bytes) -> str:
         """
@@ -148,25 +194,31 @@ class CaniRX:
             payload (bytes): A response, comprised as a set of bytes, to parse the information from.
         """
         if len(payload) == 78:
-            self.parent.logprint("===Title  Info.===")
-            self.parent.logprint(f"Channel {payload[3]}")
+            # Gathered up to be stored all at once
+            changes = {}
+            # Skip building printouts nobody will see
+            log = self.parent.wants("program")
+            if log:
+                self.parent.logprint("===Title  Info.===")
+                self.parent.logprint(f"Channel {payload[3]}")
             if payload[1] != 0x01:
                 self.parent.warnprint(self.fetch_status(payload))
-                self.parent.logprint("==================")
+                if log: self.parent.logprint("==================")
                 return
             if payload[4] == 0x01:
                 if payload[3] == self.parent.ch_num:
-                    self.parent.artist_name = payload[5:41].decode("latin-1").rstrip(chr(0)).strip()
-                self.parent.logprint(payload[5:41].decode("latin-1").rstrip(chr(0)))
+                    changes["artist_name"] = payload[5:41].decode("latin-1").rstrip(chr(0)).strip()
+                if log: self.parent.logprint(payload[5:41].decode("latin-1").rstrip(chr(0)))
                 # if self.parent.verbose:
                 #     self.parent.logprint(" ".join(f'{b:02X}' for b in payload[37:41]))
             if payload[41] == 0x01:
                 if payload[3] == self.parent.ch_num:
-                    self.parent.title_name = payload[42:].decode("latin-1").rstrip(chr(0)).strip()
-                self.parent.logprint(payload[42:].decode("latin-1").rstrip(chr(0)))
+                    changes["title_name"] = payload[42:].decode("latin-1").rstrip(chr(0)).strip()
+                if log: self.parent.logprint(payload[42:].decode("latin-1").rstrip(chr(0)))
                 # if self.parent.verbose:
                 #     self.parent.logprint(" ".join(f'{b:02X}' for b in payload[74:]))
-            self.parent.logprint("==================")
+            self.parent.update_state(**changes)
+            if log: self.parent.logprint("==================")
             return
         self.parent.logprint("Payload not of correct length")
         if self.parent.verbose:
@@ -182,40 +234,49 @@ class CaniRX:
             payload (bytes): A response, comprised as a set of bytes, to parse the information from.
         """
         if len(payload) == 77:
-            # Assign values if it's the current channel
+            # Assign values if it's the current channel,
+            # gathered up to be stored all at once
+            changes = {}
             is_currchan = False
             if payload[3] == self.parent.ch_num or payload[4] == self.parent.ch_sid:
                 # If number or SID match, we're in this channel.
                 # Store values again to ensure they're up to speed.
                 is_currchan = True
-                self.parent.ch_num = payload[3]
-                self.parent.ch_sid = payload[4]
-            self.parent.logprint("===Channel Info===")
-            self.parent.logprint(f"Channel {payload[3]}")
-            if self.parent.verbose:
-                self.parent.logprint(f"SID {payload[4]:02X}")
+                changes["ch_num"] = payload[3]
+                changes["ch_sid"] = payload[4]
+            # Skip building printouts nobody will see
+            log = self.parent.wants("program")
+            if log:
+                self.parent.logprint("===Channel Info===")
+                self.parent.logprint(f"Channel {payload[3]}")
+                if self.parent.verbose:
+                    self.parent.logprint(f"SID {payload[4]:02X}")
             if payload[1] != 0x01:
+                self.parent.update_state(**changes)
                 self.parent.warnprint(self.fetch_status(payload))
-                self.parent.logprint("==================")
+                if log: self.parent.logprint("==================")
                 return
             if payload[5] == 0x01:
                 if is_currchan:
-                    self.parent.ch_name = payload[6:22].decode("latin-1").strip()
-                self.parent.logprint(payload[6:22].decode("latin-1"))
+                    changes["ch_name"] = payload[6:22].decode("latin-1").strip()
+                if log: self.parent.logprint(payload[6:22].decode("latin-1"))
             if payload[40] == 0x01:
                 if is_currchan:
-                    self.parent.artist_name = payload[41:57].decode("latin-1").strip()
-                    self.parent.title_name = payload[57:73].decode("latin-1").strip()
-                self.parent.logprint(payload[41:57].decode("latin-1"))
-                self.parent.logprint(payload[57:73].decode("latin-1"))
+                    changes["artist_name"] = payload[41:57].decode("latin-1").strip()
+                    changes["title_name"] = payload[57:73].decode("latin-1").strip()
+                if log:
+                    self.parent.logprint(payload[41:57].decode("latin-1"))
+                    self.parent.logprint(payload[57:73].decode("latin-1"))
             if payload[22] == 0x01:
                 if is_currchan:
-                    self.parent.cat_name = payload[24:40].decode("latin-1").strip()
-                    self.parent.cat_id = payload[23]
-                self.parent.logprint(payload[24:40].decode("latin-1"))
-                if self.parent.verbose:
-                    self.parent.logprint(f"Cat ID: {payload[23]:02X}")
-            self.parent.logprint("==================")
+                    changes["cat_name"] = payload[24:40].decode("latin-1").strip()
+                    changes["cat_id"] = payload[23]
+                if log:
+                    self.parent.logprint(payload[24:40].decode("latin-1"))
+                    if self.parent.verbose:
+                        self.parent.logprint(f"Cat ID: {payload[23]:02X}")
+            self.parent.update_state(**changes)
+            if log: self.parent.logprint("==================")
             return
         self.parent.logprint("Payload not of correct length")
         if self.parent.verbose:
@@ -231,13 +292,25 @@ class CaniRX:
             payload (bytes): A response, comprised as a set of bytes, to parse the information from.
         """
         if len(payload) in (22, 26):
+            # Monitoring keeps reporting the same thing,
+            # only bother with it if something changed.
+            # Polled (C3) reports were asked for, always parse.
+            if payload[0] == 0xC1 and self.unchanged("signal", payload): return
+            if payload[0] == 0xC3:
+                # Stored below, so the next event has to be parsed
+                # even if it matches the one before this
+                self.last.pop("signal", None)
             if payload[0] == 0xC1:
                 # If C1 event-driven poll, pad it to conform
                 payload = payload[:1] + bytes([1,0]) + payload[1:] + bytes(2)
             # Store signal info
-            self.parent.sig_strength = payload[3]
-            self.parent.ant_strength = payload[4]
-            self.parent.ter_strength = payload[5]
+            self.parent.update_state(
+                sig_strength=payload[3],
+                ant_strength=payload[4],
+                ter_strength=payload[5]
+            )
+            # Skip building printouts nobody will see
+            if not self.parent.wants("signal"): return
             # label dicts
             siglabel = {0x00:"None",0x01:"Fair",0x02:"Good",0x03:"Excellent"}
             antlabel = {0x00:"Disconnected",0x03:"Connected"}
@@ -289,6 +362,8 @@ class CaniRX:
             miltime (bool, optional): Report debug print time in 24h format. Default to false.
         """
         if len(payload) == 11:
+            self.parent.metrics.clock_events.add()
+            if self.unchanged("clock", payload): return
             # Store as datetime
             self.parent.sat_datetime = datetime(
                 (payload[1]*100)+payload[2],
@@ -336,7 +411,7 @@ class CaniRX:
                     self.parent.logprint(f"Datetime stored: {self.parent.sat_datetime}")
                     self.parent.logprint(
                         f"TPS: "
-                        f"{self.parent.thread.calc_delta():.2f}"
+                        f"{self.parent.metrics.clock_events.rate():.2f}"
                     )
                     # Tick maxes out at 0xFC before rollover gets counted.
                     # Day maxes out at 3 1F FC. All tick resets to 0 by midnight.
@@ -1,5 +1,6 @@
 import time, threading
-from datetime import datetime
+
+from .caniframer import CaniFramer
 
 class CaniThread:
     """
@@ -9,56 +10,13 @@ class CaniThread:
         parent (CaniPy): A main CaniPy instance that this script will support.
         thread_signal (threading.Event): Prompts the threaded function to halt.
         com_thread (threading.Thread): The actual thread entity looking for responeses.
-
-        last_tick (datetime): Used for storing last datetime to calculate debug.
-        last_bitrate (datetime): Used for storing last datetime to calculate bitrate.
-        bitsize_count (int): Store the size of the bits received.
-        curr_bitrate (int): The last reported bitrate.
+        framer (CaniFramer): Extracts packets out of the bytes read from the port.
     """
     def __init__(self, parent:"CaniPy"):
         self.parent = parent
         self.thread_signal = threading.Event()
         self.com_thread = None
-
-        self.last_tick = datetime.min
-        self.last_bitrate = datetime.min
-        self.bitsize_count = 0
-        self.curr_bitrate = 0
-
-    def calc_delta(self) -> float:
-        """
-        Used for printing out TPS rate information by
-        obtaining the delta, given the current datetime
-        stamp and referencing a past value.
-
-        Returns:
-            float: The ticks per second based off the delta.
-        """
-        now = datetime.now()
-        time_delta = (now - self.last_tick).total_seconds()
-        self.last_tick = now
-        return 1 / time_delta if time_delta > 0 else 0
-
-    def calc_bitrate(self, size:int) -> int:
-        """
-        Used for printing out bits/sec information by
-        obtaining the delta, given the current datetime
-        stamp, bytes received, and checking if a second passed.
-
-        Args:
-            size (int): Size of reported packet in bytes.
-
-        Returns:
-            int: The bitrate based off what was accumulated.
-        """
-        now = datetime.now()
-        self.bitsize_count += size*8 # Bytes * 8 gives bits
-        if (now - self.last_bitrate).total_seconds() >= 1:
-            self.curr_bitrate = self.bitsize_count
-            self.bitsize_count = 0
-            self.last_bitrate = now
-            return self.curr_bitrate
-        return self.curr_bitrate
+        self.framer = CaniFramer(parent.header)
 
     def start(self):
         """
@@ -69,6 +27,8 @@ class CaniThread:
                 self.parent.logprint("CaniThread already running")
             return
         self.thread_signal.clear()
+        # Start framing fresh for the new connection
+        self.framer.reset()
         self.com_thread = threading.Thread(target=self.thread_read,name="CaniThread",daemon=True)
         # start com port read thread
         self.com_thread.start()
@@ -88,99 +48,89 @@ class CaniThread:
         self.com_thread = None
         if self.parent.verbose:
             self.parent.logprint("CaniThread stopped")
+            self.parent.logprint(f"RX: {self.framer.report()}")
 
     def thread_read(self):
         """
         Main threaded instance, reading serial buffer and handing it over to RX.
         """
-        # Keep calling the read method for the port
+        # Keep calling the read method for the port,
+        # sorting responses into lanes for the conductor
         while not self.thread_signal.is_set():
-            buf = self.thread_buffer()
-            if not buf: continue  # sure wish i was buff..
-            self.parent.conductor.go(buf)
+            for buf in self.thread_buffer():
+                self.parent.lanes.put(buf)
 
-    def thread_buffer(self) -> bytes:
+    def thread_buffer(self) -> list[bytes]:
         """
         Reads from the serial connection, extracting payloads returned from the radio.
+        Everything waiting in the port is drained in a single read and handed to the framer,
+        so a burst of packets costs one read instead of two per packet.
 
         Example:
             The current serial connection is read for any new commands.
 
         Returns:
-            bytes: Returns the payload that was read.
+            list[bytes]: Returns the payloads that were read, if any.
         """
         if self.parent.serial_conn is None or not getattr(self.parent.serial_conn,"is_open",False):
             # wait for port to be connected
             time.sleep(1)
-            return b""
-            
-        # read header 
-        # first two bytes are 5AA5, like command
-        # second two bytes are size.
-        packet = b""
-        read_so_far = 0
-        while read_so_far < 5:
-            # Because this is a threaded function, serial_conn can
-            # change to None at ANY MOMENT, even if it clears the
-            # check at the start of this function!
-            # Best to handle exceptions to cater those edge cases.
-            #if self.canipy.serial_conn is None or not self.canipy.serial_conn.is_open:
-            try:
-                chunk = self.parent.serial_conn.read(5-read_so_far)
-            except Exception as e:
-                if self.parent.verbose: (type(e))
-                # wait for port to be connected
-                time.sleep(1)
-                return b""
-            packet += chunk
-            read_so_far += len(chunk)
-            #print(f"{len(chunk)} {read_so_far}:")
-            if self.thread_signal.is_set(): return b""
-            
-        if len(packet) != 5:
-            self.parent.logprint("Unexpected header size")
-            if self.parent.verbose:
-                self.parent.logprint(f"Exp 5, got {len(packet)}")
-            #print(packet)
-            return b""
-        # verify it is the header
-        if packet[:2] != self.parent.header:
-            self.parent.logprint("Header not found")
-            if self.parent.verbose:
-                self.parent.logprint(f"Received: {' '.join(f'{b:02X}' for b in packet[:2])}")
-            #print(packet)
-            return b""
-        # Both of these do the same thing, but codebase
-        # is to keep consistency with the more
-        # biblically accurate bitwise operation...
-        #size = packet[2]*256 + packet[3]
-        size = (packet[2] << 8) | packet[3]
-        # read the rest of the packet
-        #if self.canipy.serial_conn is None or not self.canipy.serial_conn.is_open:
+            return []
+
+        # Because this is a threaded function, serial_conn can
+        # change to None at ANY MOMENT, even if it clears the
+        # check at the start of this function!
+        # Best to handle exceptions to cater those edge cases.
         try:
-            rest_of_packet = self.parent.serial_conn.read(size+1)
+            # Block for a byte if nothing is waiting,
+            # then sweep up whatever arrived with it
+            chunk = self.parent.serial_conn.read(self.parent.serial_conn.in_waiting or 1)
+            if chunk and self.parent.serial_conn.in_waiting:
+                chunk += self.parent.serial_conn.read(self.parent.serial_conn.in_waiting)
         except Exception as e:
-            if self.parent.verbose: (type(e))
+            if self.parent.verbose: self.parent.logprint(f"Read failed ({type(e).__name__})")
             # wait for port to be connected
             time.sleep(1)
-            return b""
-        if len(rest_of_packet) != size+1:
-            self.parent.logprint("Unexpected packet size")
+            return []
+        if not chunk: return []  # sure wish i was buff..
+
+        return self.thread_frames(chunk)
+
+    def thread_frames(self, chunk:bytes, framer:CaniFramer=None) -> list[bytes]:
+        """
+        Hands freshly read bytes to the framer, extracting payloads of any completed packets.
+
+        Args:
+            chunk (bytes): The bytes returned by a single read of the port.
+            framer (CaniFramer, optional): Framer to use instead of the reader's own,
+                for bytes that didn't come from the port. Default to None.
+
+        Returns:
+            list[bytes]: Returns the payloads that were completed, if any.
+        """
+        framer = framer or self.framer
+        skipped = framer.skip_count
+        frames = framer.feed(chunk)
+        self.parent.metrics.rx_bytes.add(len(chunk))
+        if frames: self.parent.metrics.rx_frames.add(len(frames))
+        capture = self.parent.capture
+        if capture.enabled:
+            for frame in frames:
+                capture.record(capture.RX, frame)
+        if framer.skip_count != skipped:
+            self.parent.logprint("Header not found")
             if self.parent.verbose:
-                self.parent.logprint(f"Exp {size}, got {len(rest_of_packet)}")
-            #print(packet)
-            #print(rest_of_packet)
-            return b""
-        # combine the return code and data and return
-        # ignoring header, length, sum in printout
-        buf = packet[4:]
-        # bugfix specifically for the diag response
-        buf += rest_of_packet[:-2] if buf[0] != 0xF1 else rest_of_packet[:-1]
-        if self.parent.verbose:
-            # Ignore clock responses unless logging them
-            if buf[0] != 0xDF or self.parent.clock_logging:
-                # Ignore data responses unless logging them
-                if buf[0] != 0xEA or self.parent.data_logging:
-                    self.parent.logprint(f"Received: {' '.join(f'{b:02X}' for b in buf)}")
-        #return bytes([packet[4]])+rest_of_packet[:size-1]
-        return buf
+                self.parent.logprint(f"Skipped {framer.skip_count - skipped} bytes to resync")
+
+        payloads = []
+        dump = self.parent.wants(verbose=True)
+        for frame in frames:
+            buf = framer.unwrap(frame)
+            if dump:
+                # Ignore clock responses unless logging them
+                if buf[0] != 0xDF or self.parent.clock_logging:
+                    # Ignore data responses unless logging them
+                    if buf[0] != 0xEA or self.parent.data_logging:
+                        self.parent.logprint(f"Received: {' '.join(f'{b:02X}' for b in buf)}")
+            payloads.append(buf)
+        return payloads
@@ -1,3 +1,5 @@
+from concurrent.futures import Future
+
 class CaniTX:
     """
     Functions related to transmission of commands.
@@ -64,11 +66,52 @@ class CaniTX:
             return b""
         length = len(payload).to_bytes(2, byteorder="big")
         command = self.parent.header + length + payload + self.parent.tail
-        self.parent.serial_conn.write(command)
-        if self.parent.verbose:
+        if not self.parent.transmit(command):
+            self.parent.errorprint("Too many commands waiting to be sent")
+            return b""
+        capture = self.parent.capture
+        if capture.enabled: capture.record(capture.TX, command)
+        if self.parent.wants(verbose=True):
             self.parent.logprint(f"Sent: {' '.join(f'{b:02X}' for b in payload)}")
         return payload
 
+    def expect(self, command:bytes, timeout:float=2.0) -> Future:
+        """
+        Prepares a future for the response to a command about to be sent.
+        Register before sending, as the radio may answer before send returns.
+
+        Example:
+            Calling "expect(bytes([0x10]))" before "change_channel(1)" gives a future
+            that resolves once the radio acknowledges the tune with 90 hex.
+
+        Args:
+            command (bytes): The command payload, or at least its leading bytes.
+            timeout (float, optional): Seconds until the future gives up on a response. Default to 2.
+
+        Returns:
+            Future: Resolves to the response payload, or fails on timeout or alert status.
+        """
+        return self.parent.reply.expect(command, timeout)
+
+    def request(self, payload:bytes, timeout:float=2.0) -> Future:
+        """
+        Sends a payload like send does, returning a future for its response.
+
+        Example:
+            "request(bytes([0x31])).result(2)" returns the B1 response carrying the radio ID.
+
+        Args:
+            payload (bytes): A command, comprised as a set of bytes, to be encased and sent to the radio.
+            timeout (float, optional): Seconds until the future gives up on a response. Default to 2.
+
+        Returns:
+            Future: Resolves to the response payload, or fails on timeout or alert status.
+        """
+        future = self.expect(payload, timeout)
+        if not self.send(payload):
+            future.set_exception(ConnectionError("No device in use"))
+        return future
+
     def power_up(self, ch_lbl:int=16, cat_lbl:int=16, title_lbl:int=36, loss_exp:bool=True) -> bytes:
         """
         Sends in a command to power on the radio tuner.
@@ -0,0 +1,175 @@
+import queue, threading, time
+
+class CaniWriter:
+    """
+    Dedicated thread writing queued commands out to the port, so neither the UI
+    nor the reader thread are held up by a slow or blocked write.
+    Commands waiting in the queue are coalesced into a single write, and output
+    can be paced to a byte rate for radios with small input buffers.
+
+    Args:
+        parent (CaniPy): A main CaniPy instance that this script will support.
+        maxsize (int, optional): Amount of commands the queue holds before refusing more. Default to 64.
+        byte_rate (int, optional): Bytes per second to pace output to, 0 for no pacing. Default to 0.
+        batch_size (int, optional): Most bytes coalesced into a single write. Default to 256.
+
+    Attributes:
+        tx_queue (queue.Queue): Outbound commands, alongside the time they were queued.
+        thread_signal (threading.Event): Prompts the threaded function to halt.
+        tx_thread (threading.Thread): The actual thread entity writing commands.
+        next_write (float): Monotonic time the next write may start at when pacing.
+
+        write_count (int): Amount of writes (syscalls) made.
+        command_count (int): Amount of commands written.
+        byte_count (int): Amount of bytes written.
+        drop_count (int): Amount of commands refused as the queue was full.
+        last_latency (float): Seconds between queueing and writing the last command.
+        max_latency (float): Longest seconds between queueing and writing a command.
+        total_latency (float): Sum of latencies, for averaging.
+    """
+    def __init__(self, parent:"CaniPy", maxsize:int=64, byte_rate:int=0, batch_size:int=256):
+        self.parent = parent
+        self.byte_rate = byte_rate
+        self.batch_size = batch_size
+        self.tx_queue = queue.Queue(maxsize)
+        self.thread_signal = threading.Event()
+        self.tx_thread = None
+        self.next_write = 0
+
+        self.write_count = 0
+        self.command_count = 0
+        self.byte_count = 0
+        self.drop_count = 0
+        self.last_latency = 0
+        self.max_latency = 0
+        self.total_latency = 0
+
+    def start(self):
+        """
+        Starts the thread
+        """
+        if self.tx_thread and self.tx_thread.is_alive():
+            return
+        self.thread_signal.clear()
+        self.next_write = 0
+        self.tx_thread = threading.Thread(target=self.thread_write,name="CaniWriter",daemon=True)
+        self.tx_thread.start()
+
+    def stop(self, timeout:float=1.0):
+        """
+        Writes out whatever is still queued, then stops the thread.
+
+        Args:
+            timeout (float, optional): Seconds to allow for the queue to empty. Default to 1.
+        """
+        if not self.tx_thread: return
+        self.flush(timeout)
+        self.thread_signal.set()
+        self.tx_thread.join()
+        self.tx_thread = None
+        # Anything left over is not going anywhere
+        while not self.tx_queue.empty():
+            self.tx_queue.get_nowait()
+            self.tx_queue.task_done()
+        if self.parent.verbose:
+            self.parent.logprint(f"TX: {self.report()}")
+
+    def flush(self, timeout:float=1.0):
+        """
+        Waits for the queued commands to be written out.
+
+        Args:
+            timeout (float, optional): Most seconds to wait for. Default to 1.
+        """
+        deadline = time.monotonic() + timeout
+        while self.tx_queue.unfinished_tasks and time.monotonic() < deadline:
+            if not (self.tx_thread and self.tx_thread.is_alive()): return
+            time.sleep(0.01)
+
+    def put(self, command:bytes) -> bool:
+        """
+        Queues a complete packet to be written out. Never blocks the caller.
+        If the thread is not running, the packet is written right away instead.
+
+        Args:
+            command (bytes): The packet, including header, length, and footer.
+
+        Returns:
+            bool: Whether the packet was accepted.
+        """
+        if not (self.tx_thread and self.tx_thread.is_alive()):
+            self.parent.serial_conn.write(command)
+            self.parent.metrics.tx_bytes.add(len(command))
+            return True
+        try:
+            self.tx_queue.put_nowait((command, time.monotonic()))
+        except queue.Full:
+            self.drop_count += 1
+            return False
+        return True
+
+    def depth(self) -> int:
+        """
+        Returns:
+            int: Amount of commands currently waiting to be written.
+        """
+        return self.tx_queue.qsize()
+
+    def thread_write(self):
+        """
+        Main threaded instance, writing out queued commands.
+        """
+        while not self.thread_signal.is_set():
+            try:
+                batch = [self.tx_queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            size = len(batch[0][0])
+            # When pacing, keep each write to about a tenth of a second's worth
+            limit = min(self.batch_size, self.byte_rate // 10) if self.byte_rate else self.batch_size
+            # Coalesce whatever else is already waiting
+            while size < limit:
+                try:
+                    batch.append(self.tx_queue.get_nowait())
+                except queue.Empty:
+                    break
+                size += len(batch[-1][0])
+            data = b"".join(command for command, _ in batch)
+
+            if self.byte_rate:
+                # Hold off until the radio has had time for the last write
+                now = time.monotonic()
+                if self.next_write > now:
+                    time.sleep(self.next_write - now)
+                self.next_write = max(now, self.next_write) + size / self.byte_rate
+
+            try:
+                self.parent.serial_conn.write(data)
+            except Exception as e:
+                if self.parent.verbose:
+                    self.parent.logprint(f"Write failed ({type(e).__name__})")
+            else:
+                now = time.monotonic()
+                self.write_count += 1
+                self.command_count += len(batch)
+                self.byte_count += size
+                self.parent.metrics.tx_bytes.add(size)
+                for _, queued in batch:
+                    self.last_latency = now - queued
+                    self.max_latency = max(self.max_latency, self.last_latency)
+                    self.total_latency += self.last_latency
+            finally:
+                for _ in batch:
+                    self.tx_queue.task_done()
+
+    def report(self) -> str:
+        """
+        Returns:
+            str: A one-line summary of the writer counters.
+        """
+        avg = self.total_latency / self.command_count if self.command_count else 0
+        return (
+            f"{self.command_count} commands in {self.write_count} writes, "
+            f"{self.depth()} queued, {self.drop_count} dropped, "
+            f"latency avg {avg*1000:.1f}ms max {self.max_latency*1000:.1f}ms"
+        )
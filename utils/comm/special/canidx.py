@@ -1,4 +1,4 @@
-import time
+from concurrent.futures import Future
 
 class CaniDX:
     """
@@ -23,20 +23,39 @@ class CaniDX:
         # Java ref only used it as a suffix placeholder.
         # Assuming this sequence works regardless.
 
-        self.com_listen(True)
-        time.sleep(1)  # These sleeps should be event driven instead
-
-        self.voltage(True, True)
-        time.sleep(1)
+        # Each step moves on as soon as the Direct acknowledges it,
+        # otherwise give it up to a second like before.
+        self.parent.reply.wait(self.ack(self.com_listen, True), 1)
+        self.parent.reply.wait(self.ack(self.voltage, True, True), 1)
 
         # RX might not be received when unmuting,
         # Let the function finish as-is after this
-        self.dac_mute(False)
-        time.sleep(1)
+        self.parent.reply.wait(self.ack(self.dac_mute, False), 1)
 
         # Power up the radio
         self.parent.tx.power_up()
 
+    def ack(self, command, *args, timeout:float=1.0) -> Future:
+        """
+        Runs one of the Direct commands, returning a future for its acknowledgement (E4 or F4 hex).
+
+        Example:
+            "ack(self.com_listen, True).result(1)" enables listening mode
+            and waits up to a second for the Direct to acknowledge it.
+
+        Args:
+            command: The Direct command function to run.
+            *args: Arguments to pass to the command.
+            timeout (float, optional): Seconds until the future gives up on a response. Default to 1.
+
+        Returns:
+            Future: Resolves to the acknowledgement payload.
+        """
+        future = self.parent.tx.expect(bytes([0x74]), timeout)
+        if not command(*args):
+            future.set_exception(ConnectionError("No device in use"))
+        return future
+
     def com_listen(self, toggle:bool) -> bytes:
         """
         Sets the Direct's serial module to allow incoming commands
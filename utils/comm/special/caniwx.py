@@ -1,5 +1,11 @@
-import os
+import binascii, os, time
 from datetime import datetime
+from collections.abc import Callable
+
+from .caniwxassembler import CaniWXAssembler
+from .caniwxcache import CaniWXCache
+from .caniwxpipeline import CaniWXPipeline
+from .caniwxstore import CaniWXStore, CaniWXArchive
 
 class CaniWX:
     """
@@ -7,12 +13,20 @@ class CaniWX:
 
     Attributes:
         parent (CaniPy): A main CaniPy instance that this script will support.
+        store (CaniWXStore): Segmented storage that verified data frames are written to.
+        assembler (CaniWXAssembler): Puts verified data frames back together into products, once given a callback.
+        cache (CaniWXCache): Recognizes verified data frames when they are rebroadcast.
+        pipeline (CaniWXPipeline): Worker threads handling data frames off the reader thread.
     
     Lambda:
         data_stop(): Instructs the radio to halt data RX.
     """
     def __init__(self, parent:"CaniPy"):
         self.parent = parent
+        self.store = CaniWXStore(parent)
+        self.assembler = CaniWXAssembler(parent)
+        self.cache = CaniWXCache()
+        self.pipeline = CaniWXPipeline(parent)
 
         self.data_stop = lambda: self.set_datachan(0xFF, True, True)
 
@@ -24,6 +38,9 @@ class CaniWX:
         Start with all on, polynomial of 0x1021, then XOR with all on for output.
         reveng.sourceforge.io/crc-catalogue/16.htm#crc.cat.crc-16-genibus
 
+        That's the same polynomial as binhex's CRC-CCITT, so the table-driven
+        C implementation in binascii does the heavy lifting, given all on to start.
+
         Example:
             Provided with 4 bytes "AB CD 12 34", the
             resulting Genibus sum is 0xF836.
@@ -34,22 +51,8 @@ class CaniWX:
         Returns:
             int: Provides with the resulting sum.
         """
-        datasum = 0xFFFF  # Begin with all bits as 1
-        # For each byte
-        for byte in data:
-            # XOR assign to upper half
-            datasum ^= (byte << 8)
-            # For each bit
-            for _ in range(8):
-                # Is the sum's biggest bit currently 1?
-                if datasum & 0x8000:
-                    # Shift left and XOR with polynomial
-                    datasum = ((datasum << 1) ^ 0x1021) & 0xFFFF
-                else:
-                    # Only shift left otherwise
-                    datasum = (datasum << 1) & 0xFFFF
-        # XOR to get the final result
-        return datasum ^ 0xFFFF
+        # Begin with all bits as 1, XOR to get the final result
+        return binascii.crc_hqx(data, 0xFFFF) ^ 0xFFFF
 
     @staticmethod
     def write_data(sid:int, frame:int, data:bytes, crc_sum:int):
@@ -78,6 +81,55 @@ class CaniWX:
             # Skip saving if permission denied or FS is read-only
             pass
 
+    def verify_files(self, path:str="data") -> list[str]:
+        """
+        Checks stored data against its sum, both frames in segments against the sum
+        in their index, and files stored the old way by write_data against the sum
+        at the end of their name.
+
+        Example:
+            "data/230/161_250101000000abcd.bin" is expected to have a sum of ABCD.
+            A mismatched frame in a segment is reported as "data/230 frame 161 at 1735689600.0".
+
+        Args:
+            path (str, optional): The folder data was stored under. Default to "data".
+
+        Returns:
+            list[str]: The frames and paths of the files whose sum does not match.
+        """
+        checked = 0
+        mismatched = []
+        archive = CaniWXArchive(path)
+        for sid in archive.sids():
+            for stamp, frame, crc_sum, data in archive.frames(sid):
+                checked += 1
+                got = self.data_sum(data)
+                if got != crc_sum:
+                    mismatched.append(f"{path}/{sid} frame {frame} at {stamp}")
+                    if self.parent.verbose:
+                        self.parent.logprint(f"{mismatched[-1]}: expected {crc_sum:04X}, got {got:04X}")
+        for folder, _, names in os.walk(path):
+            for name in sorted(names):
+                if not name.endswith(".bin"): continue
+                file = os.path.join(folder, name)
+                checked += 1
+                try:
+                    want = int(name[-8:-4], 16)
+                    with open(file, "rb") as stored:
+                        got = self.data_sum(stored.read())
+                except (ValueError, OSError):
+                    # Not named or readable like write_data's own
+                    mismatched.append(file)
+                    if self.parent.verbose:
+                        self.parent.logprint(f"{file}: unreadable or no sum in name")
+                    continue
+                if want != got:
+                    mismatched.append(file)
+                    if self.parent.verbose:
+                        self.parent.logprint(f"{file}: expected {want:04X}, got {got:04X}")
+        self.parent.logprint(f"Verified {checked} frames and files, {len(mismatched)} mismatched")
+        return mismatched
+
     def set_datachan(self, sid:int, datflagone:bool=False, datflagtwo:bool=False) -> bytes:
         """
         Sets the specialized receiver to a data channel.
@@ -153,50 +205,98 @@ class CaniWX:
             self.parent.logprint("WR - Check RX for GPS module confirmation")
         return self.parent.tx.send(bytes([0x4B, 0x09, 0x00, 0x01 if toggle else 0x03]))
 
-    def parse_data(self, payload:bytes, write:bool=False, logging:bool=False):
+    def parse_data(self, payload:bytes, write:bool=False, logging:bool=False,
+                   record:Callable[..., None]=None) -> bool:
         """
-        Rudimentary data implementation.
-        Prints out information about the data, and passes it to be saved if prompted.
+        Takes in a data frame, skipping repeats, verifying it, then keeping it.
+        Every data frame goes through here, off the reader thread by way of the pipeline.
 
         Args:
             payload (bytes): A response, comprised as a set of bytes, to parse the information from.
-            write (bool, optional): Write the contained data to disk after verify. Default set to false.
+            write (bool, optional): Write the contained data to the store after verify. Default set to false.
             logging (bool, optional): Full printout of every data response. Default to false.
+            record (Callable, optional): Takes each stage (dedup, verify, keep) with the nanoseconds it took,
+                flagged as a repeat or mismatch, like CaniWXPipeline.record. Default to None.
+
+        Returns:
+            bool: Whether the frame was kept.
+        """
+        start = time.perf_counter_ns()
+        # Repeats of verified frames were already taken care of,
+        # header holds SID, frame, length, and sum
+        seen = self.cache.seen(payload[2:12])
+        checked = time.perf_counter_ns()
+        if record: record("dedup", checked - start, repeat=seen)
+        if seen: return False
+        verified = self.verify_data(payload)
+        end = time.perf_counter_ns()
+        if record: record("verify", end - checked, mismatch=not verified)
+        if not verified: return False
+        self.keep_data(payload, write, logging)
+        if record: record("keep", time.perf_counter_ns() - end)
+        return True
+
+    def verify_data(self, payload:bytes) -> bool:
+        """
+        Checks the data of a frame against its sum, reporting a mismatch.
+
+        Args:
+            payload (bytes): A data frame response (EA D0 hex).
+
+        Returns:
+            bool: Whether the sums match.
         """
         # If CRC sums match, process it, otherwise report mismatch
         if (payload[11]|(payload[10]<<8)) == self.data_sum(payload[12:]):
-            if write:
-                self.write_data(
-                    payload[2],
-                    payload[3],
-                    payload[12:],
-                    payload[11]|(payload[10]<<8)
-                )
-            if logging:
-                self.parent.logprint("=== DATA  INFO ===")
-                self.parent.logprint(f"SID: {payload[2]}")
-                self.parent.logprint(f"Frame: {payload[3]}")
-                self.parent.logprint(f"Length: {payload[7]} bytes")
-                self.parent.logprint(
-                    f"Bitrate: "
-                    f"{(self.parent.thread.calc_bitrate(payload[7])/1000):.3f}"
-                    f"kbps"
-                )
-                self.parent.logprint(
-                    f"Sum: {''.join(f'{b:02X}' for b in payload[10:12])}"
-                )
-                # if self.parent.verbose:
-                #print("===    DATA    ===")
-                # Safely print out bare data
-                #print(payload[12:].decode("latin-1", errors="replace"))
-                #print("===    HEX!    ===")
-                # Print out hex dump
-                #print(" ".join(f'{b:02X}' for b in payload[12:]))
-                self.parent.logprint("==================")
-        else:
-            self.parent.logprint("Sum mismatch!")
-            if self.parent.verbose:
-                self.parent.logprint(
-                    f"Expected {''.join(f'{b:02X}' for b in payload[10:12])}, "
-                    f"got {self.data_sum(payload[12:]):02X}"
-                )
+            return True
+        self.parent.metrics.crc_failures.inc()
+        self.parent.logprint("Sum mismatch!")
+        if self.parent.verbose:
+            self.parent.logprint(
+                f"Expected {''.join(f'{b:02X}' for b in payload[10:12])}, "
+                f"got {self.data_sum(payload[12:]):02X}"
+            )
+        return False
+
+    def keep_data(self, payload:bytes, write:bool=False, logging:bool=False):
+        """
+        Takes in a verified data frame, storing it if prompted and passing it to be assembled.
+
+        Args:
+            payload (bytes): A data frame response (EA D0 hex), already verified.
+            write (bool, optional): Write the contained data to the store. Default set to false.
+            logging (bool, optional): Full printout of every data response. Default to false.
+        """
+        self.cache.add(payload[2:12])
+        if write:
+            self.store.append(
+                payload[2],
+                payload[3],
+                payload[12:],
+                payload[11]|(payload[10]<<8)
+            )
+        # Nobody to hand products to, don't hold on to them
+        if self.assembler.callback:
+            self.assembler.feed(payload)
+        self.parent.metrics.data_bytes.add(payload[7])
+        if logging:
+            self.parent.logprint("=== DATA  INFO ===")
+            self.parent.logprint(f"SID: {payload[2]}")
+            self.parent.logprint(f"Frame: {payload[3]}")
+            self.parent.logprint(f"Length: {payload[7]} bytes")
+            self.parent.logprint(
+                f"Bitrate: "
+                f"{(self.parent.metrics.data_bytes.rate()*8/1000):.3f}"
+                f"kbps"
+            )
+            self.parent.logprint(
+                f"Sum: {''.join(f'{b:02X}' for b in payload[10:12])}"
+            )
+            # if self.parent.verbose:
+            #print("===    DATA    ===")
+            # Safely print out bare data
+            #print(payload[12:].decode("latin-1", errors="replace"))
+            #print("===    HEX!    ===")
+            # Print out hex dump
+            #print(" ".join(f'{b:02X}' for b in payload[12:]))
+            self.parent.logprint("==================")
@@ -0,0 +1,220 @@
+import threading, time
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+@dataclass
+class CaniWXProduct:
+    """
+    A data product, put together from the frames it was sent over.
+
+    Attributes:
+        sid (int): The service ID the product came from.
+        first (int): Frame number the product started at.
+        frames (dict): Frame positions within the product mapped to their data.
+        last (int): Frame number last added to the product.
+        length (int): Position of the last frame added.
+        size (int): Amount of data bytes held.
+        started (float): Monotonic time the first frame arrived.
+        updated (float): Monotonic time the latest frame arrived.
+        whole (bool): Whether the frame before the first was seen to end a product,
+            meaning nothing was missed at the start.
+
+        data (bytes): The product, once finished. Missing frames are left out.
+        missing (tuple[int]): Frame numbers that never arrived, once finished.
+    """
+    sid: int
+    first: int
+    started: float
+    whole: bool = False
+    frames: dict = field(default_factory=dict)
+    last: int = 0
+    length: int = 0
+    size: int = 0
+    updated: float = 0
+    data: bytes = b""
+    missing: tuple = ()
+
+    @property
+    def complete(self) -> bool:
+        """
+        Returns:
+            bool: Whether every frame of the product arrived.
+        """
+        return self.whole and not self.missing
+
+class CaniWXAssembler:
+    """
+    Groups data frames (EA D0 hex) back into the products they were split from.
+    Frames count up per SID, wrapping at 256, and a frame shorter than the full
+    208 bytes marks the end of a product. Finished products are handed to the
+    callback once, as a single buffer.
+    Unfinished products are dropped once they go stale, or the oldest first if
+    too much is held at once.
+
+    Example:
+        With "canipy.wx.assembler.callback = func", func is called with
+        a CaniWXProduct whenever a product is finished.
+
+    Args:
+        parent (CaniPy): A main CaniPy instance that this script will support.
+        callback (Callable, optional): Function taking finished products. Default to None.
+        partial (bool, optional): Whether products with missing frames are handed over too. Default to False.
+        max_bytes (int, optional): Most data bytes held across unfinished products. Default to 4 MiB.
+        max_frames (int, optional): Most frames a single product can span. Default to 4096.
+        max_age (float, optional): Seconds without a new frame before a product is dropped. Default to 120.
+
+    Attributes:
+        products (dict): SIDs mapped to their unfinished product.
+        ended (dict): SIDs mapped to the frame number that ended their last product.
+        held (int): Data bytes currently held across unfinished products.
+        next_check (float): Monotonic time stale products are next looked for.
+        lock (threading.Lock): Guards the products, in case frames come from several threads.
+
+        frame_count (int): Amount of frames taken in.
+        product_count (int): Amount of complete products finished.
+        partial_count (int): Amount of products finished with frames missing.
+        evicted_count (int): Amount of unfinished products dropped.
+    """
+    # Length of every frame but the last in a product
+    FULL_FRAME = 0xD0
+
+    def __init__(self, parent:"CaniPy", callback:Callable[[CaniWXProduct], None]=None, partial:bool=False,
+                 max_bytes:int=4<<20, max_frames:int=4096, max_age:float=120):
+        self.parent = parent
+        self.callback = callback
+        self.partial = partial
+        self.max_bytes = max_bytes
+        self.max_frames = max_frames
+        self.max_age = max_age
+
+        self.products = {}
+        self.ended = {}
+        self.held = 0
+        self.next_check = 0
+        self.lock = threading.Lock()
+
+        self.frame_count = 0
+        self.product_count = 0
+        self.partial_count = 0
+        self.evicted_count = 0
+
+    def feed(self, payload:bytes):
+        """
+        Adds a data frame to the product for its SID, finishing the product if it's the last frame.
+        Frames are expected to have passed their sum already.
+
+        Args:
+            payload (bytes): A data frame response (EA D0 hex).
+        """
+        sid, frame, length = payload[2], payload[3], payload[7]
+        now = time.monotonic()
+        finished = None
+        with self.lock:
+            self.frame_count += 1
+            product = self.products.get(sid)
+            if product is None:
+                if frame == self.ended.get(sid):
+                    # Repeat of the frame that just ended a product
+                    return
+                product = CaniWXProduct(
+                    sid, frame, now,
+                    whole=self.ended.get(sid) == (frame - 1) % 256,
+                    last=frame
+                )
+                self.products[sid] = product
+                position = 0
+            else:
+                step = (frame - product.last) % 256
+                # Repeat of the latest frame
+                if not step: return
+                position = product.length + step
+            if position >= self.max_frames:
+                # Runaway product, likely lost its end
+                self.evict(sid)
+                return
+            product.frames[position] = payload[12:12+length]
+            product.last = frame
+            product.length = position
+            product.size += length
+            product.updated = now
+            self.held += length
+
+            if length < self.FULL_FRAME:
+                finished = self.finish(sid)
+            elif self.held > self.max_bytes:
+                # Make room, oldest first
+                self.evict(min(self.products, key=lambda key: self.products[key].updated))
+            if now >= self.next_check:
+                self.next_check = now + 1
+                for key in [key for key, held in self.products.items() if now - held.updated > self.max_age]:
+                    self.evict(key)
+
+        if finished and self.callback and (finished.complete or self.partial):
+            self.callback(finished)
+
+    def finish(self, sid:int) -> CaniWXProduct:
+        """
+        Takes a product off the unfinished ones, joining up its frames.
+
+        Args:
+            sid (int): The service ID of the product.
+
+        Returns:
+            CaniWXProduct: The finished product.
+        """
+        product = self.products.pop(sid)
+        self.held -= product.size
+        self.ended[sid] = product.last
+        product.missing = tuple(
+            (product.first + position) % 256
+            for position in range(product.length + 1) if position not in product.frames
+        )
+        product.data = b"".join(product.frames[position] for position in sorted(product.frames))
+        product.frames = {}
+        if product.complete:
+            self.product_count += 1
+        else:
+            self.partial_count += 1
+        if self.parent.wants("data"):
+            self.parent.logprint(
+                f"Data product from SID {sid} finished, {product.size} bytes over {product.length+1} frames"
+                f"{'' if product.whole else ', start missed'}"
+                f"{f', {len(product.missing)} missing' if product.missing else ''}"
+            )
+        return product
+
+    def evict(self, sid:int):
+        """
+        Drops an unfinished product.
+
+        Args:
+            sid (int): The service ID of the product.
+        """
+        product = self.products.pop(sid)
+        self.held -= product.size
+        # Whatever comes next can't be assumed to start a product
+        self.ended.pop(sid, None)
+        self.evicted_count += 1
+        if self.parent.verbose:
+            self.parent.logprint(f"Dropped unfinished data product from SID {sid} ({product.length+1} frames)")
+
+    def clear(self):
+        """
+        Drops every unfinished product, such as when the data channel changes.
+        """
+        with self.lock:
+            self.products.clear()
+            self.ended.clear()
+            self.held = 0
+
+    def report(self) -> str:
+        """
+        Returns:
+            str: A one-line summary of the assembler counters.
+        """
+        return (
+            f"{self.frame_count} frames, {self.product_count} products, "
+            f"{self.partial_count} partial, {self.evicted_count} dropped, "
+            f"{len(self.products)} pending ({self.held} bytes)"
+        )
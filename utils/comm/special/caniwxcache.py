@@ -0,0 +1,94 @@
+import threading, time
+
+from collections import OrderedDict
+
+class CaniWXCache:
+    """
+    Remembers data frames that were already verified, so copies rebroadcast
+    by the service can be recognized before summing, storing, or assembling them again.
+    Frames are keyed by their header, which holds the SID, frame number, length, and sum.
+    Least recently seen frames are forgotten first once full, and any frame after a while.
+
+    Example:
+        "if cache.seen(payload[2:12])" is true for a frame that went through "cache.add(payload[2:12])"
+        less than an hour ago.
+
+    Args:
+        maxsize (int, optional): Most frames remembered at once. Default to 8192.
+        ttl (float, optional): Seconds a frame is remembered for. Default to an hour.
+
+    Attributes:
+        entries (OrderedDict): Frame keys mapped to when they were added, least recently seen first.
+        lock (threading.Lock): Guards the entries, in case frames come from several threads.
+
+        hits (int): Amount of frames recognized as repeats.
+        misses (int): Amount of frames not seen before.
+        evictions (int): Amount of frames forgotten to make room.
+        expired (int): Amount of frames forgotten for being too old.
+    """
+    def __init__(self, maxsize:int=8192, ttl:float=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def seen(self, key:bytes) -> bool:
+        """
+        Checks whether a frame was already added.
+
+        Args:
+            key (bytes): The frame's key.
+
+        Returns:
+            bool: Whether the frame is a repeat.
+        """
+        with self.lock:
+            added = self.entries.get(key)
+            if added is not None:
+                if time.monotonic() - added < self.ttl:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return True
+                # Old enough to be new data again
+                del self.entries[key]
+                self.expired += 1
+            self.misses += 1
+            return False
+
+    def add(self, key:bytes):
+        """
+        Remembers a frame, which should only be done once it's verified.
+
+        Args:
+            key (bytes): The frame's key.
+        """
+        with self.lock:
+            self.entries[key] = time.monotonic()
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Forgets every frame.
+        """
+        with self.lock:
+            self.entries.clear()
+
+    def report(self) -> str:
+        """
+        Returns:
+            str: A one-line summary of the cache counters.
+        """
+        total = self.hits + self.misses
+        return (
+            f"{self.hits} hits, {self.misses} misses"
+            f"{f' ({self.hits/total:.0%} repeats)' if total else ''}, "
+            f"{self.evictions} evicted, {self.expired} expired, {len(self.entries)} held"
+        )
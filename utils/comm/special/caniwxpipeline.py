@@ -0,0 +1,177 @@
+import queue, threading, time
+
+class CaniWXPipeline:
+    """
+    Takes data frames (EA D0 hex) off the reader thread, handing them to worker threads
+    that verify, dedup, store, and assemble them. The reader only has to queue a frame
+    before getting back to the port.
+    Frames are spread across workers by SID, so frames from a SID are always handled
+    in the order they arrived, which the assembler relies on.
+
+    Threads only, no process pool. Summing holds the GIL (binascii.crc_hqx doesn't release it),
+    so the workers don't sum in parallel, what they buy is keeping the reader off the
+    sums, disk writes (which do release it), and assembly. Processes wouldn't pay off:
+    summing a 208-byte frame takes about 1us in place, while handing it to a process pool
+    took about 136us a frame submitted one at a time, and still about 5us batched 64 at a time,
+    against the 50-some frames a second a radio sends at 115200 baud. Dedup, the store,
+    and the assembler also keep state that would have to be shared across processes.
+
+    Args:
+        parent (CaniPy): A main CaniPy instance that this script will support.
+        workers (int, optional): Amount of worker threads. Default to 2.
+        maxsize (int, optional): Frames each worker queues before dropping more. Default to 512.
+
+    Attributes:
+        queues (list[queue.Queue]): Frames waiting per worker, alongside the time they were queued.
+        threads (list[threading.Thread]): The worker thread entities.
+        thread_signal (threading.Event): Prompts the threaded functions to halt.
+        lock (threading.Lock): Keeps the workers from being started and stopped at once.
+        stats_lock (threading.Lock): Guards the counters and stage times, updated from every worker.
+
+        frame_count (int): Amount of frames handled.
+        repeat_count (int): Amount of frames skipped as repeats.
+        mismatch_count (int): Amount of frames failing their sum.
+        drop_count (int): Amount of frames refused as the queue was full.
+        stages (dict): Stage names (wait, dedup, verify, keep) mapped to count, total and max nanoseconds.
+    """
+    def __init__(self, parent:"CaniPy", workers:int=2, maxsize:int=512):
+        self.parent = parent
+        self.workers = workers
+        self.maxsize = maxsize
+        self.queues = []
+        self.threads = []
+        self.thread_signal = threading.Event()
+        self.lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Clears the counters and stage times.
+        """
+        with self.stats_lock:
+            self.frame_count = 0
+            self.repeat_count = 0
+            self.mismatch_count = 0
+            self.drop_count = 0
+            self.stages = {stage: [0, 0, 0] for stage in ("wait", "dedup", "verify", "keep")}
+
+    def start(self):
+        """
+        Starts the worker threads
+        """
+        with self.lock:
+            if self.threads: return
+            self.thread_signal.clear()
+            self.queues = [queue.Queue(self.maxsize) for _ in range(self.workers)]
+            self.threads = [
+                threading.Thread(target=self.thread_work,args=(work,),name=f"CaniWXPipeline-{num}",daemon=True)
+                for num, work in enumerate(self.queues)
+            ]
+            for thread in self.threads:
+                thread.start()
+
+    def stop(self):
+        """
+        Lets the workers finish whatever is queued, then stops them.
+        """
+        with self.lock:
+            if not self.threads: return
+            self.thread_signal.set()
+            for thread in self.threads:
+                thread.join()
+            self.threads = []
+            self.queues = []
+        if self.parent.verbose:
+            self.parent.logprint(f"WX: {self.report()}")
+
+    def put(self, payload:bytes) -> bool:
+        """
+        Queues a data frame for the workers, starting them if they aren't running yet.
+        Never blocks the caller.
+
+        Args:
+            payload (bytes): A data frame response (EA D0 hex).
+
+        Returns:
+            bool: Whether the frame was accepted.
+        """
+        if not self.threads:
+            self.start()
+        queues = self.queues
+        try:
+            queues[payload[2] % len(queues)].put_nowait((payload, time.perf_counter_ns()))
+        except queue.Full:
+            with self.stats_lock:
+                self.drop_count += 1
+            return False
+        except (IndexError, ZeroDivisionError):
+            # Stopped in the meantime
+            return False
+        return True
+
+    def depth(self) -> int:
+        """
+        Returns:
+            int: Amount of frames currently waiting on the workers.
+        """
+        return sum(work.qsize() for work in self.queues)
+
+    def thread_work(self, work:queue.Queue):
+        """
+        Main threaded instance, handling frames queued for a worker.
+
+        Args:
+            work (queue.Queue): The queue of the worker.
+        """
+        wx = self.parent.wx
+        while True:
+            try:
+                payload, queued = work.get(timeout=0.5)
+            except queue.Empty:
+                # Only leave once everything queued is handled
+                if self.thread_signal.is_set(): return
+                continue
+            try:
+                self.record("wait", time.perf_counter_ns() - queued)
+                wx.parse_data(payload, True, self.parent.wants("data"), self.record)
+            except Exception as e:
+                # A bad frame shouldn't take the worker down with it
+                self.parent.logprint(f"Data frame failed ({type(e).__name__}: {e})")
+
+    def record(self, stage:str, elapsed:int, repeat:bool=False, mismatch:bool=False):
+        """
+        Adds to the time spent in a stage, counting the frame in when it's just been taken off the queue.
+
+        Args:
+            stage (str): The stage name.
+            elapsed (int): Nanoseconds spent.
+            repeat (bool, optional): Whether the frame was skipped as a repeat. Default to False.
+            mismatch (bool, optional): Whether the frame failed its sum. Default to False.
+        """
+        # Workers update these at once, keep them from losing counts
+        with self.stats_lock:
+            stats = self.stages[stage]
+            stats[0] += 1
+            stats[1] += elapsed
+            if elapsed > stats[2]: stats[2] = elapsed
+            if stage == "wait": self.frame_count += 1
+            self.repeat_count += repeat
+            self.mismatch_count += mismatch
+
+    def report(self) -> str:
+        """
+        Returns:
+            str: A one-line summary of the pipeline counters and stage times.
+        """
+        with self.stats_lock:
+            counts = (self.frame_count, self.repeat_count, self.mismatch_count, self.drop_count)
+            stages = ", ".join(
+                f"{stage} avg {total/count/1e3:.1f}us max {peak/1e3:.1f}us"
+                for stage, (count, total, peak) in self.stages.items() if count
+            )
+        return (
+            f"{counts[0]} frames, {counts[1]} repeats, "
+            f"{counts[2]} mismatched, {self.depth()} queued, "
+            f"{counts[3]} dropped{', ' if stages else ''}{stages}"
+        )
@@ -0,0 +1,294 @@
+import os, struct, threading, time
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+# Index record per frame: timestamp, frame number, sum, offset, length
+INDEX_RECORD = struct.Struct("<dBHIH")
+
+class CaniWXSegment:
+    """
+    A single segment being appended to, alongside its index.
+
+    Args:
+        path (str): Path of the segment without extension, e.g. "data/230/250101000000".
+
+    Attributes:
+        data (file): The segment file, holding frame data back to back.
+        index (file): The index file, holding an INDEX_RECORD per frame.
+        size (int): Current size of the segment file.
+        started (float): Time the segment was started.
+    """
+    def __init__(self, path:str):
+        self.path = path
+        self.data = open(path + ".seg", "ab")
+        self.index = open(path + ".idx", "ab")
+        self.size = self.data.tell()
+        self.started = time.time()
+
+    def append(self, frame:int, data:bytes, crc_sum:int, stamp:float):
+        """
+        Appends frame data to the segment, then its record to the index.
+        Data always goes first, so an index record never points past the data.
+
+        Args:
+            frame (int): The frame number of the data.
+            data (bytes): The data to store.
+            crc_sum (int): The sum of the data.
+            stamp (float): The time the data was received.
+        """
+        self.data.write(data)
+        self.index.write(INDEX_RECORD.pack(stamp, frame, crc_sum, self.size, len(data)))
+        self.size += len(data)
+
+    def sync(self):
+        """
+        Flushes both files, and makes sure they've made it to disk.
+        """
+        for file in (self.data, self.index):
+            file.flush()
+            os.fsync(file.fileno())
+
+    def close(self):
+        """
+        Syncs and closes both files.
+        """
+        self.sync()
+        self.data.close()
+        self.index.close()
+
+class CaniWXStore:
+    """
+    Stores data frames in one append-only segment per SID, instead of a file per frame.
+    Each segment comes with an index of where every frame is, so any frame or
+    time range can be read back through CaniWXArchive without scanning the data.
+    Segments are rotated once they grow too large or too old, and synced to
+    disk in batches rather than on every frame.
+
+    Example:
+        Frames from SID 230 received on midnight 2025 January 1 are stored in
+        "data/230/250101000000.seg", indexed in "data/230/250101000000.idx".
+
+    Args:
+        parent (CaniPy): A main CaniPy instance that this script will support.
+        path (str, optional): The folder to store data under. Default to "data".
+        max_bytes (int, optional): Size a segment is rotated at. Default to 64 MiB.
+        max_age (float, optional): Seconds a segment is rotated after. Default to an hour.
+        sync_frames (int, optional): Frames appended before syncing to disk. Default to 64.
+        sync_interval (float, optional): Most seconds between syncs. Default to 5.
+
+    Attributes:
+        segments (dict): SIDs mapped to the segment being appended to.
+        pending (int): Frames appended since the last sync.
+        last_sync (float): Monotonic time of the last sync.
+        lock (threading.Lock): Guards the segments, as frames and close come from different threads.
+
+        frame_count (int): Amount of frames stored.
+        sync_count (int): Amount of syncs made.
+    """
+    def __init__(self, parent:"CaniPy", path:str="data", max_bytes:int=64<<20,
+                 max_age:float=3600, sync_frames:int=64, sync_interval:float=5):
+        self.parent = parent
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.sync_frames = sync_frames
+        self.sync_interval = sync_interval
+
+        self.segments = {}
+        self.pending = 0
+        self.last_sync = time.monotonic()
+        self.lock = threading.Lock()
+
+        self.frame_count = 0
+        self.sync_count = 0
+
+    def append(self, sid:int, frame:int, data:bytes, crc_sum:int):
+        """
+        Stores the provided data in the segment for its SID.
+
+        Args:
+            sid (int): The service ID where the data originated from.
+            frame (int): The frame number of the corresponding data.
+            data (bytes): The downloaded data to store.
+            crc_sum (int): The sum of the data, kept in the index.
+        """
+        stamp = time.time()
+        with self.lock:
+            segment = self.segments.get(sid)
+            if segment and (segment.size >= self.max_bytes or stamp - segment.started >= self.max_age):
+                segment.close()
+                segment = None
+            if segment is None:
+                segment = self.open(sid, stamp)
+                if segment is None: return
+            try:
+                segment.append(frame, data, crc_sum, stamp)
+            except OSError:
+                # Skip saving if out of space or the FS went away
+                return
+            self.frame_count += 1
+            self.pending += 1
+            if self.pending >= self.sync_frames or time.monotonic() - self.last_sync >= self.sync_interval:
+                self.sync()
+
+    def open(self, sid:int, stamp:float) -> CaniWXSegment:
+        """
+        Starts a new segment for a SID.
+
+        Args:
+            sid (int): The service ID to start the segment for.
+            stamp (float): The time the segment starts at, used to name it.
+
+        Returns:
+            CaniWXSegment: The new segment, or None if it can't be written to.
+        """
+        folder = f"{self.path}/{sid}"
+        name = base = f"{folder}/{datetime.fromtimestamp(stamp).strftime('%y%m%d%H%M%S')}"
+        # Never append to an older segment, even if rotated within the second
+        num = 0
+        while os.path.exists(name + ".seg"):
+            num += 1
+            name = f"{base}_{num:03}"
+        try:
+            os.makedirs(folder, exist_ok=True)
+            segment = CaniWXSegment(name)
+        except OSError:
+            # Skip saving if permission denied or FS is read-only
+            self.segments.pop(sid, None)
+            return None
+        self.segments[sid] = segment
+        return segment
+
+    def sync(self):
+        """
+        Makes sure every open segment has made it to disk.
+        """
+        for segment in self.segments.values():
+            try:
+                segment.sync()
+            except OSError:
+                pass
+        self.pending = 0
+        self.last_sync = time.monotonic()
+        self.sync_count += 1
+
+    def close(self):
+        """
+        Syncs and closes every open segment.
+        """
+        with self.lock:
+            for segment in self.segments.values():
+                try:
+                    segment.close()
+                except OSError:
+                    pass
+            self.segments.clear()
+            self.pending = 0
+
+class CaniWXArchive:
+    """
+    Reads back data stored by CaniWXStore.
+    Only the indexes are loaded, frame data is read straight from its offset.
+
+    Example:
+        "CaniWXArchive().frames(230, start, end)" gives every frame from SID 230
+        received between the two timestamps, oldest first.
+
+    Args:
+        path (str, optional): The folder data was stored under. Default to "data".
+    """
+    def __init__(self, path:str="data"):
+        self.path = path
+
+    def sids(self) -> list[int]:
+        """
+        Returns:
+            list[int]: Every SID with stored data.
+        """
+        if not os.path.isdir(self.path): return []
+        return sorted(int(name) for name in os.listdir(self.path) if name.isdigit())
+
+    def segments(self, sid:int) -> list[str]:
+        """
+        Args:
+            sid (int): The service ID to look up.
+
+        Returns:
+            list[str]: Paths of the segments for the SID without extension, oldest first.
+        """
+        folder = f"{self.path}/{sid}"
+        if not os.path.isdir(folder): return []
+        return [f"{folder}/{name[:-4]}" for name in sorted(os.listdir(folder)) if name.endswith(".idx")]
+
+    @staticmethod
+    def index(segment:str) -> list[tuple]:
+        """
+        Loads the index of a segment.
+
+        Args:
+            segment (str): Path of the segment without extension.
+
+        Returns:
+            list[tuple]: Records of timestamp, frame number, sum, offset, and length, in the order stored.
+        """
+        with open(segment + ".idx", "rb") as file:
+            raw = file.read()
+        # Leave out a record cut short by a crash
+        raw = raw[:len(raw) - len(raw) % INDEX_RECORD.size]
+        return list(INDEX_RECORD.iter_unpack(raw))
+
+    def frames(self, sid:int, start:float=0, end:float=float("inf")):
+        """
+        Reads back the frames of a SID received within a time range.
+
+        Args:
+            sid (int): The service ID to read from.
+            start (float, optional): Earliest timestamp to include. Default to the very first.
+            end (float, optional): Latest timestamp to include. Default to the very last.
+
+        Yields:
+            tuple: Timestamp, frame number, sum, and data of every frame in range, oldest first.
+        """
+        for segment in self.segments(sid):
+            records = self.index(segment)
+            if not records: continue
+            # Segments are named by start time, skip ones that can't overlap
+            if records[-1][0] < start: continue
+            if records[0][0] > end: break
+            stamps = [record[0] for record in records]
+            first, last = bisect_left(stamps, start), bisect_right(stamps, end)
+            if first == last: continue
+            with open(segment + ".seg", "rb") as file:
+                for stamp, frame, crc_sum, offset, length in records[first:last]:
+                    file.seek(offset)
+                    yield stamp, frame, crc_sum, file.read(length)
+
+    def frame(self, sid:int, frame:int) -> tuple:
+        """
+        Reads back the latest stored frame with a frame number.
+        Frame numbers wrap around, so older ones are shadowed by newer ones.
+
+        Args:
+            sid (int): The service ID to read from.
+            frame (int): The frame number to look for.
+
+        Returns:
+            tuple: Timestamp, frame number, sum, and data of the frame, or None if not found.
+        """
+        for segment in reversed(self.segments(sid)):
+            records = self.index(segment)
+            if not records: continue
+            numbers = [record[1] for record in records]
+            # Frame numbers climb until they wrap around,
+            # bisect each climb, latest first
+            end = len(numbers)
+            for start in reversed([0] + [pos for pos in range(1, end) if numbers[pos] <= numbers[pos-1]]):
+                pos = bisect_left(numbers, frame, start, end)
+                if pos < end and numbers[pos] == frame:
+                    stamp, number, crc_sum, offset, length = records[pos]
+                    with open(segment + ".seg", "rb") as file:
+                        file.seek(offset)
+                        return stamp, number, crc_sum, file.read(length)
+                end = start
+        return None